@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+import numpy as np
+from config import Config
+from report import view_models
+from utils.metrics import metrics, percentile
+
+logger = logging.getLogger('crypto_analyzer.batch_research')
+
+ASSET_PROMPT_TEMPLATE = """Analyze {symbol} using its latest data:
+
+{asset_data}
+
+Cover the trend and momentum, what the active signals imply, the key levels
+from the recent range, and the main risks. Finish with a one-line outlook."""
+
+
+def estimate_tokens(text):
+    """Rough token count of a prompt, about four characters per token"""
+    return len(text) // 4 + 1
+
+
+def asset_snapshots(price_collector, technical_analyzer):
+    """{pair: latest price and indicator summary} from the pipeline's collected data"""
+    snapshots = {row['pair']: dict(row) for row in view_models.price_section(price_collector.collected_prices)['pairs']}
+    for row in view_models.technical_section(technical_analyzer.analysis_results)['pairs']:
+        snapshots.setdefault(row['pair'], {'pair': row['pair']}).update(row)
+    return snapshots
+
+
+def market_context(snapshots, sentiment_analyzer=None):
+    """Market-wide summary shared by every asset prompt"""
+    biases = [snapshot.get('bias') for snapshot in snapshots.values()]
+    changes = [snapshot['change_pct'] for snapshot in snapshots.values() if snapshot.get('change_pct') is not None]
+    context = {
+        'assets': len(snapshots),
+        'bullish': biases.count('bullish'),
+        'bearish': biases.count('bearish'),
+        'median_change_pct': round(float(np.median(changes)), 2) if changes else None
+    }
+    if sentiment_analyzer is not None:
+        sentiment = view_models.sentiment_section(sentiment_analyzer.sentiment_scores)
+        context['news_sentiment'] = {key: sentiment[key] for key in ('count', 'average_polarity') if key in sentiment}
+    return context
+
+
+class TokenRateLimiter:
+    """
+    Token bucket holding at most tokens_per_minute tokens, refilled
+    continuously. Requests reserve their estimated tokens before they are
+    sent and settle the difference once the actual usage is known.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = float(tokens_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens):
+        """Wait until tokens are available and take them; returns the amount reserved"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        tokens = min(float(tokens), self.capacity)
+        # Held while waiting, so reservations are granted in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                delay = (tokens - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= tokens
+        return tokens
+
+    def settle(self, reserved, used):
+        """Return unused reserved tokens, or charge usage above the reservation"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + reserved - used)
+
+
+class BatchResearcher:
+    """
+    Per-asset research reports generated concurrently on the ResearchAgent's
+    pooled async Groq client.
+
+    At most RESEARCH_CONCURRENCY requests are in flight, and each waits for
+    its estimated tokens in a RESEARCH_TOKENS_PER_MINUTE bucket, so a batch of
+    dozens of assets stays under the account's rate limits instead of
+    collecting 429s. Every request starts with the same system message (the
+    analyst instructions and the market-wide context, built once per batch),
+    so the provider can reuse the cached prefix and only the asset-specific
+    tail differs. A failed asset is recorded and the rest of the batch goes on.
+    """
+
+    def __init__(self, agent=None, concurrency=None, tokens_per_minute=None, max_tokens=None):
+        logger.debug("Initializing BatchResearcher")
+        if agent is None:
+            from agent.researcher import ResearchAgent
+            agent = ResearchAgent()
+        self.agent = agent
+        self.concurrency = concurrency or Config.RESEARCH_CONCURRENCY
+        self.max_tokens = max_tokens or Config.RESEARCH_MAX_TOKENS
+        self.limiter = TokenRateLimiter(tokens_per_minute or Config.RESEARCH_TOKENS_PER_MINUTE)
+        self.reports = {}
+        self.failures = {}
+        self.latencies = []
+        self.stats = {}
+
+    def shared_prefix(self, context):
+        """System message common to every asset request in a batch"""
+        return (f"{self.agent.system_prompt}\n\n"
+                f"Current market context:\n{json.dumps(context, sort_keys=True, default=str)}")
+
+    async def research_asset(self, symbol, snapshot, prefix, semaphore):
+        """Generate one asset's analysis; returns (report, latency seconds)"""
+        prompt = ASSET_PROMPT_TEMPLATE.format(
+            symbol=symbol, asset_data=json.dumps(snapshot, sort_keys=True, default=str))
+        async with semaphore:
+            reserved = await self.limiter.acquire(
+                estimate_tokens(prefix) + estimate_tokens(prompt) + self.max_tokens)
+            used = reserved
+            start = time.perf_counter()
+            try:
+                with metrics.api_call('groq'):
+                    response = await self.agent.groq_client.chat.completions.create(
+                        model=Config.AI_MODEL,
+                        messages=[
+                            {"role": "system", "content": prefix},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=Config.TEMPERATURE,
+                        max_tokens=self.max_tokens
+                    )
+                if response.usage is not None:
+                    used = response.usage.total_tokens
+            finally:
+                self.limiter.settle(reserved, used)
+            latency = time.perf_counter() - start
+
+        return {
+            'symbol': symbol,
+            'timestamp': datetime.now().isoformat(),
+            'data': snapshot,
+            'analysis': response.choices[0].message.content,
+            'tokens': used
+        }, latency
+
+    async def research_assets(self, snapshots, context=None):
+        """
+        Research every {symbol: snapshot} concurrently. Returns {symbol: report}
+        for the assets that succeeded; failures are kept in self.failures.
+        """
+        prefix = self.shared_prefix(context or market_context(snapshots))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        symbols = list(snapshots)
+        waited = self.limiter.waited
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.research_asset(symbol, snapshots[symbol], prefix, semaphore) for symbol in symbols),
+            return_exceptions=True)
+        elapsed = time.perf_counter() - start
+
+        self.reports, self.failures = {}, {}
+        self.latencies = latencies = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Research for {symbol} failed: {str(result)}")
+                self.failures[symbol] = str(result)
+                continue
+            self.reports[symbol], latency = result
+            latencies.append(latency)
+
+        tokens = sum(report['tokens'] for report in self.reports.values())
+        self.stats = {
+            'assets': len(symbols),
+            'succeeded': len(self.reports),
+            'failed': len(self.failures),
+            'seconds': round(elapsed, 3),
+            'assets_per_second': round(len(self.reports) / elapsed, 3) if elapsed else 0.0,
+            'tokens': tokens,
+            'latency_p50': percentile(latencies, 50) if latencies else None,
+            'latency_p95': percentile(latencies, 95) if latencies else None,
+            'rate_limit_wait': round(self.limiter.waited - waited, 3)
+        }
+        logger.info(f"Per-asset research: {self.stats}")
+        return self.reports
+
+    def run_from_pipeline(self, components):
+        """Research every analyzed pair of a pipeline run"""
+        snapshots = asset_snapshots(components['price_collector'], components['technical_analyzer'])
+        context = market_context(snapshots, components.get('sentiment_analyzer'))
+
+        async def research():
+            try:
+                return await self.research_assets(snapshots, context)
+            finally:
+                await self.agent.close()
+
+        return asyncio.run(research())
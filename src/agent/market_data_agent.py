@@ -7,6 +7,7 @@ from pycoingecko import CoinGeckoAPI
 from binance.client import Client as BinanceClient
 from glassnode.client import GlassnodeClient
 from config import Config
+from utils.metrics import metrics
 
 logger = logging.getLogger('crypto_analyzer.market_data_agent')
 
@@ -48,13 +49,14 @@ class MarketDataAgent:
         """Get comprehensive market overview"""
         try:
             # Get top coins market data
-            market_data = self.cg.get_coins_markets(
-                vs_currency='usd',
-                order='market_cap_desc',
-                per_page=Config.TOP_COINS_COUNT,
-                sparkline=True,
-                price_change_percentage='1h,24h,7d'
-            )
+            with metrics.api_call('coingecko'):
+                market_data = self.cg.get_coins_markets(
+                    vs_currency='usd',
+                    order='market_cap_desc',
+                    per_page=Config.TOP_COINS_COUNT,
+                    sparkline=True,
+                    price_change_percentage='1h,24h,7d'
+                )
             
             # Process and structure the data
             overview = {
@@ -76,15 +78,13 @@ class MarketDataAgent:
     async def get_onchain_metrics(self) -> Dict:
         """Get on-chain metrics from Glassnode"""
         try:
-            metrics = {
-                'network_growth': self.glassnode.get_metric('network_growth'),
-                'active_addresses': self.glassnode.get_metric('active_addresses'),
-                'transaction_volume': self.glassnode.get_metric('transaction_volume'),
-                'exchange_flows': self.glassnode.get_metric('exchange_flows'),
-                'institutional_metrics': await self._get_institutional_metrics()
-            }
+            onchain = {}
+            for metric in ['network_growth', 'active_addresses', 'transaction_volume', 'exchange_flows']:
+                with metrics.api_call('glassnode'):
+                    onchain[metric] = self.glassnode.get_metric(metric)
+            onchain['institutional_metrics'] = await self._get_institutional_metrics()
             
-            return metrics
+            return onchain
             
         except Exception as e:
             logger.error(f"Error fetching on-chain metrics: {str(e)}", exc_info=True)
@@ -96,14 +96,17 @@ class MarketDataAgent:
             trading_data = {}
             
             for pair in Config.CRYPTO_PAIRS:
-                # Get recent trades
-                trades = self.binance.get_recent_trades(symbol=pair)
+                with metrics.api_call('binance'):
+                    # Get recent trades
+                    trades = self.binance.get_recent_trades(symbol=pair)
                 
-                # Get order book
-                depth = self.binance.get_order_book(symbol=pair)
+                with metrics.api_call('binance'):
+                    # Get order book
+                    depth = self.binance.get_order_book(symbol=pair)
                 
-                # Get 24h ticker
-                ticker = self.binance.get_ticker(symbol=pair)
+                with metrics.api_call('binance'):
+                    # Get 24h ticker
+                    ticker = self.binance.get_ticker(symbol=pair)
                 
                 trading_data[pair] = {
                     'recent_trades': trades[:100],  # Last 100 trades
@@ -124,13 +127,14 @@ class MarketDataAgent:
             
             for category in Config.TREND_CATEGORIES:
                 # Get coins in category
-                coins = self.cg.get_coins_markets(
-                    vs_currency='usd',
-                    category=category,
-                    order='market_cap_desc',
-                    per_page=20,
-                    sparkline=False
-                )
+                with metrics.api_call('coingecko'):
+                    coins = self.cg.get_coins_markets(
+                        vs_currency='usd',
+                        category=category,
+                        order='market_cap_desc',
+                        per_page=20,
+                        sparkline=False
+                    )
                 
                 sector_data[category] = {
                     'market_cap': sum(coin['market_cap'] for coin in coins),
@@ -3,8 +3,10 @@ import logging
 import asyncio 
 from config import Config
 import groq
+import httpx
 from datetime import datetime
 from tenacity import retry, stop_after_attempt, wait_exponential
+from utils.metrics import metrics
 
 logger = logging.getLogger('crypto_analyzer.researcher')
 
@@ -14,10 +16,17 @@ class ResearchAgent:
     into comprehensive crypto market analysis.
     """
     
-    def __init__(self):
+    def __init__(self, base_url=None, api_key=None):
         logger.debug("Initializing Lead Research Agent")
-        # Initialize Groq client
-        self.groq_client = groq.Groq(api_key=Config.GROQ_API_KEY)
+        # One async Groq client; its connection pool is shared by every request
+        self.groq_client = groq.AsyncGroq(
+            api_key=api_key or Config.GROQ_API_KEY,
+            base_url=base_url or Config.GROQ_API_BASE,
+            timeout=Config.SYSTEM_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=Config.RESEARCH_CONCURRENCY,
+                max_keepalive_connections=Config.RESEARCH_CONCURRENCY))
+        )
         
         self.system_prompt = """You are a lead cryptocurrency research analyst coordinating a team of specialized AI agents.
 Your role is to:
@@ -90,16 +99,17 @@ Provide a concise but comprehensive analysis."""
     async def generate_ai_analysis(self, prompt: str) -> str:
         """Generate analysis using Groq API with retry logic"""
         try:
-            response = await self.groq_client.chat.completions.create(
-                model=Config.AI_MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=Config.TEMPERATURE,
-                max_tokens=Config.MAX_TOKENS,
-                timeout=Config.SYSTEM_TIMEOUT
-            )
+            with metrics.api_call('groq'):
+                response = await self.groq_client.chat.completions.create(
+                    model=Config.AI_MODEL,
+                    messages=[
+                        {"role": "system", "content": self.system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=Config.TEMPERATURE,
+                    max_tokens=Config.MAX_TOKENS,
+                    timeout=Config.SYSTEM_TIMEOUT
+                )
             
             analysis = response.choices[0].message.content
             
@@ -135,22 +145,23 @@ Provide a concise but comprehensive analysis."""
             'timestamp': datetime.now().isoformat(),
             'insights': insights,
             'analysis': analysis,
-            'recommendations': self._extract_recommendations(analysis)
+            'recommendations': await self._extract_recommendations(analysis)
         }
 
-    def _extract_recommendations(self, analysis: str) -> List[str]:
+    async def _extract_recommendations(self, analysis: str) -> List[str]:
         """Extract key recommendations from the analysis"""
         try:
             # Ask Groq to extract recommendations
-            response = self.groq_client.chat.completions.create(
-                model=Config.AI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Extract key actionable recommendations from the analysis. Format as a list."},
-                    {"role": "user", "content": analysis}
-                ],
-                temperature=0.3,  # Lower temperature for more focused extraction
-                max_tokens=1000
-            )
+            with metrics.api_call('groq'):
+                response = await self.groq_client.chat.completions.create(
+                    model=Config.AI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "Extract key actionable recommendations from the analysis. Format as a list."},
+                        {"role": "user", "content": analysis}
+                    ],
+                    temperature=0.3,  # Lower temperature for more focused extraction
+                    max_tokens=1000
+                )
             
             return response.choices[0].message.content.split('\n')
         except Exception as e:
@@ -168,10 +179,17 @@ Provide a concise but comprehensive analysis."""
             logger.error(f"Error in research pipeline: {str(e)}", exc_info=True)
             raise
 
+    async def close(self):
+        """Close the pooled Groq connections"""
+        await self.groq_client.close()
+
 if __name__ == "__main__":
     async def main():
         agent = ResearchAgent()
-        report = await agent.run()
+        try:
+            report = await agent.run()
+        finally:
+            await agent.close()
         print(report)
 
     asyncio.run(main())
\ No newline at end of file
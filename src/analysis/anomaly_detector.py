@@ -0,0 +1,325 @@
+import logging
+from collections import deque
+import numpy as np
+import pandas as pd
+from config import Config
+from data_collection.resampler import timeframe_to_timedelta
+from utils.compact import memory_usage
+
+logger = logging.getLogger('crypto_analyzer.anomaly_detector')
+
+TIERS = ['significant', 'major', 'extreme']
+ALERT_KINDS = ['price', 'volume']
+# Volume ratio tiers as multiples of VOLUME_SURGE_THRESHOLD
+VOLUME_TIER_MULTIPLIERS = [1.0, 2.0, 4.0]
+
+
+def _halflife_alpha(halflife):
+    """EWMA smoothing factor for a half-life in bars"""
+    return 1.0 - 0.5 ** (1.0 / halflife)
+
+
+def _to_seconds(timestamp):
+    """Epoch seconds from a Timestamp, datetime64, datetime or number"""
+    if isinstance(timestamp, (int, float, np.integer, np.floating)):
+        return float(timestamp)
+    return pd.Timestamp(timestamp).value / 1e9
+
+
+class AnomalyDetector:
+    """
+    Online price and volume anomaly detection across the whole universe.
+
+    Each asset keeps EWMA baselines (price level, volume mean, and mean and
+    variance of log volume) in flat NumPy arrays, so a bar update costs O(1) per asset and a whole
+    universe tick is a handful of vectorised operations. A bar is scored
+    against the baseline before it is folded in, so events are reported on
+    the bar they happen.
+
+    Price alerts are tiered by PRICE_CHANGE_THRESHOLDS (percent away from
+    the baseline price), volume alerts by multiples of VOLUME_SURGE_THRESHOLD
+    (bar volume over baseline volume) and only when the bar is also
+    ANOMALY_VOLUME_MIN_ZSCORE deviations above the log-volume baseline, so
+    noisy assets do not alert on ordinary swings. An asset/kind alert is repeated only
+    when it escalates to a higher tier or after the cooldown has passed.
+    """
+
+    def __init__(self, price_collector=None, price_thresholds=None, volume_threshold=None,
+                 cooldown=None, warmup=None, price_halflife=None, volume_halflife=None,
+                 min_volume_zscore=None):
+        logger.debug("Initializing AnomalyDetector")
+        self.price_collector = price_collector
+        thresholds = price_thresholds or Config.PRICE_CHANGE_THRESHOLDS
+        self.price_levels = np.array([thresholds[tier] for tier in TIERS], dtype=np.float64)
+        volume_threshold = volume_threshold or Config.VOLUME_SURGE_THRESHOLD
+        self.volume_levels = volume_threshold * np.array(VOLUME_TIER_MULTIPLIERS)
+        self.cooldown = Config.ANOMALY_COOLDOWN if cooldown is None else cooldown
+        self.warmup = Config.ANOMALY_WARMUP_BARS if warmup is None else warmup
+        self.price_alpha = _halflife_alpha(price_halflife or Config.ANOMALY_PRICE_HALFLIFE)
+        self.volume_alpha = _halflife_alpha(volume_halflife or Config.ANOMALY_VOLUME_HALFLIFE)
+        self.min_volume_zscore = (Config.ANOMALY_VOLUME_MIN_ZSCORE
+                                  if min_volume_zscore is None else min_volume_zscore)
+
+        self.symbols = []
+        self.slots = {}
+        self._capacity = 0
+        self._allocate(64)
+        self._last_symbols = None
+        self._last_index = None
+        self.last_seen = {}
+        self.recent_alerts = deque(maxlen=Config.ANOMALY_ALERT_HISTORY)
+        self.handlers = []
+        self.bars_processed = 0
+        self.alerts_emitted = 0
+        self.alerts_suppressed = 0
+
+    def _allocate(self, capacity):
+        """Grow the per-asset state arrays to hold capacity assets"""
+        def grow(array, fill, dtype=np.float64):
+            grown = np.full(capacity, fill, dtype=dtype)
+            if array is not None:
+                grown[:len(array)] = array
+            return grown
+
+        previous = self.__dict__
+        self.price_ref = grow(previous.get('price_ref'), np.nan)
+        self.volume_mean = grow(previous.get('volume_mean'), np.nan)
+        self.log_volume_mean = grow(previous.get('log_volume_mean'), np.nan)
+        self.log_volume_var = grow(previous.get('log_volume_var'), 0.0)
+        self.count = grow(previous.get('count'), 0, np.int64)
+        last_tier = previous.get('last_tier', {})
+        last_alert_at = previous.get('last_alert_at', {})
+        self.last_tier = {kind: grow(last_tier.get(kind), 0, np.int8) for kind in ALERT_KINDS}
+        self.last_alert_at = {kind: grow(last_alert_at.get(kind), -np.inf) for kind in ALERT_KINDS}
+        self._capacity = capacity
+
+    def _index(self, symbols):
+        """Slot indices for symbols, registering new ones"""
+        key = tuple(symbols)
+        if key == self._last_symbols:
+            # Same universe as the previous tick: reuse its slots
+            return self._last_index
+        for symbol in symbols:
+            if symbol not in self.slots:
+                if len(self.symbols) == self._capacity:
+                    self._allocate(self._capacity * 2)
+                self.slots[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+        index = np.fromiter((self.slots[symbol] for symbol in symbols), dtype=np.int64, count=len(symbols))
+        self._last_symbols, self._last_index = key, index
+        return index
+
+    def subscribe(self, handler):
+        """Call handler(alert) for every emitted alert"""
+        self.handlers.append(handler)
+
+    def update(self, symbols, prices, volumes, timestamp):
+        """
+        Score one bar per symbol, then fold the bars into the baselines.
+        symbols must be unique; timestamp is one time for the whole tick
+        or one per symbol. Returns the emitted alerts.
+        """
+        index = self._index(symbols)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if np.ndim(timestamp):
+            now = np.array([_to_seconds(t) for t in timestamp])
+        else:
+            now = np.full(len(index), _to_seconds(timestamp))
+
+        price_ref = self.price_ref[index]
+        volume_mean = self.volume_mean[index]
+        log_volumes = np.log1p(volumes)
+        log_volume_mean = self.log_volume_mean[index]
+        log_volume_var = self.log_volume_var[index]
+        warm = self.count[index] >= self.warmup
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (prices / price_ref - 1.0) * 100.0
+            ratio = volumes / volume_mean
+            zscore = (log_volumes - log_volume_mean) / np.sqrt(log_volume_var)
+        change = np.where(np.isfinite(change), change, 0.0)
+        ratio = np.where(np.isfinite(ratio), ratio, 0.0)
+
+        price_tier = np.where(warm, np.searchsorted(self.price_levels, np.abs(change), side='right'), 0)
+        volume_surge = warm & ((zscore >= self.min_volume_zscore) | (log_volume_var == 0))
+        volume_tier = np.where(volume_surge, np.searchsorted(self.volume_levels, ratio, side='right'), 0)
+
+        alerts = []
+        for kind, tiers, values, baselines in (('price', price_tier, change, price_ref),
+                                               ('volume', volume_tier, ratio, volume_mean)):
+            alerts.extend(self._emit(kind, index, tiers, values, baselines, prices, volumes, now))
+
+        # Fold the bars into the EWMA baselines; first bars seed them
+        first = self.count[index] == 0
+        self.price_ref[index] = np.where(
+            first, prices, price_ref + self.price_alpha * (prices - price_ref))
+        self.volume_mean[index] = np.where(
+            first, volumes, volume_mean + self.volume_alpha * (volumes - volume_mean))
+        delta = log_volumes - log_volume_mean
+        self.log_volume_mean[index] = np.where(
+            first, log_volumes, log_volume_mean + self.volume_alpha * delta)
+        self.log_volume_var[index] = np.where(
+            first, 0.0, (1.0 - self.volume_alpha) * (log_volume_var + self.volume_alpha * delta ** 2))
+        self.count[index] += 1
+        self.bars_processed += len(index)
+        return alerts
+
+    def _emit(self, kind, index, tiers, values, baselines, prices, volumes, now):
+        """Apply escalation and cooldown, then build alerts for one kind"""
+        candidates = tiers > 0
+        if not candidates.any():
+            return []
+        last_tier = self.last_tier[kind][index]
+        expired = now - self.last_alert_at[kind][index] >= self.cooldown
+        emit = candidates & ((tiers > last_tier) | expired)
+        self.alerts_suppressed += int(candidates.sum() - emit.sum())
+
+        alerts = []
+        for i in np.flatnonzero(emit):
+            slot = index[i]
+            self.last_tier[kind][slot] = tiers[i]
+            self.last_alert_at[kind][slot] = now[i]
+            alert = {
+                'symbol': self.symbols[slot],
+                'kind': kind,
+                'tier': TIERS[tiers[i] - 1],
+                'value': round(float(values[i]), 4),
+                'baseline': float(baselines[i]),
+                'price': float(prices[i]),
+                'volume': float(volumes[i]),
+                'timestamp': pd.Timestamp(now[i], unit='s')
+            }
+            alerts.append(alert)
+            self._dispatch(alert)
+        return alerts
+
+    def _dispatch(self, alert):
+        self.alerts_emitted += 1
+        self.recent_alerts.append(alert)
+        unit = '%' if alert['kind'] == 'price' else 'x volume'
+        message = f"{alert['tier'].capitalize()} {alert['kind']} anomaly on {alert['symbol']}: {alert['value']}{unit}"
+        if alert['tier'] == 'significant':
+            logger.info(message)
+        else:
+            logger.warning(message)
+        for handler in self.handlers:
+            try:
+                handler(alert)
+            except Exception as e:
+                logger.error(f"Alert handler failed: {str(e)}", exc_info=True)
+
+    def update_bar(self, symbol, price, volume, timestamp):
+        """Score and fold in a single bar for one symbol"""
+        return self.update([symbol], [price], [volume], timestamp)
+
+    def seed(self, symbol, df):
+        """Initialise a symbol's baselines from historical bars without alerting"""
+        if df is None or df.empty:
+            return
+        slot = self._index([symbol])[0]
+        price_halflife = np.log(0.5) / np.log(1.0 - self.price_alpha)
+        volume_halflife = np.log(0.5) / np.log(1.0 - self.volume_alpha)
+        close = df['close'].astype(np.float64)
+        volume = df['volume'].astype(np.float64)
+        log_volume = np.log1p(volume).ewm(halflife=volume_halflife, adjust=False)
+        self.price_ref[slot] = close.ewm(halflife=price_halflife, adjust=False).mean().iloc[-1]
+        self.volume_mean[slot] = volume.ewm(halflife=volume_halflife, adjust=False).mean().iloc[-1]
+        self.log_volume_mean[slot] = log_volume.mean().iloc[-1]
+        variance = log_volume.var(bias=True).iloc[-1]
+        self.log_volume_var[slot] = 0.0 if np.isnan(variance) else variance
+        self.count[slot] = len(df)
+        self.last_seen[symbol] = df['timestamp'].iloc[-1]
+
+    def consume_frames(self, frames, bar_length, now=None):
+        """
+        Feed {symbol: OHLCV frame} bars of bar_length that have closed by now
+        (UTC) and were not seen yet; the still-open last bar is held back until
+        its final volume is known. A symbol seen for the first time is seeded
+        from its closed history and only its latest closed bar is scored.
+        """
+        bar_length = pd.Timedelta(bar_length)
+        now = pd.Timestamp.now(tz='UTC').tz_localize(None) if now is None else pd.Timestamp(now)
+        alerts = []
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            closed = df['timestamp'] + bar_length <= now
+            if 'is_partial' in df:
+                closed &= ~df['is_partial'].astype(bool)
+            df = df[closed]
+            if df.empty:
+                continue
+            last_seen = self.last_seen.get(symbol)
+            if last_seen is None:
+                self.seed(symbol, df.iloc[:-1])
+                new_bars = df.iloc[-1:]
+            else:
+                new_bars = df[df['timestamp'] > last_seen]
+            for bar in new_bars.itertuples(index=False):
+                alerts.extend(self.update_bar(symbol, bar.close, bar.volume, bar.timestamp))
+            if not new_bars.empty:
+                self.last_seen[symbol] = new_bars['timestamp'].iloc[-1]
+        return alerts
+
+    def stats(self):
+        return {
+            'assets': len(self.symbols),
+            'bars_processed': self.bars_processed,
+            'alerts_emitted': self.alerts_emitted,
+            'alerts_suppressed': self.alerts_suppressed
+        }
+
+    def memory_usage(self):
+        """Bytes held by baselines and recent alerts"""
+        return memory_usage((self.price_ref, self.volume_mean, self.log_volume_mean, self.log_volume_var, self.count,
+                             self.last_tier, self.last_alert_at, self.slots, list(self.recent_alerts)))
+
+    def checkpoint_state(self):
+        """Baselines, alert state and bars seen for the stage checkpoint, so a restored run does not re-alert"""
+        n = len(self.symbols)
+        if not n:
+            return None
+        return {
+            'symbols': self.symbols,
+            'price_ref': self.price_ref[:n],
+            'volume_mean': self.volume_mean[:n],
+            'log_volume_mean': self.log_volume_mean[:n],
+            'log_volume_var': self.log_volume_var[:n],
+            'count': self.count[:n],
+            'last_tier': {kind: tiers[:n] for kind, tiers in self.last_tier.items()},
+            'last_alert_at': {kind: times[:n] for kind, times in self.last_alert_at.items()},
+            'last_seen': self.last_seen,
+            'recent_alerts': list(self.recent_alerts),
+            'totals': [self.bars_processed, self.alerts_emitted, self.alerts_suppressed]
+        }
+
+    def restore_checkpoint(self, state):
+        self.symbols = list(state['symbols'])
+        self.slots = {symbol: slot for slot, symbol in enumerate(self.symbols)}
+        for name in ('price_ref', 'volume_mean', 'log_volume_mean', 'log_volume_var', 'count'):
+            setattr(self, name, state[name])
+        self.last_tier = dict(state['last_tier'])
+        self.last_alert_at = dict(state['last_alert_at'])
+        # Pads the restored arrays back out to spare capacity
+        self._allocate(max(2 * len(self.symbols), 64))
+        self._last_symbols = self._last_index = None
+        self.last_seen = dict(state['last_seen'])
+        self.recent_alerts.clear()
+        self.recent_alerts.extend(state['recent_alerts'])
+        self.bars_processed, self.alerts_emitted, self.alerts_suppressed = state['totals']
+
+    def run(self):
+        """Main execution method"""
+        logger.info("Running anomaly detection")
+        if self.price_collector is None:
+            logger.warning("No price collector attached to the anomaly detector")
+            return
+        # Base-resolution bars give the earliest signal; a sharded run only
+        # publishes Config.TIMEFRAME bars back to the parent
+        frames = self.price_collector.resampler.base_frames
+        timeframe = Config.BASE_TIMEFRAME
+        if not frames:
+            frames, timeframe = self.price_collector.collected_prices, Config.TIMEFRAME
+        alerts = self.consume_frames(frames, timeframe_to_timedelta(timeframe))
+        logger.info(f"Anomaly detection emitted {len(alerts)} alerts: {self.stats()}")
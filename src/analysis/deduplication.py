@@ -0,0 +1,129 @@
+import re
+import zlib
+from collections import defaultdict
+import numpy as np
+from config import Config
+import logging
+
+logger = logging.getLogger('crypto_analyzer.deduplication')
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def shingles(text, size=None):
+    """Hashed word n-gram shingles of normalized text"""
+    size = size or Config.DEDUP_SHINGLE_SIZE
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        grams = [' '.join(tokens)] if tokens else []
+    else:
+        grams = [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return np.fromiter({zlib.crc32(gram.encode()) for gram in grams}, dtype=np.uint64)
+
+
+class MinHashLSH:
+    """
+    Near-duplicate clustering with MinHash signatures and banded LSH.
+    Only documents sharing a band bucket are compared, so clustering runs
+    in roughly linear time in the corpus size.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, bands=None, seed=1):
+        self.threshold = threshold or Config.DEDUP_THRESHOLD
+        self.num_perm = num_perm or Config.MINHASH_PERMUTATIONS
+        self.bands = bands or Config.LSH_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("MINHASH_PERMUTATIONS must be divisible by LSH_BANDS")
+        self.rows = self.num_perm // self.bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, self.num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        """MinHash signature of a text, or None when it has no tokens"""
+        hashed = shingles(text)
+        if not len(hashed):
+            return None
+        # uint64 wraparound is intended here, as in standard MinHash implementations
+        permuted = ((np.outer(hashed, self._a) + self._b) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=0)
+
+    def cluster(self, texts):
+        """Group indices of near-identical texts; returns a list of index lists"""
+        parent = list(range(len(texts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        signatures = [self.signature(text) for text in texts]
+        buckets = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            if signature is None:
+                continue
+            for band in range(self.bands):
+                chunk = signature[band * self.rows:(band + 1) * self.rows]
+                buckets[(band, chunk.tobytes())].append(index)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # One representative per cluster found in this bucket, so a false-positive
+            # collision cannot keep true near-duplicates after it from merging
+            representatives = [members[0]]
+            for other in members[1:]:
+                matched = False
+                for representative in representatives:
+                    root_representative, root_other = find(representative), find(other)
+                    if root_representative == root_other:
+                        matched = True
+                    # Confirm the LSH candidate with the estimated Jaccard similarity
+                    elif np.mean(signatures[representative] == signatures[other]) >= self.threshold:
+                        parent[root_other] = root_representative
+                        matched = True
+                if not matched:
+                    representatives.append(other)
+
+        clusters = defaultdict(list)
+        for index in range(len(texts)):
+            clusters[find(index)].append(index)
+        return list(clusters.values())
+
+
+def _article_text(article):
+    return ' '.join(filter(None, [article.get('title'), article.get('description'), article.get('content')]))
+
+
+def deduplicate_articles(articles, lsh=None):
+    """
+    Keep one representative per cluster of syndicated copies.
+    The earliest published copy (longest on ties) is kept and annotated with
+    syndication_count and syndicated_sources.
+    """
+    if not articles:
+        return []
+    lsh = lsh or MinHashLSH()
+    clusters = lsh.cluster([_article_text(article) for article in articles])
+
+    representatives = []
+    for members in clusters:
+        copies = [articles[index] for index in members]
+        representative = min(
+            copies,
+            key=lambda article: (article.get('publishedAt') or '', -len(article.get('content') or ''))
+        )
+        representative = dict(representative)
+        representative['syndication_count'] = len(copies)
+        representative['syndicated_sources'] = sorted({
+            (article.get('source') or {}).get('name') or '' for article in copies
+        } - {''})
+        representatives.append((min(members), representative))
+
+    # Preserve the original ordering of the corpus
+    representatives.sort(key=lambda item: item[0])
+    logger.info(f"Deduplicated {len(articles)} articles into {len(representatives)} clusters")
+    return [article for _, article in representatives]
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import Config
+from utils.compact import memory_usage
+
+logger = logging.getLogger('crypto_analyzer.indicator_cache')
+
+FINGERPRINT_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def fingerprint_frame(df, tail_rows=None):
+    """
+    Cheap fingerprint of a price DataFrame.
+    Hashes the row count, last timestamp and the last few OHLCV rows, so an
+    appended or amended candle yields a new data version.
+    """
+    tail_rows = tail_rows or Config.INDICATOR_FINGERPRINT_TAIL
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    if len(df) == 0:
+        return digest.hexdigest()
+
+    if 'timestamp' in df.columns:
+        digest.update(str(df['timestamp'].iloc[-1]).encode())
+    else:
+        digest.update(str(df.index[-1]).encode())
+
+    columns = [column for column in FINGERPRINT_COLUMNS if column in df.columns]
+    tail = df[columns].tail(tail_rows).to_numpy(dtype=np.float64)
+    digest.update(np.ascontiguousarray(tail).tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Bounded LRU cache for computed indicator values.
+    Keys are (pair, timeframe, indicator, params, fingerprint) tuples.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or Config.INDICATOR_CACHE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(pair, timeframe, indicator, params, fingerprint):
+        """Build a hashable cache key from indicator parameters"""
+        return (pair, timeframe, indicator, tuple(sorted(params.items())), fingerprint)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def memory_usage(self):
+        """Bytes held by cached indicator values"""
+        with self._lock:
+            values = list(self._entries.values())
+        return memory_usage(values)
+
+    def stats(self):
+        """Return hit/miss statistics for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Shared across TechnicalAnalyzer instances so that ReportGenerator and
+# MarketAnalyzer reuse each other's results
+indicator_cache = IndicatorCache()
@@ -0,0 +1,170 @@
+import re
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+import logging
+
+logger = logging.getLogger('crypto_analyzer.lexicon_sentiment')
+
+# term -> (polarity, subjectivity); multi-word entries are matched as n-grams
+CRYPTO_LEXICON = {
+    # Crypto slang
+    'moon': (0.8, 0.9), 'mooning': (0.8, 0.9), 'to the moon': (0.9, 1.0),
+    'ath': (0.7, 0.6), 'all time high': (0.7, 0.6), 'new high': (0.6, 0.5),
+    'hodl': (0.4, 0.7), 'wagmi': (0.6, 0.9), 'lfg': (0.6, 0.9), 'bullrun': (0.7, 0.7),
+    'bull run': (0.7, 0.7), 'pump': (0.4, 0.7), 'pumping': (0.5, 0.7), 'breakout': (0.6, 0.5),
+    'short squeeze': (0.5, 0.5), 'accumulation': (0.3, 0.4), 'buy the dip': (0.4, 0.8),
+    'etf approval': (0.7, 0.4), 'approved': (0.5, 0.3), 'adoption': (0.5, 0.4),
+    'institutional adoption': (0.6, 0.4), 'inflows': (0.4, 0.3), 'halving': (0.3, 0.3),
+    'upgrade': (0.4, 0.3), 'partnership': (0.4, 0.4), 'listing': (0.4, 0.3), 'airdrop': (0.3, 0.5),
+    'rekt': (-0.8, 0.9), 'rug': (-0.8, 0.8), 'rug pull': (-0.9, 0.8), 'rugged': (-0.9, 0.8),
+    'ngmi': (-0.6, 0.9), 'fud': (-0.5, 0.8), 'dump': (-0.6, 0.7), 'dumping': (-0.6, 0.7),
+    'capitulation': (-0.7, 0.6), 'liquidated': (-0.7, 0.5), 'liquidations': (-0.6, 0.5),
+    'exploit': (-0.8, 0.5), 'exploited': (-0.8, 0.5), 'hack': (-0.8, 0.5), 'hacked': (-0.8, 0.5),
+    'scam': (-0.9, 0.8), 'ponzi': (-0.9, 0.8), 'depeg': (-0.8, 0.5), 'depegged': (-0.8, 0.5),
+    'delisted': (-0.6, 0.4), 'delisting': (-0.6, 0.4), 'outflows': (-0.4, 0.3),
+    'insolvent': (-0.9, 0.5), 'insolvency': (-0.9, 0.5), 'bankrupt': (-0.9, 0.5),
+    'bankruptcy': (-0.9, 0.5), 'crackdown': (-0.6, 0.5), 'lawsuit': (-0.5, 0.4),
+    'sec lawsuit': (-0.6, 0.4), 'ban': (-0.6, 0.5), 'banned': (-0.6, 0.5), 'bear market': (-0.6, 0.5),
+    'bull market': (0.6, 0.5), 'death cross': (-0.6, 0.5), 'golden cross': (0.6, 0.5),
+    'sell off': (-0.6, 0.5), 'selloff': (-0.6, 0.5), 'crypto winter': (-0.6, 0.6),
+    # Market direction
+    'bullish': (0.7, 0.8), 'bearish': (-0.7, 0.8), 'rally': (0.6, 0.5), 'rallies': (0.6, 0.5),
+    'rallied': (0.6, 0.5), 'surge': (0.6, 0.5), 'surges': (0.6, 0.5), 'surged': (0.6, 0.5),
+    'soar': (0.7, 0.6), 'soars': (0.7, 0.6), 'soared': (0.7, 0.6), 'gain': (0.4, 0.3),
+    'gains': (0.4, 0.3), 'jump': (0.4, 0.4), 'jumps': (0.4, 0.4), 'recover': (0.4, 0.4),
+    'recovery': (0.4, 0.4), 'rebound': (0.4, 0.4), 'record': (0.4, 0.4), 'outperform': (0.5, 0.5),
+    'crash': (-0.8, 0.6), 'crashes': (-0.8, 0.6), 'crashed': (-0.8, 0.6), 'plunge': (-0.7, 0.6),
+    'plunges': (-0.7, 0.6), 'plunged': (-0.7, 0.6), 'tumble': (-0.6, 0.5), 'tumbles': (-0.6, 0.5),
+    'slump': (-0.6, 0.5), 'slumps': (-0.6, 0.5), 'drop': (-0.4, 0.3), 'drops': (-0.4, 0.3),
+    'fall': (-0.4, 0.3), 'falls': (-0.4, 0.3), 'decline': (-0.4, 0.3), 'declines': (-0.4, 0.3),
+    'loss': (-0.5, 0.4), 'losses': (-0.5, 0.4), 'underperform': (-0.5, 0.5), 'volatile': (-0.2, 0.6),
+    'volatility': (-0.2, 0.5),
+    # General sentiment
+    'good': (0.7, 0.6), 'great': (0.8, 0.75), 'strong': (0.4, 0.7), 'positive': (0.5, 0.6),
+    'optimistic': (0.6, 0.8), 'optimism': (0.6, 0.8), 'confidence': (0.4, 0.6), 'success': (0.6, 0.5),
+    'successful': (0.6, 0.6), 'growth': (0.4, 0.3), 'opportunity': (0.4, 0.5), 'profit': (0.5, 0.4),
+    'profits': (0.5, 0.4), 'win': (0.6, 0.5), 'best': (0.8, 0.3), 'bad': (-0.7, 0.67),
+    'terrible': (-0.9, 1.0), 'weak': (-0.4, 0.6), 'negative': (-0.5, 0.6), 'pessimistic': (-0.6, 0.8),
+    'fear': (-0.6, 0.7), 'fears': (-0.6, 0.7), 'panic': (-0.7, 0.8), 'risk': (-0.3, 0.4),
+    'risky': (-0.4, 0.6), 'concern': (-0.4, 0.5), 'concerns': (-0.4, 0.5), 'warning': (-0.4, 0.5),
+    'worst': (-0.9, 0.7), 'fraud': (-0.9, 0.6), 'collapse': (-0.8, 0.5), 'collapsed': (-0.8, 0.5),
+    'uncertainty': (-0.3, 0.5), 'trouble': (-0.5, 0.5)
+}
+
+NEGATORS = ['not', 'no', 'never', 'without', "isn't", "aren't", "wasn't", "won't", "don't",
+            "doesn't", "didn't", "can't", 'cannot', 'hardly']
+NEGATION_PREFIX = 'not_'
+NEGATION_FACTOR = -0.5  # TextBlob-style: flip and dampen a negated term
+NEGATION_SCOPE = 2  # words after a negator that are negated
+
+# The scope is captured in a lookahead, so a negator inside another one's scope is still found
+NEGATION_PATTERN = re.compile(
+    r"\b(?:%s)\s+(?=((?:[\w']+\s*){1,%d}))" % ('|'.join(re.escape(n) for n in NEGATORS), NEGATION_SCOPE)
+)
+WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def _trie_regex(terms):
+    """Alternation of terms factored on shared prefixes, so matching does not try every term at each position"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:%s)' % '|'.join(branches)
+        # Prefer the longer match, fall back to the term ending here
+        return '(?:%s)?' % pattern if end else pattern
+
+    return build(trie)
+
+
+def negation_scope(text):
+    """
+    Start offsets of the words in text that follow a negator closely enough
+    to be negated. A scope ends at punctuation or at the next negator,
+    which opens its own scope.
+    """
+    scoped = set()
+    for match in NEGATION_PATTERN.finditer(text):
+        for word in WORD_PATTERN.finditer(match.group(1)):
+            if word.group(0) in NEGATORS:
+                break
+            scoped.add(match.start(1) + word.start())
+    return scoped
+
+
+class LexiconSentimentScorer:
+    """
+    Batch sentiment scoring with a crypto-aware weighted lexicon.
+
+    Texts are scanned for lexicon terms only (one compiled pattern,
+    longest phrase first) instead of
+    expanding every n-gram, the whole batch becomes one sparse
+    document-term matrix, and every text is scored by a single sparse
+    matrix product against the term weights. A term, phrase or single
+    word, that starts within NEGATION_SCOPE words of a negator is counted
+    as its negated variant, with its polarity flipped and dampened.
+    """
+
+    def __init__(self, lexicon=None):
+        lexicon = dict(lexicon or CRYPTO_LEXICON)
+        self.term_pattern = re.compile(r"(?<![\w'])%s(?![\w'])" % _trie_regex(lexicon))
+        for term, (polarity, subjectivity) in list(lexicon.items()):
+            lexicon[NEGATION_PREFIX + term] = (polarity * NEGATION_FACTOR, subjectivity)
+
+        self.terms = sorted(lexicon)
+        self.vectorizer = CountVectorizer(
+            vocabulary={term: index for index, term in enumerate(self.terms)},
+            analyzer=self._match_terms,
+            dtype=np.float32
+        )
+        # Columns: polarity weight, subjectivity weight, match indicator
+        self.weights = np.array(
+            [[lexicon[term][0], lexicon[term][1], 1.0] for term in self.terms],
+            dtype=np.float32
+        )
+
+    def _match_terms(self, text):
+        """Lexicon terms found in text, phrases normalised to single spaces and negated ones prefixed with not_"""
+        text = text.lower()
+        # Phrases are matched whole first, so negation cannot split them
+        negated = negation_scope(text)
+        return [
+            (NEGATION_PREFIX if match.start() in negated else '') + ' '.join(match.group(0).split())
+            for match in self.term_pattern.finditer(text)
+        ]
+
+    def score(self, texts):
+        """Return (polarity, subjectivity) NumPy arrays for a batch of texts"""
+        if not len(texts):
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        counts = self.vectorizer.transform(texts)
+        totals = counts @ self.weights
+        matches = np.maximum(totals[:, 2], 1.0)
+        polarity = np.clip(totals[:, 0] / matches, -1.0, 1.0)
+        subjectivity = np.clip(totals[:, 1] / matches, 0.0, 1.0)
+        return polarity, subjectivity
+
+    def analyze_text(self, texts):
+        """Score texts and return SentimentAnalyzer-style result dicts"""
+        polarity, subjectivity = self.score(texts)
+        return [
+            {
+                'text': text,
+                'polarity': float(p),
+                'subjectivity': float(s),
+                'is_bullish': bool(p > 0.2),
+                'is_bearish': bool(p < -0.2)
+            }
+            for text, p, s in zip(texts, polarity, subjectivity)
+        ]
@@ -3,14 +3,26 @@ import pandas as pd
 import numpy as np
 import logging
 from data_collection.news_scraper import NewsScraper
+from config import Config
+from utils.compact import memory_usage
 
 logger = logging.getLogger('crypto_analyzer.sentiment_analyzer')
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, engine=None):
         logger.debug("Initializing SentimentAnalyzer")
         self.sentiment_scores = []
+        # Scored posts from SocialMediaCollector, separate from the news scores
+        self.social_scores = []
         self.news_scraper = NewsScraper()
+        self.engine = engine or Config.SENTIMENT_ENGINE
+        self.lexicon_scorer = None
+        if self.engine == 'lexicon':
+            # Imported here so the TextBlob path does not pay for scikit-learn
+            from analysis.lexicon_sentiment import LexiconSentimentScorer
+            self.lexicon_scorer = LexiconSentimentScorer()
+        elif self.engine != 'textblob':
+            raise ValueError(f"Unknown sentiment engine: {self.engine}")
 
     def analyze_text(self, texts):
         """
@@ -18,6 +30,11 @@ class SentimentAnalyzer:
         Returns sentiment scores with crypto-specific context
         """
         logger.info(f"Starting sentiment analysis for {len(texts)} texts")
+        if self.lexicon_scorer is not None:
+            sentiments = self.lexicon_scorer.analyze_text(texts)
+            logger.info("Completed sentiment analysis")
+            return sentiments
+
         sentiments = []
         
         for i, text in enumerate(texts, 1):
@@ -53,6 +70,17 @@ class SentimentAnalyzer:
         logger.info(f"Overall market sentiment: {sentiment}")
         return sentiment 
 
+    def memory_usage(self):
+        """Bytes held by sentiment scores"""
+        return memory_usage((self.sentiment_scores, self.social_scores))
+
+    def checkpoint_state(self):
+        """Sentiment scores for the stage checkpoint"""
+        return {'sentiment_scores': self.sentiment_scores} if self.sentiment_scores else None
+
+    def restore_checkpoint(self, state):
+        self.sentiment_scores = state['sentiment_scores']
+
     def run(self):
         """Main execution method"""
         logger.info("Running sentiment analysis pipeline")
@@ -61,4 +89,6 @@ class SentimentAnalyzer:
             logger.warning("No news data available for analysis")
             return
 
-        self.sentiment_scores = self.analyze_text([article['content'] for article in news_data]) 
\ No newline at end of file
+        # Prefer the full page body when ArticleFetcher retrieved one
+        self.sentiment_scores = self.analyze_text(
+            [article.get('full_content') or article['content'] for article in news_data]) 
\ No newline at end of file
@@ -0,0 +1,303 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import Config
+from analysis.technical_analyzer import BEARISH_SIGNALS, BULLISH_SIGNALS, TechnicalAnalyzer
+from data_collection.price_collector import PriceCollector
+from data_collection.resampler import timeframe_to_timedelta
+from utils.compact import CompactFrame
+from utils.shared_arrays import SharedArrays
+
+logger = logging.getLogger('crypto_analyzer.sharded_pipeline')
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+INDICATOR_NAMES = ['rsi', 'ma_short', 'ma_long', 'macd', 'macd_signal', 'macd_hist',
+                   'bb_upper', 'bb_middle', 'bb_lower', 'obv']
+SIGNAL_NAMES = BULLISH_SIGNALS + BEARISH_SIGNALS
+STABLECOINS = {'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'FDUSD', 'USDE', 'USDD', 'PYUSD'}
+
+STATUS_PENDING, STATUS_OK, STATUS_FAILED = 0, 1, -1
+
+# Per worker process: collector and analyzer kept warm across cycles
+_worker_state = {}
+
+
+def top_coin_pairs(count=None, quote='USDT', coingecko=None):
+    """
+    BASE/quote pairs for the TOP_COINS_COUNT largest coins by market cap,
+    stablecoins excluded. Falls back to Config.CRYPTO_PAIRS when CoinGecko
+    is unavailable.
+    """
+    count = count or Config.TOP_COINS_COUNT
+    try:
+        from pycoingecko import CoinGeckoAPI
+        from utils.metrics import metrics
+
+        with metrics.api_call('coingecko'):
+            coins = (coingecko or CoinGeckoAPI()).get_coins_markets(vs_currency='usd', order='market_cap_desc', per_page=count)
+        pairs = [f"{coin['symbol'].upper()}/{quote}" for coin in coins
+                 if coin['symbol'].upper() not in STABLECOINS]
+        if pairs:
+            return pairs
+    except Exception as e:
+        logger.warning(f"Could not load top coins, using CRYPTO_PAIRS: {str(e)}")
+    return list(Config.CRYPTO_PAIRS)
+
+
+def bars_for_history(timeframe=None, days=None):
+    """Bars of timeframe in the HISTORICAL_DAYS window, plus the partial bar"""
+    timeframe = timeframe or Config.TIMEFRAME
+    days = days or Config.HISTORICAL_DAYS
+    return int(pd.Timedelta(days=days) / timeframe_to_timedelta(timeframe)) + 2
+
+
+def _run_shard(layout, rows, exchange_factory=None, collector_setup=None):
+    """
+    Worker: collect and analyze one shard of pairs and write the results
+    into the shared arrays at their rows. collector_setup, if given, is
+    applied to the worker's PriceCollector once it is built.
+    Returns a small status dict.
+    """
+    start = time.perf_counter()
+    if 'collector' not in _worker_state:
+        collector = PriceCollector()
+        if exchange_factory is not None:
+            collector.exchange = exchange_factory()
+        if collector_setup is not None:
+            collector_setup(collector)
+        analyzer = TechnicalAnalyzer()
+        analyzer.price_collector = collector
+        _worker_state.update(collector=collector, analyzer=analyzer)
+    collector = _worker_state['collector']
+    analyzer = _worker_state['analyzer']
+
+    arrays = SharedArrays.attach(layout)
+    failed = []
+    try:
+        capacity = arrays['timestamps'].shape[1]
+        for row, pair in rows:
+            try:
+                # One pair at a time, so a delisted symbol does not fail the whole shard
+                collector.pairs = [pair]
+                df = (collector.collect_prices() or {}).get(pair)
+                if df is None or df.empty:
+                    raise ValueError("no price data")
+                indicators = analyzer.calculate_indicators(df, pair=pair)
+                if indicators is None:
+                    raise ValueError("indicator calculation failed")
+                signals = analyzer.generate_signals(df, indicators)['signals']
+
+                n = min(len(df), capacity)
+                arrays['timestamps'][row, :n] = df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)[-n:]
+                arrays['prices'][row, :n] = df[PRICE_FIELDS].to_numpy(dtype=np.float32)[-n:]
+                for i, name in enumerate(INDICATOR_NAMES):
+                    arrays['indicators'][row, i, :n] = indicators[name][-n:]
+                for i, name in enumerate(SIGNAL_NAMES):
+                    arrays['signals'][row, i, :n] = signals[name][-n:]
+                arrays['lengths'][row] = n
+                arrays['status'][row] = STATUS_OK
+            except Exception as e:
+                arrays['lengths'][row] = 0
+                arrays['status'][row] = STATUS_FAILED
+                failed.append((pair, str(e)))
+    finally:
+        arrays.close()
+
+    return {'pid': os.getpid(), 'pairs': len(rows), 'failed': failed,
+            'seconds': round(time.perf_counter() - start, 3)}
+
+
+class ShardedPipeline:
+    """
+    Runs price collection and technical analysis for a large universe
+    across worker processes, one contiguous shard of pairs per worker.
+
+    Workers write candles, indicators and signals into shared-memory
+    arrays laid out as pair x bar (x field), so nothing but a short
+    status dict is pickled back. The parent then exposes each pair's
+    rows as DataFrame and CompactFrame views on that memory, in the same
+    shape PriceCollector and TechnicalAnalyzer results have, without
+    copying.
+
+    Every run writes into a freshly allocated block set, so views published
+    by the previous run are never overwritten while still being read. The
+    previous set is unlinked straight away and unmapped once its views have
+    been replaced. Without fixed pairs, the top-coins universe is reloaded
+    on each run.
+    """
+
+    def __init__(self, price_collector=None, technical_analyzer=None, pairs=None,
+                 workers=None, capacity=None, exchange_factory=None, collector_setup=None):
+        logger.debug("Initializing ShardedPipeline")
+        self.price_collector = price_collector
+        self.technical_analyzer = technical_analyzer
+        self.fixed_pairs = pairs
+        self.pairs = pairs
+        self.workers = workers or Config.SHARD_WORKERS or os.cpu_count() or 1
+        self.capacity = capacity or bars_for_history()
+        self.exchange_factory = exchange_factory
+        # Picklable callable run on each worker's PriceCollector, e.g. to route it through a local server
+        self.collector_setup = collector_setup
+        # CoinGecko client for the top-coins universe, None for a default one
+        self.coingecko = None
+        self.arrays = None
+        self.pool = None
+        self.last_run = {}
+        self._retired = []
+        # (price_collector, technical_analyzer) -> pairs published into them
+        self._published = {}
+
+    def start(self):
+        """Spawn the worker processes ahead of the first run"""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+            # Worker start-up (interpreter, pandas, TA-Lib imports) happens here, not in run()
+            for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+        return self
+
+    def _allocate(self, n_pairs):
+        specs = {
+            'timestamps': ((n_pairs, self.capacity), np.int64),
+            'prices': ((n_pairs, self.capacity, len(PRICE_FIELDS)), np.float32),
+            'indicators': ((n_pairs, len(INDICATOR_NAMES), self.capacity), np.float32),
+            'signals': ((n_pairs, len(SIGNAL_NAMES), self.capacity), np.bool_),
+            'lengths': ((n_pairs,), np.int32),
+            'status': ((n_pairs,), np.int8)
+        }
+        if self.arrays is not None:
+            # Views from the previous run may still be in use; free the memory once they are gone
+            self.arrays.unlink()
+            self._retired.append(self.arrays)
+        self._retired = [arrays for arrays in self._retired if not arrays.close()]
+        self.arrays = SharedArrays.create(specs)
+        logger.info(f"Allocated {self.arrays.nbytes / 2**20:.1f} MiB of shared memory for {n_pairs} pairs")
+        return self.arrays
+
+    def run_shards(self):
+        """Collect and analyze every pair across the worker processes"""
+        self.pairs = list(self.fixed_pairs) if self.fixed_pairs is not None else top_coin_pairs(coingecko=self.coingecko)
+        arrays = self._allocate(len(self.pairs))
+        self.start()
+
+        start = time.perf_counter()
+        shards = [
+            [(int(row), self.pairs[row]) for row in rows]
+            for rows in np.array_split(np.arange(len(self.pairs)), self.workers) if len(rows)
+        ]
+        futures = [self.pool.submit(_run_shard, arrays.layout, shard, self.exchange_factory,
+                                     self.collector_setup) for shard in shards]
+        shard_stats = []
+        for future in futures:
+            try:
+                shard_stats.append(future.result())
+            except Exception as e:
+                logger.error(f"Shard failed: {str(e)}", exc_info=True)
+        for stats in shard_stats:
+            for pair, error in stats['failed']:
+                logger.warning(f"Sharded analysis of {pair} failed: {error}")
+
+        self.last_run = {
+            'pairs': len(self.pairs),
+            'workers': self.workers,
+            'shards': shard_stats,
+            'ok': int((arrays['status'] == STATUS_OK).sum()),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+        logger.info(f"Sharded run: {self.last_run['ok']}/{len(self.pairs)} pairs on "
+                    f"{self.workers} workers in {self.last_run['seconds']}s")
+        return self.last_run
+
+    def _row(self, pair):
+        row = self.pairs.index(pair)
+        if self.arrays['status'][row] != STATUS_OK:
+            return row, 0
+        return row, int(self.arrays['lengths'][row])
+
+    def frame(self, pair):
+        """OHLCV DataFrame for a pair, viewing the shared arrays"""
+        row, n = self._row(pair)
+        if not n:
+            return None
+        df = pd.DataFrame(self.arrays['prices'][row, :n], columns=PRICE_FIELDS, copy=False)
+        df.insert(0, 'timestamp', self.arrays['timestamps'][row, :n].view('datetime64[ns]'))
+        return df
+
+    def analysis(self, pair):
+        """TechnicalAnalyzer.analyze_pair-shaped result for a pair, viewing the shared arrays"""
+        row, n = self._row(pair)
+        if not n:
+            return None
+        index = self.arrays['timestamps'][row, :n] // 1_000_000
+        indicators = CompactFrame(index, {
+            name: self.arrays['indicators'][row, i, :n] for i, name in enumerate(INDICATOR_NAMES)})
+        signals = CompactFrame(index, {
+            name: self.arrays['signals'][row, i, :n] for i, name in enumerate(SIGNAL_NAMES)})
+        bullish = sum(bool(signals[name][-1]) for name in BULLISH_SIGNALS)
+        bearish = sum(bool(signals[name][-1]) for name in BEARISH_SIGNALS)
+        return {
+            'indicators': indicators,
+            'signals': {
+                'signals': signals,
+                'bullish_count': bullish,
+                'bearish_count': bearish,
+                'overall_bias': 'bullish' if bullish > bearish else 'bearish'
+            },
+            'last_close': float(self.arrays['prices'][row, n - 1, PRICE_FIELDS.index('close')]),
+            'last_updated': pd.Timestamp(int(self.arrays['timestamps'][row, n - 1]))
+        }
+
+    def apply(self, price_collector=None, technical_analyzer=None):
+        """
+        Publish shared-memory results through the collector and analyzer
+        downstream stages read. Pairs that failed this run or left the
+        universe are removed, so no previous-cycle data is reported as current.
+        """
+        price_collector = price_collector or self.price_collector
+        technical_analyzer = technical_analyzer or self.technical_analyzer
+        published = set()
+        for pair in self.pairs:
+            df = self.frame(pair)
+            if df is None:
+                continue
+            published.add(pair)
+            if price_collector is not None:
+                price_collector.collected_prices[pair] = df
+                price_collector.timeframe_prices[pair] = {Config.TIMEFRAME: df}
+            if technical_analyzer is not None:
+                technical_analyzer.analysis_results[pair] = self.analysis(pair)
+
+        targets = (id(price_collector), id(technical_analyzer))
+        for pair in self._published.get(targets, set()) - published:
+            if price_collector is not None:
+                price_collector.collected_prices.pop(pair, None)
+                price_collector.timeframe_prices.pop(pair, None)
+            if technical_analyzer is not None:
+                technical_analyzer.analysis_results.pop(pair, None)
+        self._published[targets] = published
+
+    def memory_usage(self):
+        """Bytes of shared memory held for results"""
+        return self.arrays.nbytes if self.arrays is not None else 0
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for arrays in self._retired + ([self.arrays] if self.arrays is not None else []):
+            arrays.close()
+            arrays.unlink()
+        self._retired = []
+        self.arrays = None
+
+    def run(self):
+        """Main execution method"""
+        logger.info("Running sharded collection and technical analysis")
+        self.run_shards()
+        self.apply()
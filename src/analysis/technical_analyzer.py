@@ -3,14 +3,31 @@ import numpy as np
 import talib
 import logging
 from data_collection.price_collector import PriceCollector
+from analysis.indicator_cache import indicator_cache, fingerprint_frame
+from utils.compact import epoch_ms_index, memory_usage, retain_columns
+from utils.metrics import metrics
+from config import Config
 
 logger = logging.getLogger('crypto_analyzer.technical_analyzer')
 
+BULLISH_SIGNALS = ['rsi_oversold', 'ma_crossover', 'macd_crossover', 'price_below_bb']
+BEARISH_SIGNALS = ['rsi_overbought', 'ma_crossunder', 'macd_crossunder', 'price_above_bb']
+
+
+def _float32(result):
+    """Cast a TA-Lib output, or tuple of outputs, to float32 for caching"""
+    if isinstance(result, tuple):
+        return tuple(values.astype(np.float32) for values in result)
+    return result.astype(np.float32)
+
 class TechnicalAnalyzer:
     def __init__(self):
         logger.debug("Initializing TechnicalAnalyzer")
         self.price_collector = PriceCollector()
         self.analysis_results = {}
+        self.cache = indicator_cache
+        metrics.register_cache('indicators', self.cache.stats)
+        metrics.register_memory('indicator_cache', self.cache.memory_usage)
         
         # Define technical analysis parameters
         self.params = {
@@ -24,41 +41,70 @@ class TechnicalAnalyzer:
             'bbands_dev': 2
         }
 
-    def calculate_indicators(self, df):
-        """Calculate technical indicators for a given price DataFrame"""
+    def _cached(self, pair, timeframe, fingerprint, indicator, params, compute):
+        """Look up an indicator in the shared cache, computing it on a miss"""
+        key = self.cache.make_key(pair, timeframe, indicator, params, fingerprint)
+        return self.cache.get_or_compute(key, compute)
+
+    def calculate_indicators(self, df, pair=None, timeframe=None):
+        """
+        Calculate technical indicators for a given price DataFrame.
+        Returns a dict of float32 arrays aligned with the rows of df.
+        """
         try:
             indicators = {}
-            
+            pair = pair or '*'
+            timeframe = timeframe or Config.TIMEFRAME
+            fingerprint = fingerprint_frame(df)
+            # TA-Lib needs float64 input; prices may be stored as float32
+            close = df['close'].to_numpy(dtype=np.float64)
+
             # RSI (Relative Strength Index)
-            indicators['rsi'] = talib.RSI(df['close'], 
-                                        timeperiod=self.params['rsi_period'])
+            indicators['rsi'] = self._cached(
+                pair, timeframe, fingerprint, 'rsi',
+                {'timeperiod': self.params['rsi_period']},
+                lambda: _float32(talib.RSI(close, timeperiod=self.params['rsi_period'])))
 
             # Moving Averages
-            indicators['ma_short'] = talib.SMA(df['close'], 
-                                             timeperiod=self.params['ma_short'])
-            indicators['ma_long'] = talib.SMA(df['close'], 
-                                            timeperiod=self.params['ma_long'])
+            indicators['ma_short'] = self._cached(
+                pair, timeframe, fingerprint, 'sma',
+                {'timeperiod': self.params['ma_short']},
+                lambda: _float32(talib.SMA(close, timeperiod=self.params['ma_short'])))
+            indicators['ma_long'] = self._cached(
+                pair, timeframe, fingerprint, 'sma',
+                {'timeperiod': self.params['ma_long']},
+                lambda: _float32(talib.SMA(close, timeperiod=self.params['ma_long'])))
 
             # MACD (Moving Average Convergence Divergence)
-            macd, signal, hist = talib.MACD(df['close'],
-                                          fastperiod=self.params['macd_fast'],
-                                          slowperiod=self.params['macd_slow'],
-                                          signalperiod=self.params['macd_signal'])
+            macd_params = {
+                'fastperiod': self.params['macd_fast'],
+                'slowperiod': self.params['macd_slow'],
+                'signalperiod': self.params['macd_signal']
+            }
+            macd, signal, hist = self._cached(
+                pair, timeframe, fingerprint, 'macd', macd_params,
+                lambda: _float32(talib.MACD(close, **macd_params)))
             indicators['macd'] = macd
             indicators['macd_signal'] = signal
             indicators['macd_hist'] = hist
 
             # Bollinger Bands
-            upper, middle, lower = talib.BBANDS(df['close'],
-                                              timeperiod=self.params['bbands_period'],
-                                              nbdevup=self.params['bbands_dev'],
-                                              nbdevdn=self.params['bbands_dev'])
+            bbands_params = {
+                'timeperiod': self.params['bbands_period'],
+                'nbdevup': self.params['bbands_dev'],
+                'nbdevdn': self.params['bbands_dev']
+            }
+            upper, middle, lower = self._cached(
+                pair, timeframe, fingerprint, 'bbands', bbands_params,
+                lambda: _float32(talib.BBANDS(close, **bbands_params)))
             indicators['bb_upper'] = upper
             indicators['bb_middle'] = middle
             indicators['bb_lower'] = lower
 
             # Volume indicators
-            indicators['obv'] = talib.OBV(df['close'], df['volume'])
+            indicators['obv'] = self._cached(
+                pair, timeframe, fingerprint, 'obv', {},
+                lambda: _float32(talib.OBV(close, df['volume'].to_numpy(dtype=np.float64))))
             
             return indicators
             
@@ -67,7 +113,11 @@ class TechnicalAnalyzer:
             return None
 
     def generate_signals(self, df, indicators):
-        """Generate trading signals based on technical indicators"""
+        """
+        Generate trading signals based on technical indicators.
+        Signals are boolean arrays per bar; counts and bias describe the latest bar.
+        """
+        close = df['close'].to_numpy()
         signals = {
             'rsi_oversold': indicators['rsi'] < 30,  # RSI oversold signal
             'rsi_overbought': indicators['rsi'] > 70,  # RSI overbought signal
@@ -75,25 +125,14 @@ class TechnicalAnalyzer:
             'ma_crossunder': indicators['ma_short'] < indicators['ma_long'],  # Death cross
             'macd_crossover': indicators['macd'] > indicators['macd_signal'],  # MACD bullish
             'macd_crossunder': indicators['macd'] < indicators['macd_signal'],  # MACD bearish
-            'price_above_bb': df['close'] > indicators['bb_upper'],  # Price above upper BB
-            'price_below_bb': df['close'] < indicators['bb_lower']   # Price below lower BB
+            'price_above_bb': close > indicators['bb_upper'],  # Price above upper BB
+            'price_below_bb': close < indicators['bb_lower']   # Price below lower BB
         }
         
-        # Generate overall signal
-        bullish_signals = sum([
-            signals['rsi_oversold'],
-            signals['ma_crossover'],
-            signals['macd_crossover'],
-            signals['price_below_bb']
-        ])
-        
-        bearish_signals = sum([
-            signals['rsi_overbought'],
-            signals['ma_crossunder'],
-            signals['macd_crossunder'],
-            signals['price_above_bb']
-        ])
-        
+        # Generate overall signal from the latest bar
+        bullish_signals = sum(bool(signals[name][-1]) for name in BULLISH_SIGNALS) if len(close) else 0
+        bearish_signals = sum(bool(signals[name][-1]) for name in BEARISH_SIGNALS) if len(close) else 0
+
         return {
             'signals': signals,
             'bullish_count': bullish_signals,
@@ -101,26 +140,42 @@ class TechnicalAnalyzer:
             'overall_bias': 'bullish' if bullish_signals > bearish_signals else 'bearish'
         }
 
-    def analyze_pair(self, pair, df):
+    def analyze_pair(self, pair, df, timeframe=None):
         """Analyze a single trading pair"""
         logger.info(f"Analyzing {pair}")
         
         # Calculate technical indicators
-        indicators = self.calculate_indicators(df)
+        indicators = self.calculate_indicators(df, pair=pair, timeframe=timeframe)
         if indicators is None:
             return None
             
         # Generate trading signals
         signals = self.generate_signals(df, indicators)
-        
+
+        # Store indicators and signals compactly on one shared candle time
+        # index, keeping only the configured tail of history
+        indicators, signals['signals'] = retain_columns(
+            epoch_ms_index(df['timestamp']), indicators, signals['signals'])
+
         # Combine results
         return {
             'indicators': indicators,
             'signals': signals,
-            'last_close': df['close'].iloc[-1],
+            'last_close': float(df['close'].iloc[-1]),
             'last_updated': df['timestamp'].iloc[-1]
         }
 
+    def memory_usage(self):
+        """Bytes held by analysis results"""
+        return memory_usage(self.analysis_results)
+
+    def checkpoint_state(self):
+        """Analysis results for the stage checkpoint"""
+        return {'analysis_results': self.analysis_results} if self.analysis_results else None
+
+    def restore_checkpoint(self, state):
+        self.analysis_results = state['analysis_results']
+
     def run(self):
         """Main execution method"""
         logger.info("Running technical analysis pipeline")
@@ -135,3 +190,5 @@ class TechnicalAnalyzer:
         for pair, df in price_data.items():
             self.analysis_results[pair] = self.analyze_pair(pair, df)
             logger.info(f"Completed analysis for {pair}")
+
+        logger.debug(f"Indicator cache stats: {self.cache.stats()}")
@@ -0,0 +1,262 @@
+import base64
+import functools
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler
+from benchmarks.fake_servers import LocalServer
+
+logger = logging.getLogger('crypto_analyzer.benchmarks.cassette')
+
+# Never written to a cassette and ignored when matching requests
+SECRET_PARAMS = {'apikey', 'api_key', 'x_cg_pro_api_key', 'signature', 'timestamp', 'recvwindow'}
+# Ignored when matching: clients derive them from the current time (now - HISTORICAL_DAYS),
+# so they differ between recording and replay. Paged requests that differ
+# only in these replay in recorded order, as repeats of one key.
+TIME_WINDOW_PARAMS = {'since', 'starttime', 'endtime', 'from', 'to', 'until'}
+FORWARDED_HEADERS = {'accept', 'content-type', 'user-agent', 'x-mbx-apikey', 'x-cg-pro-api-key', 'x-api-key'}
+
+REPLAY_PROFILES = {
+    'instant': {'latency': 0.0, 'jitter': 0.0, 'error_rate': 0.0},
+    'lan': {'latency': 0.005, 'jitter': 0.002, 'error_rate': 0.0},
+    'wan': {'latency': 0.15, 'jitter': 0.1, 'error_rate': 0.0},
+    'flaky': {'latency': 0.3, 'jitter': 0.25, 'error_rate': 0.05, 'error_status': 503},
+    'rate_limited': {'latency': 0.1, 'jitter': 0.05, 'error_rate': 0.2, 'error_status': 429}
+}
+
+
+def proxied(server_url, url):
+    """Rewrite an https://host/path URL to go through the CassetteServer at server_url"""
+    parsed = urllib.parse.urlsplit(url)
+    return f"{server_url}/{parsed.netloc}{parsed.path}" + (f"?{parsed.query}" if parsed.query else '')
+
+
+def request_key(method, host, path, query):
+    """Match key for a request, with secrets and time-window params removed"""
+    params = sorted(
+        (name, value) for name, value in urllib.parse.parse_qsl(query, keep_blank_values=True)
+        if name.lower() not in SECRET_PARAMS and name.lower() not in TIME_WINDOW_PARAMS
+    )
+    return f"{method} {host}{path}?{urllib.parse.urlencode(params)}"
+
+
+class Cassette:
+    """Recorded provider responses, stored as a gzipped JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.interactions = defaultdict(list)
+        self._replay_positions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def load(self):
+        with gzip.open(self.path, 'rt') as f:
+            for interaction in json.load(f):
+                self.interactions[interaction['key']].append(interaction)
+        logger.info(f"Loaded {len(self)} interactions from {self.path}")
+        return self
+
+    def save(self):
+        flat = [interaction for entries in self.interactions.values() for interaction in entries]
+        with gzip.open(self.path, 'wt') as f:
+            json.dump(flat, f, separators=(',', ':'))
+        logger.info(f"Saved {len(flat)} interactions to {self.path}")
+
+    def record(self, key, status, content_type, body):
+        try:
+            stored_body, encoding = body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            stored_body, encoding = base64.b64encode(body).decode('ascii'), 'base64'
+        with self._lock:
+            self.interactions[key].append({
+                'key': key,
+                'status': status,
+                'content_type': content_type,
+                'encoding': encoding,
+                'body': stored_body
+            })
+
+    def next_response(self, key):
+        """Return (status, content_type, body) for a key, cycling through repeats"""
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                return None
+            position = self._replay_positions[key]
+            self._replay_positions[key] = position + 1
+            interaction = entries[position % len(entries)]
+
+        body = interaction['body']
+        body = base64.b64decode(body) if interaction['encoding'] == 'base64' else body.encode('utf-8')
+        return interaction['status'], interaction['content_type'], body
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.interactions.values())
+
+
+class CassetteServer(LocalServer):
+    """
+    Local stand-in endpoint for every provider.
+
+    Clients are pointed at http://127.0.0.1:<port>/<upstream host>/<path>.
+    In record mode requests are forwarded to https://<upstream host>/<path>
+    and the responses stored in the cassette; in replay mode responses come
+    from the cassette, shaped by a latency/jitter/error-injection profile.
+    """
+
+    def __init__(self, cassette, mode='replay', latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, seed=0, timeout=30):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout = timeout
+        self.stats = defaultdict(int)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def from_profile(cls, cassette, profile, **kwargs):
+        return cls(cassette, mode='replay', **{**REPLAY_PROFILES[profile], **kwargs})
+
+    def proxied(self, url):
+        """Rewrite an https://host/path URL to go through this server"""
+        return proxied(self.url, url)
+
+    def _shape(self):
+        """Sleep per the replay profile and decide whether to inject an error"""
+        with self._rng_lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            inject_error = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return inject_error
+
+    def _forward(self, method, host, path, query, headers, body):
+        url = f"https://{host}{path}" + (f"?{query}" if query else '')
+        forwarded = {name: value for name, value in headers.items() if name.lower() in FORWARDED_HEADERS}
+        request = urllib.request.Request(url, data=body, headers=forwarded, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.headers.get('Content-Type', ''), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Content-Type', ''), e.read()
+
+    def handle(self, method, raw_path, headers, body):
+        parsed = urllib.parse.urlsplit(raw_path)
+        host, _, path = parsed.path.lstrip('/').partition('/')
+        path = '/' + path
+        key = request_key(method, host, path, parsed.query)
+
+        if self.mode == 'record':
+            status, content_type, payload = self._forward(method, host, path, parsed.query, headers, body)
+            self.cassette.record(key, status, content_type, payload)
+            self.stats['recorded'] += 1
+            return status, content_type, payload
+
+        if self._shape():
+            self.stats['injected_errors'] += 1
+            return self.error_status, 'application/json', b'{"error": "injected"}'
+
+        response = self.cassette.next_response(key)
+        if response is None:
+            self.stats['misses'] += 1
+            logger.warning(f"No recorded response for {key}")
+            return 404, 'application/json', b'{"error": "not recorded"}'
+        self.stats['replayed'] += 1
+        return response
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                status, content_type, payload = server.handle(
+                    self.command, self.path, dict(self.headers), body)
+                self.send_response(status)
+                if content_type:
+                    self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        super().start()
+        logger.info(f"Cassette server ({self.mode}) listening on {self.url}")
+        return self
+
+    def stop(self):
+        super().stop()
+        if self.mode == 'record':
+            self.cassette.save()
+
+
+def _rewrite_urls(urls, server_url):
+    if isinstance(urls, dict):
+        return {name: _rewrite_urls(value, server_url) for name, value in urls.items()}
+    if isinstance(urls, str) and urls.startswith('https://'):
+        return proxied(server_url, urls)
+    return urls
+
+
+def route_price_collector(server_url, collector):
+    """
+    Point a PriceCollector's exchange, and every venue when it consolidates
+    several, at the CassetteServer at server_url. Module-level so it can be
+    pickled to sharded worker processes.
+    """
+    exchanges = [collector.exchange]
+    if collector.multi_exchange is not None:
+        exchanges += list(collector.multi_exchange.exchanges.values())
+    for exchange in exchanges:
+        exchange.urls['api'] = _rewrite_urls(exchange.urls['api'], server_url)
+
+
+def route_through(server, news_scraper=None, price_collector=None, market_data_agent=None,
+                  sharded_pipeline=None):
+    """Point pipeline clients at a CassetteServer instead of the live providers"""
+    if news_scraper is not None:
+        from data_collection.article_fetcher import ArticleFetcher
+
+        news_scraper.base_url = server.proxied(news_scraper.base_url)
+        # Empty page cache: recording captures every page, replay never serves pages from earlier live runs
+        news_scraper.article_fetcher = ArticleFetcher(':memory:', rewrite_url=server.proxied)
+    if price_collector is not None:
+        route_price_collector(server.url, price_collector)
+    if sharded_pipeline is not None:
+        sharded_pipeline.collector_setup = functools.partial(route_price_collector, server.url)
+        try:
+            from pycoingecko import CoinGeckoAPI
+        except ImportError:
+            # top_coin_pairs falls back to CRYPTO_PAIRS without it
+            CoinGeckoAPI = None
+        if CoinGeckoAPI is not None:
+            sharded_pipeline.coingecko = CoinGeckoAPI()
+            sharded_pipeline.coingecko.api_base_url = server.proxied(sharded_pipeline.coingecko.api_base_url)
+    if market_data_agent is not None:
+        market_data_agent.cg.api_base_url = server.proxied(market_data_agent.cg.api_base_url)
+        market_data_agent.binance.API_URL = server.proxied(market_data_agent.binance.API_URL)
+        glassnode = market_data_agent.glassnode
+        for attribute in ('base_url', 'api_url', 'BASE_URL'):
+            if isinstance(getattr(glassnode, attribute, None), str):
+                setattr(glassnode, attribute, server.proxied(getattr(glassnode, attribute)))
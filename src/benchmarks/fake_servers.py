@@ -0,0 +1,326 @@
+import html
+import json
+import logging
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+logger = logging.getLogger('crypto_analyzer.benchmarks.fake_servers')
+
+
+class LocalServer:
+    """
+    Base for the local stand-in HTTP servers: serves the handler class from
+    _make_handler() on a free 127.0.0.1 port from a daemon thread, and
+    works as a context manager that starts and stops it.
+    """
+
+    _server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        raise NotImplementedError
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.debug(f"{type(self).__name__} listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeMarketServer(LocalServer):
+    """
+    Local stand-in for the exchange and NewsAPI endpoints.
+
+    Serves Binance-style klines at /klines, NewsAPI-style results at
+    /v2/everything and each article's page at /<host>/<path> of its URL
+    (see proxied) from pre-generated synthetic data, sleeping for
+    latency +/- jitter seconds per request.
+    """
+
+    def __init__(self, frames=None, articles=None, latency=0.0, jitter=0.0, seed=0):
+        self.frames = frames or {}
+        self.articles = articles or []
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._klines = {
+            symbol: self._to_klines(df) for symbol, df in self.frames.items()
+        }
+        self._pages = {
+            self._page_path(article['url']): self._to_page(article)
+            for article in self.articles if article.get('url')
+        }
+
+    @staticmethod
+    def _to_klines(df):
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+        return timestamps, values
+
+    @staticmethod
+    def _page_path(url):
+        parsed = urllib.parse.urlsplit(url)
+        return f"/{parsed.netloc}{parsed.path}"
+
+    @staticmethod
+    def _to_page(article):
+        paragraphs = ''.join(f"<p>{html.escape(sentence)}</p>" for sentence in article['content'].split('. '))
+        return f"<html><body><article><h1>{html.escape(article['title'])}</h1>{paragraphs}</article></body></html>"
+
+    def proxied(self, url):
+        """URL of an article's page on this server"""
+        return f"{self.url}{self._page_path(url)}"
+
+    def _delay(self):
+        with self._rng_lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def klines(self, symbol, start_time, limit):
+        timestamps, values = self._klines.get(symbol, (np.empty(0, np.int64), np.empty((0, 5))))
+        start = np.searchsorted(timestamps, start_time) if start_time is not None else 0
+        end = start + limit
+        return [[int(ts), *row] for ts, row in zip(timestamps[start:end], values[start:end].tolist())]
+
+    def everything(self, page_size):
+        return {
+            'status': 'ok',
+            'totalResults': len(self.articles),
+            'articles': self.articles[:page_size]
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                query = dict(urllib.parse.parse_qsl(parsed.query))
+                server._delay()
+
+                if parsed.path == '/klines':
+                    start_time = int(query['startTime']) if 'startTime' in query else None
+                    body = server.klines(query.get('symbol', ''), start_time,
+                                         int(query.get('limit', 500)))
+                elif parsed.path == '/v2/everything':
+                    body = server.everything(int(query.get('pageSize', len(server.articles) or 100)))
+                elif parsed.path in server._pages:
+                    payload = server._pages[parsed.path].encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                else:
+                    self.send_error(404)
+                    return
+
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+class FakeSocialFeedServer(LocalServer):
+    """
+    Local stand-in for a streaming social feed.
+    Serves /stream as newline-delimited JSON posts at up to rate posts per
+    second (0 means as fast as the client reads).
+    """
+
+    def __init__(self, posts, rate=0.0):
+        self.posts = posts
+        self.rate = rate
+
+    @property
+    def url(self):
+        return f"{super().url}/stream"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/stream':
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.end_headers()
+                interval = 1.0 / server.rate if server.rate else 0.0
+                try:
+                    for post in server.posts:
+                        # Stamp creation at send time so latency covers the whole path
+                        line = json.dumps({**post, 'created_at': time.time()}) + '\n'
+                        self.wfile.write(line.encode())
+                        if interval:
+                            time.sleep(interval)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+class HttpExchange:
+    """
+    Minimal ccxt-compatible client for FakeMarketServer, so PriceCollector
+    can run its real fetch path against the local server
+    """
+
+    id = 'fake'
+
+    def __init__(self, base_url, timeout=30, exchange_id=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        if exchange_id:
+            self.id = exchange_id
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=500):
+        params = {'symbol': symbol, 'interval': timeframe, 'limit': limit}
+        if since is not None:
+            params['startTime'] = since
+        url = f"{self.base_url}/klines?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+class FakeLLMServer(LocalServer):
+    """
+    Local stand-in for the Groq (OpenAI-compatible) chat completions endpoint.
+
+    Answers POST /openai/v1/chat/completions after latency +/- jitter seconds
+    plus generation time at tokens_per_second, and fails error_rate of the
+    requests with a 503. Keeps connections alive like the real API and counts
+    connections, peak concurrency and requests whose system message (the
+    shared prompt prefix) was already seen.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, tokens_per_second=0.0, completion_tokens=300,
+                 error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.prefix_hits = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        self._connections = set()
+        self._prefixes = set()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def connections(self):
+        return len(self._connections)
+
+    def complete(self, request):
+        """(status, body) for one chat completion request"""
+        messages = request.get('messages', [])
+        system = next((message['content'] for message in messages if message.get('role') == 'system'), '')
+        prompt_tokens = sum(len(message.get('content', '')) for message in messages) // 4 + 1
+        completion_tokens = min(request.get('max_tokens') or self.completion_tokens, self.completion_tokens)
+        with self._lock:
+            self.requests += 1
+            if system in self._prefixes:
+                self.prefix_hits += 1
+            self._prefixes.add(system)
+            failed = self._rng.random() < self.error_rate
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if self.tokens_per_second:
+            delay += completion_tokens / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+        if failed:
+            with self._lock:
+                self.errors += 1
+            return 503, {'error': {'message': 'Service unavailable', 'type': 'internal_server_error'}}
+        return 200, {
+            'id': f"chatcmpl-{self.requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', ''),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ' '.join(['analysis'] * completion_tokens)},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.split('?')[0] != '/openai/v1/chat/completions':
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server._connections.add(self.client_address)
+                    server._in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server._in_flight)
+                try:
+                    status, response = server.complete(json.loads(body))
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+                payload = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
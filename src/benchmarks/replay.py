@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from benchmarks.cassette import Cassette, CassetteServer, REPLAY_PROFILES, route_through
+from utils.metrics import metrics
+
+logger = logging.getLogger('crypto_analyzer.benchmarks.replay')
+
+PIPELINE_STAGES = ['news_scraper', 'price_collector', 'sentiment_analyzer',
+                   'technical_analyzer', 'report_generator']
+
+
+def run_pipeline(server, include_market_data=False):
+    """Run the full pipeline with every provider routed through server"""
+    from main import create_components, expand_stages
+
+    # Counts start from zero, so repeated runs in one process report only their own run
+    metrics.reset()
+    components = create_components()
+    route_through(server,
+                  news_scraper=components['news_scraper'],
+                  price_collector=components['price_collector'],
+                  sharded_pipeline=components.get('sharded_pipeline'))
+
+    try:
+        # Same stage substitution as main, so SHARD_WORKERS runs the sharded pipeline
+        for name in expand_stages(components, PIPELINE_STAGES):
+            with metrics.stage(name):
+                components[name].run()
+    finally:
+        components['report_generator'].close()
+        if 'sharded_pipeline' in components:
+            components['sharded_pipeline'].close()
+
+    if include_market_data:
+        from agent.market_data_agent import MarketDataAgent
+
+        agent = MarketDataAgent()
+        route_through(server, market_data_agent=agent)
+        with metrics.stage('market_data_agent'):
+            asyncio.run(agent.run())
+
+    return metrics.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay provider traffic for offline pipeline runs")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--cassette', required=True, help="Path of the .json.gz cassette")
+    parser.add_argument('--profile', choices=list(REPLAY_PROFILES), default='instant',
+                        help="Latency/jitter/error profile used in replay mode")
+    parser.add_argument('--latency', type=float, help="Override profile latency (seconds)")
+    parser.add_argument('--jitter', type=float, help="Override profile jitter (seconds)")
+    parser.add_argument('--error-rate', type=float, help="Override profile error rate (0-1)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--market-data', action='store_true', help="Also run MarketDataAgent")
+    parser.add_argument('--output', help="Write the run summary JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.mode == 'record':
+        server = CassetteServer(Cassette(args.cassette), mode='record')
+    else:
+        overrides = {
+            name: value for name, value in
+            (('latency', args.latency), ('jitter', args.jitter), ('error_rate', args.error_rate))
+            if value is not None
+        }
+        server = CassetteServer.from_profile(Cassette(args.cassette).load(), args.profile,
+                                             seed=args.seed, **overrides)
+
+    with server:
+        summary = run_pipeline(server, include_market_data=args.market_data)
+    summary['cassette'] = dict(server.stats)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+    logger.info(f"Cassette stats: {dict(server.stats)}")
+    return 1 if server.stats['misses'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
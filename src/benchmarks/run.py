@@ -0,0 +1,430 @@
+import argparse
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import sys
+import time
+import pandas as pd
+from config import Config
+from data_collection.resampler import timeframe_to_timedelta
+from benchmarks.synthetic import generate_universe, generate_news, generate_ticks
+from benchmarks.fake_servers import FakeLLMServer, FakeMarketServer, FakeSocialFeedServer, HttpExchange
+from benchmarks.runner import measure, write_results, load_results, compare
+
+logger = logging.getLogger('crypto_analyzer.benchmarks')
+
+# Case matrices per preset. series lists (pairs, candles) cases explicitly,
+# so the full preset spans 1-500 pairs and 1k-1M candles without crossing
+# them into universes too large to allocate; wide is the largest universe
+# for whole-market cases
+PRESETS = {
+    'quick': {
+        'series': [(1, 1000), (1, 10000), (10, 1000), (10, 10000)],
+        'wide': (10, 1000),
+        'articles': [100, 1000],
+        'latency': [0.0, 0.05],
+        'assets': [100, 500],
+        'ticks': 600,
+        'shards': {'pairs': 100, 'candles': 2000, 'workers': [1, 2, 4, 8]},
+        'research_assets': [20, 50],
+        'social_posts': [1000, 5000]
+    },
+    'full': {
+        'series': [(1, 1000), (1, 10000), (1, 100000), (1, 1000000),
+                   (10, 1000), (10, 10000), (10, 100000),
+                   (100, 1000), (100, 10000), (500, 1000)],
+        'wide': (500, 1000),
+        'articles': [100, 1000, 10000, 100000],
+        'latency': [0.0, 0.05, 0.2],
+        'assets': [100, 500, 1000],
+        'ticks': 3600,
+        'shards': {'pairs': 500, 'candles': 10000, 'workers': [1, 2, 4, 8, 16]},
+        'research_assets': [50, 100, 200],
+        'social_posts': [10000, 100000]
+    }
+}
+
+SENTIMENT_BATCH = 100
+
+
+def bench_technical(n_pairs, n_candles, repeats, cached=False):
+    from analysis.technical_analyzer import TechnicalAnalyzer
+
+    universe = generate_universe(n_pairs, n_candles)
+    analyzer = TechnicalAnalyzer()
+
+    def run():
+        latencies = []
+        for pair, df in universe.items():
+            start = time.perf_counter()
+            analyzer.analyze_pair(pair, df)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    if cached:
+        analyzer.cache.clear()
+        run()
+        setup = None
+    else:
+        setup = analyzer.cache.clear
+    return measure('technical', run, n_pairs * n_candles, repeats, setup=setup)
+
+
+def bench_sentiment(n_articles, repeats, engine='textblob'):
+    from analysis.sentiment_analyzer import SentimentAnalyzer
+
+    texts = [article['content'] for article in generate_news(n_articles)]
+    analyzer = SentimentAnalyzer(engine=engine)
+    batches = [texts[i:i + SENTIMENT_BATCH] for i in range(0, len(texts), SENTIMENT_BATCH)]
+
+    def run():
+        latencies = []
+        for batch in batches:
+            start = time.perf_counter()
+            analyzer.analyze_text(batch)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    return measure(f'sentiment_{engine}', run, n_articles, repeats)
+
+
+def bench_market(n_pairs, n_candles, n_articles, repeats):
+    from analysis.market_analyzer import MarketAnalyzer
+
+    analyzer = MarketAnalyzer()
+    analyzer.price_collector.collected_prices = generate_universe(n_pairs, n_candles)
+    analyzer.news_scraper = analyzer.sentiment_analyzer.news_scraper
+    analyzer.news_scraper.collected_news = generate_news(n_articles)
+    analyzer.technical_analyzer.price_collector = analyzer.price_collector
+    analyzer.technical_analyzer.run()
+    analyzer.sentiment_analyzer.run()
+
+    return measure('market', lambda: analyzer.run() and None, n_pairs, repeats)
+
+
+def bench_price_collector(n_pairs, n_candles, latency, repeats):
+    from data_collection.price_collector import PriceCollector
+
+    # Synthetic history ends now so the collector's lookback window covers it
+    end = pd.Timestamp.now(tz='UTC').tz_localize(None).floor('1min')
+    universe = generate_universe(n_pairs, n_candles, start=end - pd.Timedelta(minutes=n_candles - 1))
+
+    with FakeMarketServer(frames=universe, latency=latency) as server:
+        collector = PriceCollector()
+        collector.exchange = HttpExchange(server.url)
+        collector.pairs = list(universe)
+
+        def reset():
+            collector.resampler.base_frames.clear()
+            collector.resampler.derived_frames.clear()
+
+        def run():
+            collector.collect_prices()
+            return None
+
+        reset()
+        run()
+        fetched = sum(len(df) for df in collector.resampler.base_frames.values())
+        return measure('price_collector', run, fetched, repeats, setup=reset)
+
+
+def bench_multi_exchange(n_pairs, n_candles, repeats, slow_latency=2.0, timeout=1.0):
+    """Three venues with slightly different prices, one too slow for the per-venue timeout"""
+    from data_collection.multi_exchange import MultiExchangeCollector
+
+    universe = generate_universe(n_pairs, n_candles)
+    venues = {'fast': 0.0, 'medium': 0.02, 'slow': slow_latency}
+
+    with contextlib.ExitStack() as stack:
+        exchanges = []
+        for i, (venue, latency) in enumerate(venues.items()):
+            frames = {
+                pair: df.assign(**{column: df[column] * (1 + 0.001 * i) for column in ['open', 'high', 'low', 'close']},
+                                volume=df['volume'] * (1 + i))
+                for pair, df in universe.items()
+            }
+            server = stack.enter_context(FakeMarketServer(frames=frames, latency=latency))
+            exchanges.append(HttpExchange(server.url, exchange_id=venue))
+        # Synthetic history starts in 2024, so a page-scaled budget would never drop the slow venue
+        collector = MultiExchangeCollector(exchanges, timeout=timeout, page_time=0.0)
+        since_by_pair = {pair: df['timestamp'].iloc[0] for pair, df in universe.items()}
+
+        def run():
+            collector.collect(since_by_pair)
+            return None
+
+        result = measure('multi_exchange', run, n_pairs * n_candles, repeats)
+        result['venue_status'] = dict(collector.venue_status)
+        spreads = collector.spread_summary()
+        result['mean_spread_pct'] = (sum(pair['mean_spread_pct'] for pair in spreads.values()) / len(spreads)
+                                     if spreads else None)
+        collector.executor.shutdown(wait=False, cancel_futures=True)
+    return result
+
+
+def bench_sharded(n_pairs, n_candles, workers, repeats, scaling):
+    """
+    Sharded collection and analysis on worker processes. scaling holds the
+    single-worker run time, so cases report speedup and efficiency against it.
+    The fake exchange is served from this process, which also competes for a core.
+    """
+    from analysis.sharded_pipeline import ShardedPipeline
+
+    end = pd.Timestamp.now(tz='UTC').tz_localize(None).floor('1min')
+    universe = generate_universe(n_pairs, n_candles, start=end - pd.Timedelta(minutes=n_candles - 1))
+    state = {}
+
+    with FakeMarketServer(frames=universe) as server:
+        def setup():
+            # Fresh workers per run, so every run collects the full history
+            if 'pipeline' in state:
+                state['pipeline'].close()
+            state['pipeline'] = ShardedPipeline(pairs=list(universe), workers=workers,
+                                                exchange_factory=functools.partial(HttpExchange, server.url))
+            state['pipeline'].start()
+
+        def run():
+            state['pipeline'].run_shards()
+            return None
+
+        try:
+            result = measure('sharded', run, n_pairs * n_candles, repeats, setup=setup, track_memory=False)
+            result['pairs_ok'] = state['pipeline'].last_run['ok']
+            result['shared_bytes'] = state['pipeline'].memory_usage()
+        finally:
+            state['pipeline'].close()
+
+    if workers == 1:
+        scaling['seconds'] = result['run_seconds_median']
+    if scaling.get('seconds'):
+        result['speedup'] = scaling['seconds'] / result['run_seconds_median']
+        result['efficiency'] = result['speedup'] / workers
+    result['workers'] = workers
+    result['cpu_count'] = os.cpu_count()
+    return result
+
+
+def bench_research(n_assets, latency, repeats, tokens_per_minute=10**9, max_tokens=None, error_rate=0.0):
+    """
+    Per-asset research against the stand-in LLM endpoint. Latencies are per
+    asset request; server errors are retried by the client before an asset fails.
+    """
+    from agent.batch_research import BatchResearcher
+    from agent.researcher import ResearchAgent
+    from report import view_models
+
+    snapshots = {row['pair']: row for row in view_models.price_section(generate_universe(n_assets, 100))['pairs']}
+    state = {}
+
+    with FakeLLMServer(latency=latency, jitter=latency / 4, error_rate=error_rate) as server:
+        def setup():
+            state['researcher'] = BatchResearcher(ResearchAgent(base_url=server.url, api_key='benchmark'),
+                                                  tokens_per_minute=tokens_per_minute, max_tokens=max_tokens)
+
+        def run():
+            researcher = state['researcher']
+
+            async def batch():
+                try:
+                    await researcher.research_assets(snapshots)
+                finally:
+                    await researcher.agent.close()
+
+            asyncio.run(batch())
+            return list(researcher.latencies)
+
+        result = measure('research', run, n_assets, repeats, setup=setup, track_memory=False)
+        stats = state['researcher'].stats
+        result.update(
+            failed=stats['failed'],
+            tokens=stats['tokens'],
+            rate_limit_wait=stats['rate_limit_wait'],
+            server_errors=server.errors,
+            connections=server.connections,
+            peak_in_flight=server.peak_in_flight,
+            prefix_hit_rate=round(server.prefix_hits / server.requests, 3) if server.requests else 0.0
+        )
+    return result
+
+
+def bench_news(n_articles, latency, repeats):
+    """NewsAPI search plus full article pages, both served by the stand-in server"""
+    from data_collection.article_fetcher import ArticleFetcher
+    from data_collection.news_scraper import NewsScraper
+
+    with FakeMarketServer(articles=generate_news(n_articles), latency=latency) as server:
+        scraper = NewsScraper()
+        scraper.base_url = f"{server.url}/v2/everything"
+        # Requests without a key fail client-side; the stand-in accepts any
+        scraper.news_api_key = 'benchmark'
+        expected_bodies = n_articles if Config.FETCH_FULL_ARTICLES else 0
+
+        def setup():
+            # Empty page cache per run, so every run fetches every body
+            scraper.article_fetcher = ArticleFetcher(':memory:', rewrite_url=server.proxied)
+
+        def run():
+            articles = scraper.collect_news()
+            bodies = sum('full_content' in article for article in articles)
+            # Throughput is credited for n_articles, so a short run must fail the case
+            if len(articles) != n_articles or bodies != expected_bodies:
+                raise RuntimeError(f"Collected {len(articles)} articles and {bodies} bodies, "
+                                   f"expected {n_articles} and {expected_bodies}")
+            return None
+
+        return measure('news_scraper', run, n_articles, repeats, setup=setup)
+
+
+def bench_social(n_posts, repeats):
+    """Posts streamed from a local NDJSON feed through the bounded queue and micro-batch scorer"""
+    from data_collection.social_media import SocialMediaCollector
+
+    posts = [{'id': f"feed:{i}", 'platform': 'feed', 'text': article['title']}
+             for i, article in enumerate(generate_news(n_posts, sentences=(1, 1)))]
+    state = {}
+
+    def setup():
+        # Fresh collector per run, so no post is skipped as already seen
+        state['collector'] = SocialMediaCollector()
+
+    with FakeSocialFeedServer(posts) as server:
+        result = measure('social', lambda: asyncio.run(state['collector'].collect(feed_urls=[server.url])) and None,
+                         n_posts, repeats, setup=setup, track_memory=False)
+    # Post creation to score, from the last run
+    stats = state['collector'].stats()
+    result.update(scored=stats['scored'], max_queue_depth=stats['max_queue_depth'],
+                  post_latency_p50=stats['latency_p50'], post_latency_p95=stats['latency_p95'])
+    return result
+
+
+def bench_anomaly(n_assets, n_ticks, repeats):
+    """Whole-universe per-second updates; latency is per tick across all assets"""
+    from analysis.anomaly_detector import AnomalyDetector
+
+    prices, volumes, events = generate_ticks(n_assets, n_ticks)
+    symbols = [f"SYN{i}/USDT" for i in range(n_assets)]
+    start = pd.Timestamp('2024-01-01').value / 1e9
+    state = {}
+
+    def setup():
+        state['detector'] = AnomalyDetector(warmup=60, cooldown=60)
+        state['alerts'] = set()
+
+    def run():
+        detector = state['detector']
+        latencies = []
+        for tick in range(n_ticks):
+            begin = time.perf_counter()
+            alerts = detector.update(symbols, prices[tick], volumes[tick], start + tick)
+            latencies.append(time.perf_counter() - begin)
+            state['alerts'].update((tick, alert['symbol'], alert['kind']) for alert in alerts)
+        return latencies
+
+    result = measure('anomaly', run, n_assets * n_ticks, repeats, setup=setup)
+    result['events'] = len(events)
+    result['alerts'] = len(state['alerts'])
+    result['detected_on_event_bar'] = sum(
+        (tick, symbols[asset], kind) in state['alerts'] for tick, asset, kind in events)
+    return result
+
+
+def run_cases(preset, stages, repeats):
+    """Run every case of a preset and return {case_name: result}"""
+    matrix = PRESETS[preset]
+    cases = []
+    # PriceCollector only requests the HISTORICAL_DAYS window, longer series would be cut down
+    history = int(pd.Timedelta(days=Config.HISTORICAL_DAYS) / timeframe_to_timedelta(Config.BASE_TIMEFRAME))
+    for n_pairs, n_candles in matrix['series']:
+        cases.append((f"technical/pairs={n_pairs}/candles={n_candles}",
+                      'technical', lambda p=n_pairs, c=n_candles: bench_technical(p, c, repeats)))
+        cases.append((f"technical_cached/pairs={n_pairs}/candles={n_candles}",
+                      'technical', lambda p=n_pairs, c=n_candles: bench_technical(p, c, repeats, cached=True)))
+        if n_candles > history:
+            continue
+        for latency in matrix['latency']:
+            cases.append((f"price_collector/pairs={n_pairs}/candles={n_candles}/latency={latency}",
+                          'price_collector',
+                          lambda p=n_pairs, c=n_candles, l=latency: bench_price_collector(p, c, l, repeats)))
+    for n_articles in matrix['articles']:
+        cases.append((f"sentiment/articles={n_articles}",
+                      'sentiment', lambda a=n_articles: bench_sentiment(a, repeats)))
+        cases.append((f"sentiment_lexicon/articles={n_articles}",
+                      'sentiment', lambda a=n_articles: bench_sentiment(a, repeats, engine='lexicon')))
+        for latency in matrix['latency']:
+            cases.append((f"news_scraper/articles={n_articles}/latency={latency}",
+                          'news_scraper', lambda a=n_articles, l=latency: bench_news(a, l, repeats)))
+    wide_pairs, wide_candles = matrix['wide']
+    for n_posts in matrix['social_posts']:
+        cases.append((f"social/posts={n_posts}", 'social', lambda n=n_posts: bench_social(n, repeats)))
+    cases.append((f"multi_exchange/pairs={wide_pairs}/candles={wide_candles}",
+                  'multi_exchange', lambda: bench_multi_exchange(wide_pairs, wide_candles, repeats)))
+    for n_assets in matrix['assets']:
+        cases.append((f"anomaly/assets={n_assets}/ticks={matrix['ticks']}",
+                      'anomaly', lambda a=n_assets: bench_anomaly(a, matrix['ticks'], repeats)))
+    shards, scaling = matrix['shards'], {}
+    # Ascending worker counts, so the single-worker reference runs first
+    for workers in [w for w in shards['workers'] if w == 1 or w <= (os.cpu_count() or 1)]:
+        cases.append((f"sharded/pairs={shards['pairs']}/candles={shards['candles']}/workers={workers}",
+                      'sharded', lambda w=workers: bench_sharded(shards['pairs'], shards['candles'], w,
+                                                                 repeats, scaling)))
+    for n_assets in matrix['research_assets']:
+        cases.append((f"research/assets={n_assets}/latency=0.2",
+                      'research', lambda a=n_assets: bench_research(a, 0.2, repeats)))
+    # A 6k tokens/minute budget with 5% server errors: the limiter paces the tail of the batch
+    cases.append(("research_limited/assets=16/latency=0.2/tpm=6000/errors=0.05",
+                  'research', lambda: bench_research(16, 0.2, repeats, tokens_per_minute=6000,
+                                                     max_tokens=100, error_rate=0.05)))
+    cases.append((f"market/pairs={wide_pairs}/articles={matrix['articles'][-1]}",
+                  'market', lambda: bench_market(wide_pairs, wide_candles, matrix['articles'][-1], repeats)))
+
+    results = {}
+    for name, stage, bench in cases:
+        if stages and stage not in stages:
+            continue
+        logger.info(f"Running {name}")
+        try:
+            results[name] = bench()
+        except Exception as e:
+            logger.error(f"Benchmark {name} failed: {str(e)}", exc_info=True)
+            results[name] = {'error': str(e)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline benchmarks on synthetic data")
+    parser.add_argument('--preset', choices=list(PRESETS), default='quick')
+    parser.add_argument('--stage', action='append', dest='stages',
+                        choices=['technical', 'sentiment', 'market', 'price_collector', 'news_scraper', 'anomaly',
+                                 'multi_exchange', 'sharded', 'research', 'social'],
+                        help="Only run the given stage (repeatable)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD,
+                        help="Allowed relative regression before failing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    results = run_cases(args.preset, args.stages, args.repeats)
+    write_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for regression in regressions:
+            if regression['metric'] == 'error':
+                logger.error(f"Regression in {regression['case']}: failed with {regression['current']}")
+                continue
+            logger.error(
+                f"Regression in {regression['case']}: {regression['metric']} "
+                f"{regression['current']:.6g} vs baseline {regression['baseline']:.6g}"
+            )
+        if regressions:
+            return 1
+        logger.info("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
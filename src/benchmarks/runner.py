@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from utils.metrics import percentile
+
+logger = logging.getLogger('crypto_analyzer.benchmarks.runner')
+
+
+def measure(name, fn, units, repeats=3, setup=None, track_memory=True):
+    """
+    Benchmark one case.
+
+    fn runs the stage once and may return a list of per-call latencies in
+    seconds; otherwise the whole run counts as one call. units is the
+    amount of work per run (candles, articles, ...) used for throughput.
+    Peak memory is taken from one extra traced run, so tracemalloc
+    overhead does not skew the timings.
+    """
+    run_times = []
+    latencies = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        call_latencies = fn()
+        run_times.append(time.perf_counter() - start)
+        latencies.extend(call_latencies if call_latencies else [run_times[-1]])
+
+    peak_bytes = None
+    if track_memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    median_run = statistics.median(run_times)
+    result = {
+        'units': units,
+        'repeats': repeats,
+        'run_seconds_median': median_run,
+        'throughput_per_second': units / median_run if median_run else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99),
+        'peak_bytes': peak_bytes
+    }
+    logger.info(
+        f"{name}: {result['throughput_per_second']:.1f} units/s, "
+        f"p95 {result['latency_p95'] * 1000:.2f} ms"
+    )
+    return result
+
+
+def environment():
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def write_results(results, path):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+    logger.info(f"Wrote benchmark results to {path}")
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline and return a list of regressions.
+    A case regresses when throughput drops, or p95 latency or peak memory
+    grows, by more than threshold (a fraction) relative to the baseline,
+    or when it fails although the baseline has a result for it.
+    """
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous or 'error' in previous:
+            continue
+        if 'error' in current:
+            regressions.append({'case': case, 'metric': 'error', 'baseline': None,
+                                'current': current['error'], 'limit': None})
+            continue
+
+        checks = [
+            ('throughput_per_second', previous['throughput_per_second'] * (1 - threshold),
+             current['throughput_per_second'] < previous['throughput_per_second'] * (1 - threshold)),
+            ('latency_p95', previous['latency_p95'] * (1 + threshold),
+             current['latency_p95'] > previous['latency_p95'] * (1 + threshold)),
+        ]
+        if current.get('peak_bytes') and previous.get('peak_bytes'):
+            checks.append(('peak_bytes', previous['peak_bytes'] * (1 + threshold),
+                           current['peak_bytes'] > previous['peak_bytes'] * (1 + threshold)))
+
+        for metric, limit, failed in checks:
+            if failed:
+                regressions.append({
+                    'case': case,
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': current[metric],
+                    'limit': limit
+                })
+    return regressions
@@ -0,0 +1,94 @@
+import random
+import numpy as np
+import pandas as pd
+
+POSITIVE_WORDS = ['surge', 'rally', 'bullish', 'gain', 'record', 'adoption', 'breakout', 'approval', 'growth', 'strong']
+NEGATIVE_WORDS = ['crash', 'plunge', 'bearish', 'loss', 'hack', 'ban', 'selloff', 'lawsuit', 'weak', 'fear']
+NEUTRAL_WORDS = ['market', 'traders', 'exchange', 'price', 'network', 'investors', 'token', 'protocol', 'analysts', 'volume']
+ASSETS = ['bitcoin', 'ethereum', 'solana', 'bnb', 'defi', 'layer2', 'nft', 'stablecoin', 'gaming', 'ai']
+SOURCES = ['CoinDesk', 'Cointelegraph', 'Decrypt', 'The Block', 'Bitcoin Magazine']
+
+
+def generate_ohlcv(n_candles, seed=0, start='2024-01-01', freq='1min', base_price=100.0):
+    """
+    Seeded geometric random walk OHLCV frame in PriceCollector's layout
+    (timestamp, open, high, low, close, volume)
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.002, n_candles)
+    close = base_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[base_price], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.001, (2, n_candles)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(mean=5, sigma=1, size=n_candles)
+
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=n_candles, freq=freq),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    })
+
+
+def generate_universe(n_pairs, n_candles, seed=0, start='2024-01-01', freq='1min'):
+    """Generate {pair: OHLCV frame} for n_pairs synthetic pairs"""
+    return {
+        f"SYN{i}/USDT": generate_ohlcv(n_candles, seed=seed + i, start=start, freq=freq,
+                                       base_price=10.0 + (i % 50) * 10)
+        for i in range(n_pairs)
+    }
+
+
+def generate_sentence(rng):
+    words = [rng.choice(ASSETS)]
+    for _ in range(rng.randint(6, 14)):
+        pool = rng.choices([POSITIVE_WORDS, NEGATIVE_WORDS, NEUTRAL_WORDS], weights=[2, 2, 6])[0]
+        words.append(rng.choice(pool))
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_news(n_articles, seed=0, sentences=(3, 8)):
+    """Generate NewsAPI-shaped article dicts with seeded synthetic text"""
+    rng = random.Random(seed)
+    start = pd.Timestamp('2024-01-01')
+    articles = []
+    for i in range(n_articles):
+        content = ' '.join(generate_sentence(rng) for _ in range(rng.randint(*sentences)))
+        source = rng.choice(SOURCES)
+        articles.append({
+            'source': {'id': None, 'name': source},
+            'title': generate_sentence(rng),
+            'description': generate_sentence(rng),
+            'content': content,
+            'url': f"https://{source.lower().replace(' ', '')}.example/article/{seed}-{i}",
+            'publishedAt': (start + pd.Timedelta(minutes=i)).isoformat() + 'Z'
+        })
+    return articles
+
+
+def generate_ticks(n_assets, n_ticks, seed=0, n_events=10):
+    """
+    Per-tick (price, volume) updates for n_assets, each an (n_ticks, n_assets)
+    array, with injected 12% price jumps and 10x volume spikes in the second
+    half. Returns (prices, volumes, events) where events is a list of
+    (tick, asset, kind).
+    """
+    rng = np.random.default_rng(seed)
+    base = 10.0 + (np.arange(n_assets) % 50) * 10
+    prices = base * np.exp(np.cumsum(rng.normal(0, 0.0005, (n_ticks, n_assets)), axis=0))
+    volumes = rng.lognormal(mean=3, sigma=0.2, size=(n_ticks, n_assets))
+
+    events = []
+    ticks = rng.integers(n_ticks // 2, n_ticks, size=n_events)
+    assets = rng.choice(n_assets, size=n_events, replace=n_events > n_assets)
+    for i, (tick, asset) in enumerate(zip(ticks, assets)):
+        if i % 2:
+            volumes[tick, asset] *= 10
+            events.append((int(tick), int(asset), 'volume'))
+        else:
+            prices[tick:, asset] *= 1.12
+            events.append((int(tick), int(asset), 'price'))
+    return prices, volumes, events
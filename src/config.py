@@ -1,6 +1,5 @@
 from dotenv import load_dotenv
 import os
-import requests
 import logging
 
 load_dotenv()
@@ -20,8 +19,16 @@ class Config:
     GLASSNODE_API_KEY = os.getenv('GLASSNODE_API_KEY')
     
     # Database Configuration
-    DATABASE_URL = os.getenv('DATABASE_URL')
+    DATABASE_URL = os.getenv('DATABASE_URL')  # e.g. sqlite:///data/crypto_research.db
     DATABASE_NAME = 'crypto_research'
+    STORAGE_RETENTION_DAYS = {
+        'default': 90,
+        'candles': 365,
+        'articles': 30,
+        'sentiment_scores': 90
+    }
+    STORAGE_VACUUM_FREE_RATIO = 0.2  # VACUUM once 20% of pages are free
+    STORAGE_MAINTENANCE_INTERVAL = 86400  # Daemon retention/compaction cadence (1 day)
     
     # Crypto Trading Settings
     CRYPTO_PAIRS = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT']
@@ -88,15 +95,47 @@ class Config:
         'https://decrypt.co'
     ]
     
+    # Sentiment Settings
+    SENTIMENT_ENGINE = 'textblob'  # 'textblob' or 'lexicon' (batched sparse scoring, crypto vocabulary)
+
+    # News Deduplication Settings
+    DEDUPLICATE_NEWS = True  # Collapse syndicated copies of the same story
+    DEDUP_THRESHOLD = 0.8  # Min estimated Jaccard similarity for near-duplicates
+    DEDUP_SHINGLE_SIZE = 3  # Words per shingle
+    MINHASH_PERMUTATIONS = 128
+    LSH_BANDS = 16  # 16 bands x 8 rows, candidate threshold ~0.7
+
+    # Article Body Settings
+    FETCH_FULL_ARTICLES = True  # Download full pages, NewsAPI content is truncated
+    ARTICLE_CACHE_PATH = 'data/article_cache.db'
+    ARTICLE_CACHE_TTL = 6 * 3600  # seconds before a cached page is revalidated
+    ARTICLE_CACHE_MAX_AGE = 7 * 86400  # seconds before an unrefreshed cache entry is evicted
+    ARTICLE_FETCH_CONCURRENCY = 20  # Total open connections
+    ARTICLE_FETCH_PER_DOMAIN = 2  # Concurrent requests per domain
+    ARTICLE_FETCH_TIMEOUT = 15  # seconds per page
+    ARTICLE_MAX_HTML_BYTES = 2_000_000  # Larger pages are truncated before parsing
+    ARTICLE_PARSE_TIMEOUT = 2.0  # seconds of text extraction before a page is skipped
+    ARTICLE_PARSE_WORKERS = 4  # Threads dedicated to text extraction
+
     # Time Settings
     HISTORICAL_DAYS = 30
     TIMEFRAME = '1h'
     UPDATE_INTERVAL = 300  # 5 minutes
 
+    # Multi-timeframe Settings
+    BASE_TIMEFRAME = '1m'  # Only resolution fetched from the exchange
+    DERIVED_TIMEFRAMES = ['5m', '15m', '1h', '4h', '1d']  # Resampled locally
+    OHLCV_FETCH_LIMIT = 1000  # Max candles per exchange request
+    PRICE_EXCHANGES = ['binance']  # ccxt ids; two or more consolidate prices across venues
+    EXCHANGE_TIMEOUT = 20  # seconds per exchange request, and the base of a venue's per-cycle budget
+    EXCHANGE_PAGE_TIME = 2.0  # seconds added to a venue's budget per OHLCV page it has to fetch
+    MIN_VENUES = 1  # Venues a consolidated bar needs
+
     # Market Trend Analysis Settings
     TRENDING_THRESHOLD = 0.15  # 15% movement threshold
     VOLUME_SURGE_THRESHOLD = 2.0  # 2x normal volume
     TOP_COINS_COUNT = 100  # Number of top coins to analyze
+    SHARD_WORKERS = 0  # Worker processes for sharded collection/analysis of the top coins, 0 disables
     CORRELATION_THRESHOLD = 0.7  # Strong correlation threshold
     
     # Trend Categories
@@ -112,7 +151,7 @@ class Config:
     ]
 
     # Groq API Settings
-    GROQ_API_BASE = "https://api.groq.com/v1"
+    GROQ_API_BASE = os.getenv('GROQ_API_BASE', "https://api.groq.com")  # The SDK appends /openai/v1
     
     # AI Model Settings
     AI_MODEL = "mixtral-8x7b-32768"  # Fast and efficient
@@ -123,6 +162,21 @@ class Config:
     # Analysis Settings
     ANALYSIS_RETRY_ATTEMPTS = 3
     MINIMUM_ANALYSIS_LENGTH = 500  # characters
+
+    # Per-asset Research Settings
+    RESEARCH_CONCURRENCY = 8  # Requests in flight, also the Groq connection pool size
+    RESEARCH_TOKENS_PER_MINUTE = 30000  # Prompt + completion tokens allowed per minute
+    RESEARCH_MAX_TOKENS = 600  # Completion tokens per asset analysis
+
+    # Indicator Cache Settings
+    INDICATOR_CACHE_SIZE = 1024  # Max cached indicator results (LRU)
+    INDICATOR_FINGERPRINT_TAIL = 5  # Tail rows hashed into the data fingerprint
+
+    # Memory Settings
+    PRICE_DTYPE = 'float32'  # Storage dtype of OHLC price columns, 'float64' for full precision; volume stays float64
+    RESULT_RETENTION = 'tail'  # 'full' keeps whole indicator/signal history, 'tail' the last bars only
+    RESULT_TAIL_WINDOW = 500  # Bars of indicator/signal history kept in 'tail' mode
+    MEMORY_BUDGET_MB = 2048  # Warn when tracked component memory exceeds this
     
     # Agent Settings
     UPDATE_FREQUENCY = 3600  # How often to update analysis (1 hour)
@@ -136,6 +190,58 @@ class Config:
         'extreme': 20.0     # 20% change
     }
 
+    # Anomaly Detection Settings
+    ANOMALY_PRICE_HALFLIFE = 60  # bars, EWMA baseline price the change is measured against
+    ANOMALY_VOLUME_HALFLIFE = 60  # bars, EWMA baseline volume and log-volume variance
+    ANOMALY_VOLUME_MIN_ZSCORE = 3.0  # Surges must also be this many std devs above mean log volume
+    ANOMALY_WARMUP_BARS = 30  # Bars per asset before alerts are raised
+    ANOMALY_COOLDOWN = 300  # seconds before an asset/kind alert repeats at the same tier
+    ANOMALY_ALERT_HISTORY = 1000  # Recent alerts kept in memory
+
+    # Social Media Settings
+    SOCIAL_FEED_URL = os.getenv('SOCIAL_FEED_URL')  # Optional NDJSON post stream
+    SOCIAL_SUBREDDITS = ['CryptoCurrency', 'Bitcoin', 'ethereum']
+    SOCIAL_POLL_INTERVAL = 30  # seconds between Reddit/Twitter polls
+    SOCIAL_RETRY_BACKOFF = 5  # seconds after a failed request, doubled per consecutive failure
+    SOCIAL_MAX_BACKOFF = 300  # seconds, cap on the retry backoff
+    SOCIAL_QUEUE_SIZE = 1000  # Bounded ingest queue, producers wait when full
+    SOCIAL_BATCH_SIZE = 64  # Posts scored per micro-batch
+    SOCIAL_BATCH_TIMEOUT = 0.5  # Max seconds to fill a micro-batch
+    SOCIAL_MAX_SCORED_POSTS = 10000  # Scored posts kept in memory
+    SOCIAL_COLLECTION_DURATION = 60  # seconds per run() call
+
+    # Daemon Settings
+    SCHEDULER_JITTER = 0.1  # +/- fraction of each job's interval
+
+    # Checkpoint Settings
+    CHECKPOINTS = True  # Restore stage outputs whose inputs are unchanged instead of rerunning them
+    CHECKPOINT_DIR = 'data/checkpoints'
+    CHECKPOINT_SOURCE_TTL = 900  # seconds collected prices/news are reused by a rerun of a failed run
+    CHECKPOINT_MAX_AGE = 86400  # Checkpoints unused for this long are removed
+    CHECKPOINT_KEEP = 5  # Most recent checkpoints kept per stage
+
+    # CLI Settings
+    STARTUP_TIME_BUDGET = 1.0  # seconds, max median time to import main.py
+
+    # Metrics Settings
+    METRICS_DIR = 'metrics'  # JSON run summaries and Prometheus text output
+    PROFILE_DIR = 'profiles'  # Per-stage cProfile output when --profile is set
+    BENCHMARK_REGRESSION_THRESHOLD = 0.25  # Fail benchmarks 25% worse than baseline
+
+    # Report Settings
+    REPORT_DIR = 'reports'
+    REPORT_FORMATS = ['html', 'md']
+    REPORT_TOP_NEWS = 10  # Headlines shown in the news section
+    REPORT_SECTION_CACHE_SIZE = 256  # Rendered sections kept for incremental rebuilds
+
+    # Chart Settings
+    REPORT_CHARTS = True  # Render charts into the report
+    CHART_DIR = 'reports/charts'
+    CHART_MAX_POINTS = 1000  # LTTB cap on plotted points per series
+    CHART_WORKERS = None  # Process pool size, None uses all cores
+    CHART_MAX_AGE = 7 * 86400  # seconds before a chart image no report has used is removed
+    CHART_DPI = 100
+
     @classmethod
     def validate(cls):
         """Validate all required configuration is present"""
@@ -189,6 +295,8 @@ def validate_news_source(url):
     """
     Validate if a news source is accessible and returns valid data
     """
+    import requests
+
     try:
         response = requests.head(url)
         return response.status_code == 200
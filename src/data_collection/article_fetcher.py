@@ -0,0 +1,210 @@
+import aiohttp
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+from config import Config
+from utils.metrics import metrics
+import logging
+
+logger = logging.getLogger('crypto_analyzer.article_fetcher')
+
+CONTENT_TAGS = SoupStrainer(['article', 'p'])
+MIN_PARAGRAPH_LENGTH = 40  # shorter <p> blocks are usually captions or navigation
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def extract_text(html):
+    """Extract article body text from HTML, preferring paragraphs inside <article>"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=CONTENT_TAGS)
+    container = soup.find('article') or soup
+    paragraphs = [p.get_text(' ', strip=True) for p in container.find_all('p')]
+    return '\n'.join(p for p in paragraphs if len(p) >= MIN_PARAGRAPH_LENGTH)
+
+
+class FetchCache:
+    """Persistent per-URL validators (ETag/Last-Modified) and extracted text"""
+
+    def __init__(self, path):
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetch_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                text TEXT,
+                fetched_at REAL
+            )
+        """)
+
+    def get(self, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, text, fetched_at FROM fetch_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(['etag', 'last_modified', 'text', 'fetched_at'], row))
+
+    def put_many(self, entries):
+        """Upsert (url, etag, last_modified, text, fetched_at) rows in one transaction"""
+        if not entries:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO fetch_cache (url, etag, last_modified, text, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    etag = excluded.etag, last_modified = excluded.last_modified,
+                    text = excluded.text, fetched_at = excluded.fetched_at
+            """, entries)
+
+    def evict(self, max_age):
+        """Drop entries fetched more than max_age seconds ago; returns how many"""
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM fetch_cache WHERE fetched_at < ?", (time.time() - max_age,)
+            ).rowcount
+
+
+class ArticleFetcher:
+    """
+    Downloads full article pages concurrently over one pooled session.
+    Requests are capped per domain, revalidated with ETag/Last-Modified,
+    and skipped entirely while a cached copy is younger than the TTL.
+    Text extraction runs on a dedicated thread pool of ARTICLE_PARSE_WORKERS
+    and is abandoned after ARTICLE_PARSE_TIMEOUT, so one huge page cannot
+    hold up the batch or starve the event loop's default executor.
+    rewrite_url maps a page URL to the one actually requested, so
+    benchmarks and cassette replay can serve pages from a local server;
+    caching and per-domain limits still use the original URL.
+    """
+
+    def __init__(self, cache_path=None, rewrite_url=None):
+        logger.debug("Initializing ArticleFetcher")
+        self.cache = FetchCache(cache_path or Config.ARTICLE_CACHE_PATH)
+        self.rewrite_url = rewrite_url
+        self.parse_executor = ThreadPoolExecutor(max_workers=Config.ARTICLE_PARSE_WORKERS,
+                                                 thread_name_prefix='article-parse')
+        self.stats = defaultdict(int)
+        metrics.register_cache('article_bodies', self.cache_stats)
+
+    def cache_stats(self):
+        return {
+            'hits': self.stats['fresh'] + self.stats['not_modified'],
+            'misses': self.stats['fetched'] + self.stats['failed'],
+            **self.stats
+        }
+
+    @staticmethod
+    async def _read_capped(response):
+        """Read the body until EOF or ARTICLE_MAX_HTML_BYTES, whichever comes first"""
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= Config.ARTICLE_MAX_HTML_BYTES:
+                break
+        return b''.join(chunks)[:Config.ARTICLE_MAX_HTML_BYTES]
+
+    async def _fetch_one(self, session, semaphores, url, loop):
+        cached = self.cache.get(url)
+        if cached and time.time() - cached['fetched_at'] < Config.ARTICLE_CACHE_TTL:
+            self.stats['fresh'] += 1
+            return cached['text'], None
+
+        headers = {}
+        # Entries without text (failed or abandoned parses) are never revalidated, a 304 would keep them empty
+        if cached and cached['text'] is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        domain = urlparse(url).netloc
+        async with semaphores[domain]:
+            start = time.perf_counter()
+            try:
+                target = self.rewrite_url(url) if self.rewrite_url else url
+                async with session.get(target, headers=headers) as response:
+                    metrics.record_api_call('article_pages', time.perf_counter() - start,
+                                            response.status in (200, 304))
+                    if response.status == 304 and cached and cached['text'] is not None:
+                        self.stats['not_modified'] += 1
+                        return cached['text'], (url, cached['etag'], cached['last_modified'],
+                                                cached['text'], time.time())
+                    if response.status != 200:
+                        self.stats['failed'] += 1
+                        return None, None
+                    raw = await self._read_capped(response)
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats['failed'] += 1
+                logger.debug(f"Failed to fetch {url}: {str(e)}")
+                return None, None
+
+        html = raw.decode('utf-8', errors='replace')
+        # Pages that cannot be parsed in time are cached without text, so they are not downloaded again until the TTL
+        try:
+            text = await asyncio.wait_for(
+                loop.run_in_executor(self.parse_executor, extract_text, html),
+                timeout=Config.ARTICLE_PARSE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self.stats['parse_timeouts'] += 1
+            logger.debug(f"Extraction of {url} exceeded {Config.ARTICLE_PARSE_TIMEOUT}s, skipped")
+            return None, (url, None, None, None, time.time())
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            logger.debug(f"Extraction failed for {url}: {str(e)}")
+            return None, (url, None, None, None, time.time())
+
+        self.stats['fetched'] += 1
+        return text, (url, etag, last_modified, text, time.time())
+
+    async def fetch_all(self, articles):
+        """
+        Add 'full_content' to every article whose page could be fetched.
+        Articles are updated in place and also returned.
+        """
+        loop = asyncio.get_running_loop()
+        semaphores = defaultdict(lambda: asyncio.Semaphore(Config.ARTICLE_FETCH_PER_DOMAIN))
+        connector = aiohttp.TCPConnector(limit=Config.ARTICLE_FETCH_CONCURRENCY, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=Config.ARTICLE_FETCH_TIMEOUT)
+        targets = [article for article in articles if article.get('url')]
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': 'crypto-analyzer'}) as session:
+            results = await asyncio.gather(*[
+                self._fetch_one(session, semaphores, article['url'], loop)
+                for article in targets
+            ])
+
+        updates = []
+        for article, (text, cache_entry) in zip(targets, results):
+            if text:
+                article['full_content'] = text
+            if cache_entry:
+                updates.append(cache_entry)
+        self.cache.put_many(updates)
+        evicted = self.cache.evict(Config.ARTICLE_CACHE_MAX_AGE)
+        if evicted:
+            logger.debug(f"Evicted {evicted} article cache entries")
+
+        logger.info(f"Article bodies: {dict(self.stats)}")
+        return articles
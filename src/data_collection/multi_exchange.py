@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import time
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from data_collection.resampler import OHLCV_COLUMNS, timeframe_to_timedelta
+from utils.compact import compact_ohlcv
+from utils.metrics import metrics
+
+logger = logging.getLogger('crypto_analyzer.multi_exchange')
+
+# Venue-specific asset codes mapped to the names used in Config.CRYPTO_PAIRS
+ASSET_ALIASES = {
+    'XBT': 'BTC',
+    'XDG': 'DOGE'
+}
+
+
+def normalize_symbol(symbol):
+    """
+    Unified BASE/QUOTE form of a venue symbol: uppercase, settlement
+    suffix dropped ('BTC/USDT:USDT') and known asset aliases applied ('XBT')
+    """
+    symbol = symbol.upper().split(':')[0]
+    if '/' in symbol:
+        base, quote = symbol.split('/', 1)
+    elif '-' in symbol:
+        base, quote = symbol.split('-', 1)
+    else:
+        return symbol
+    return f"{ASSET_ALIASES.get(base, base)}/{ASSET_ALIASES.get(quote, quote)}"
+
+
+def create_exchange(exchange_id):
+    """Construct a rate-limited ccxt client for one venue"""
+    import ccxt
+
+    options = {'enableRateLimit': True, 'timeout': int(Config.EXCHANGE_TIMEOUT * 1000)}
+    if exchange_id == 'binance':
+        options.update({'apiKey': Config.BINANCE_API_KEY, 'secret': Config.BINANCE_SECRET_KEY})
+    return getattr(ccxt, exchange_id)(options)
+
+
+def fetch_ohlcv_pages(exchange, symbol, timeframe, since_ms, limit, cancelled=None):
+    """
+    Fetch candles for symbol from since_ms, paging forward until the venue
+    has no more bars or cancelled is set. Returns raw [ms, o, h, l, c, v] rows.
+    """
+    bar_ms = int(timeframe_to_timedelta(timeframe).total_seconds() * 1000)
+    rows = []
+    while cancelled is None or not cancelled.is_set():
+        with metrics.api_call(exchange.id):
+            batch = exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since_ms, limit=limit)
+        if not batch:
+            break
+        rows.extend(batch)
+        if len(batch) < limit:
+            break
+        since_ms = batch[-1][0] + bar_ms
+    return rows
+
+
+def normalize_bars(rows, timeframe):
+    """
+    OHLCV frame from raw rows with timestamps floored onto the bar grid,
+    so venues that stamp bars slightly off the boundary still align
+    """
+    df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+    if df.empty:
+        return df
+    bar_ms = int(timeframe_to_timedelta(timeframe).total_seconds() * 1000)
+    stamps = df['timestamp'].to_numpy(dtype=np.int64)
+    df['timestamp'] = pd.to_datetime(stamps - stamps % bar_ms, unit='ms')
+    return df.drop_duplicates(subset='timestamp', keep='last').sort_values('timestamp').reset_index(drop=True)
+
+
+def consolidate(venue_frames, min_venues=None):
+    """
+    Merge {venue: OHLCV frame} for one pair into volume-weighted OHLCV.
+
+    Bars are aligned on timestamp. Open, high, low and close are averaged
+    weighted by each venue's volume (equally when no venue traded), volume
+    is summed. Returns (consolidated, spreads) where spreads holds the
+    number of venues, the cross-venue close spread in percent of the
+    consolidated close, and the most expensive and cheapest venue per bar.
+    """
+    min_venues = min_venues or Config.MIN_VENUES
+    frames = {venue: df.set_index('timestamp') for venue, df in venue_frames.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=OHLCV_COLUMNS), pd.DataFrame(
+            columns=['timestamp', 'venues', 'spread_pct', 'max_venue', 'min_venue'])
+
+    # One timestamp x venue matrix per field
+    fields = {
+        field: pd.concat({venue: df[field] for venue, df in frames.items()}, axis=1).astype(np.float64)
+        for field in ['open', 'high', 'low', 'close', 'volume']
+    }
+    closes = fields['close']
+    present = closes.notna()
+    venues = present.sum(axis=1)
+
+    weights = fields['volume'].where(present).fillna(0.0)
+    total_volume = weights.sum(axis=1)
+    # Equal weights on bars where no venue reported volume
+    untraded = total_volume <= 0
+    weights.loc[untraded] = present.loc[untraded].astype(np.float64)
+    weight_sum = weights.sum(axis=1)
+
+    consolidated = pd.DataFrame({'timestamp': closes.index})
+    for field in ['open', 'high', 'low', 'close']:
+        consolidated[field] = ((fields[field] * weights).sum(axis=1) / weight_sum).to_numpy()
+    consolidated['volume'] = total_volume.to_numpy()
+
+    spreads = pd.DataFrame({
+        'timestamp': closes.index,
+        'venues': venues.to_numpy(),
+        'spread_pct': ((closes.max(axis=1) - closes.min(axis=1)) / consolidated['close'].to_numpy() * 100).to_numpy(),
+        'max_venue': closes.idxmax(axis=1, skipna=True).to_numpy(),
+        'min_venue': closes.idxmin(axis=1, skipna=True).to_numpy()
+    })
+    keep = (venues >= min_venues).to_numpy()
+    return (consolidated[keep].reset_index(drop=True),
+            spreads[keep].reset_index(drop=True))
+
+
+class MultiExchangeCollector:
+    """
+    Fetches the same pairs from several ccxt venues concurrently and
+    consolidates them into one volume-weighted OHLCV feed per pair.
+
+    Every venue runs in its own worker thread against its own rate limit.
+    A venue's budget per cycle is EXCHANGE_TIMEOUT plus EXCHANGE_PAGE_TIME
+    for every OHLCV page the requested windows span, so a cold start paging
+    the whole history gets proportionally longer than an incremental update.
+    A venue that has not finished within its budget is dropped from the
+    cycle: pairs it already returned are kept, the rest are consolidated
+    from the other venues, and its worker stops after its current request.
+    """
+
+    def __init__(self, exchanges=None, timeframe=None, timeout=None, page_time=None):
+        logger.debug("Initializing MultiExchangeCollector")
+        self.exchanges = {}
+        # ccxt ids, or already constructed clients
+        for exchange in exchanges or Config.PRICE_EXCHANGES:
+            if isinstance(exchange, str):
+                exchange = create_exchange(exchange)
+            self.exchanges[exchange.id] = exchange
+        self.timeframe = timeframe or Config.BASE_TIMEFRAME
+        self.timeout = timeout or Config.EXCHANGE_TIMEOUT
+        self.page_time = Config.EXCHANGE_PAGE_TIME if page_time is None else page_time
+        # Headroom for workers of dropped venues still finishing their last request
+        self.executor = ThreadPoolExecutor(max_workers=2 * len(self.exchanges), thread_name_prefix='venue')
+        self.symbol_maps = {}
+        self.venue_frames = {}
+        self.spreads = {}
+        self.venue_status = {}
+
+    def venue_symbol(self, venue, pair):
+        """The venue's own symbol for a unified pair, or None if it is not listed there"""
+        if venue not in self.symbol_maps:
+            exchange = self.exchanges[venue]
+            symbol_map = {}
+            if hasattr(exchange, 'load_markets'):
+                try:
+                    # Spot markets first, so they win over derivatives with the same base/quote
+                    for symbol in sorted(exchange.load_markets(), key=lambda symbol: ':' in symbol):
+                        symbol_map.setdefault(normalize_symbol(symbol), symbol)
+                except Exception as e:
+                    logger.warning(f"Could not load markets for {venue}: {str(e)}")
+            self.symbol_maps[venue] = symbol_map
+        symbol_map = self.symbol_maps[venue]
+        if not symbol_map:
+            # Market list unavailable: assume the unified symbol
+            return pair
+        return symbol_map.get(normalize_symbol(pair))
+
+    def venue_budget(self, since_by_pair, now=None):
+        """Seconds a venue gets to fetch {pair: since}, scaled by the pages to page through"""
+        now = now or pd.Timestamp.now(tz='UTC').tz_localize(None)
+        page_span = timeframe_to_timedelta(self.timeframe) * Config.OHLCV_FETCH_LIMIT
+        pages = sum(max(1, -(-(now - since) // page_span)) for since in since_by_pair.values())
+        return self.timeout + pages * self.page_time
+
+    def _fetch_venue(self, venue, since_by_pair, results, cancelled):
+        """Worker: fetch every pair from one venue into results[pair]"""
+        exchange = self.exchanges[venue]
+        for pair, since in since_by_pair.items():
+            if cancelled.is_set():
+                break
+            symbol = self.venue_symbol(venue, pair)
+            if symbol is None:
+                logger.debug(f"{pair} is not listed on {venue}")
+                continue
+            try:
+                rows = fetch_ohlcv_pages(exchange, symbol, self.timeframe, int(since.timestamp() * 1000),
+                                         Config.OHLCV_FETCH_LIMIT, cancelled)
+                results[pair] = normalize_bars(rows, self.timeframe)
+            except Exception as e:
+                logger.warning(f"Fetching {pair} from {venue} failed: {str(e)}")
+
+    async def _collect(self, since_by_pair):
+        loop = asyncio.get_running_loop()
+        venue_results = {}
+        budget = self.venue_budget(since_by_pair)
+
+        async def run_venue(venue):
+            results = {}
+            cancelled = threading.Event()
+            venue_results[venue] = results
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, self._fetch_venue, venue, since_by_pair, results, cancelled),
+                    budget)
+                status = 'ok'
+            except asyncio.TimeoutError:
+                cancelled.set()
+                status = 'timeout'
+                logger.warning(f"{venue} exceeded {budget:.0f}s, dropped from this cycle "
+                               f"with {len(results)}/{len(since_by_pair)} pairs")
+            except Exception as e:
+                status = 'error'
+                logger.error(f"Collecting from {venue} failed: {str(e)}", exc_info=True)
+            self.venue_status[venue] = {
+                'status': status,
+                'pairs': len(results),
+                'seconds': round(time.perf_counter() - start, 3)
+            }
+            metrics.increment(f"venue_{status}")
+            # Snapshot so a timed-out worker cannot change the cycle's data
+            return venue, dict(results)
+
+        done = await asyncio.gather(*(run_venue(venue) for venue in self.exchanges))
+        return dict(done)
+
+    def collect(self, since_by_pair):
+        """
+        Fetch base bars for {pair: since} from every venue concurrently.
+        Returns {pair: consolidated OHLCV frame}; per-venue frames and spread
+        metrics are kept in venue_frames and spreads.
+        """
+        by_venue = asyncio.run(self._collect(since_by_pair))
+        consolidated = {}
+        for pair in since_by_pair:
+            frames = {venue: results[pair] for venue, results in by_venue.items() if pair in results}
+            self.venue_frames[pair] = frames
+            bars, spreads = consolidate(frames)
+            self.spreads[pair] = spreads
+            consolidated[pair] = compact_ohlcv(bars)
+            if not spreads.empty:
+                logger.debug(f"{pair}: {len(frames)} venues, latest spread {spreads['spread_pct'].iloc[-1]:.3f}%")
+        logger.info(f"Venue status: {self.venue_status}")
+        return consolidated
+
+    def spread_summary(self):
+        """Latest and average cross-venue spread per pair"""
+        return {
+            pair: {
+                'venues': int(spreads['venues'].iloc[-1]),
+                'spread_pct': float(spreads['spread_pct'].iloc[-1]),
+                'mean_spread_pct': float(spreads['spread_pct'].mean()),
+                'max_venue': spreads['max_venue'].iloc[-1],
+                'min_venue': spreads['min_venue'].iloc[-1]
+            }
+            for pair, spreads in self.spreads.items() if not spreads.empty
+        }
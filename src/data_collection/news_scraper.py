@@ -1,7 +1,8 @@
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
 from config import Config
+from utils.compact import memory_usage
+from utils.metrics import metrics
 import logging
 
 logger = logging.getLogger('crypto_analyzer.news_scraper')
@@ -13,6 +14,7 @@ class NewsScraper:
         self.news_api_key = Config.NEWS_API_KEY
         self.base_url = "https://newsapi.org/v2/everything"
         self.collected_news = []
+        self.article_fetcher = None
     
     async def fetch_news_by_category(self, category='market'):
         """
@@ -38,29 +40,52 @@ class NewsScraper:
         try:
             async with aiohttp.ClientSession() as session:
                 logger.debug(f"Making API request to {self.base_url}")
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
+                # Connection errors, timeouts and error statuses all count as failed calls
+                with metrics.api_call('newsapi'):
+                    async with session.get(self.base_url, params=params) as response:
+                        response.raise_for_status()
                         data = await response.json()
-                        articles = data.get('articles', [])
-                        logger.info(f"Successfully fetched {len(articles)} articles")
-                        return articles
-                    else:
-                        logger.error(f"API request failed with status {response.status}")
-                        return []
+                articles = data.get('articles', [])
+                logger.info(f"Successfully fetched {len(articles)} articles")
+                return articles
         except Exception as e:
             logger.error(f"Error fetching news: {str(e)}", exc_info=True)
             return []
     
+    async def _collect(self):
+        results = await self.fetch_news_by_category()
+        if Config.DEDUPLICATE_NEWS:
+            from analysis.deduplication import deduplicate_articles
+            results = deduplicate_articles(results)
+        if Config.FETCH_FULL_ARTICLES and results:
+            # NewsAPI truncates 'content', fetch the full page body
+            if self.article_fetcher is None:
+                from data_collection.article_fetcher import ArticleFetcher
+                self.article_fetcher = ArticleFetcher()
+            await self.article_fetcher.fetch_all(results)
+        return results
+
     def collect_news(self):
         """
         Collect and process crypto news
         """
         logger.info("Starting news collection process")
-        results = asyncio.run(self.fetch_news_by_category())
+        results = asyncio.run(self._collect())
         self.collected_news = results
         logger.info(f"Completed news collection. Total articles: {len(results)}")
         return results
 
+    def memory_usage(self):
+        """Bytes held by collected articles"""
+        return memory_usage(self.collected_news)
+
+    def checkpoint_state(self):
+        """Collected articles for the stage checkpoint, None when collection produced nothing"""
+        return {'collected_news': self.collected_news} if self.collected_news else None
+
+    def restore_checkpoint(self, state):
+        self.collected_news = state['collected_news']
+
     def run(self):
         """Main execution method"""
         logger.info("Running news collection pipeline")
@@ -1,6 +1,9 @@
 import ccxt
 import pandas as pd
 from config import Config
+from data_collection.resampler import TimeframeResampler, timeframe_to_timedelta, OHLCV_COLUMNS
+from data_collection.multi_exchange import MultiExchangeCollector, fetch_ohlcv_pages
+from utils.compact import compact_ohlcv, memory_usage
 import logging
 
 logger = logging.getLogger('crypto_analyzer.price_collector')
@@ -14,30 +17,63 @@ class PriceCollector:
         })
         self.pairs = Config.CRYPTO_PAIRS
         self.collected_prices = {}
-    
+        # pair -> {timeframe: DataFrame}, all derived from BASE_TIMEFRAME
+        self.timeframe_prices = {}
+        self.resampler = TimeframeResampler(Config.BASE_TIMEFRAME, Config.DERIVED_TIMEFRAMES)
+        # Several venues: base bars are volume-weighted across all of them
+        self.multi_exchange = MultiExchangeCollector() if len(Config.PRICE_EXCHANGES) > 1 else None
+
+    def fetch_base_ohlcv(self, pair, since):
+        """
+        Fetch base-resolution candles for a pair starting at since,
+        paging forward until the exchange has no more bars
+        """
+        rows = fetch_ohlcv_pages(self.exchange, pair, Config.BASE_TIMEFRAME,
+                                 int(since.timestamp() * 1000), Config.OHLCV_FETCH_LIMIT)
+        df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        # Derived timeframes aggregate in the same dtype, so every frame stays compact
+        return compact_ohlcv(df)
+
     def collect_prices(self):
         """
-        Collect cryptocurrency price data from Binance
-        Returns DataFrame with OHLCV data
+        Collect cryptocurrency price data from Binance, or from every venue in
+        PRICE_EXCHANGES when more than one is configured.
+        Fetches BASE_TIMEFRAME candles only and derives DERIVED_TIMEFRAMES locally.
+        Returns dict of pair -> DataFrame at Config.TIMEFRAME
         """
         logger.info("Starting price collection process")
         try:
+            now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+            history_start = now - pd.Timedelta(days=Config.HISTORICAL_DAYS)
+            # Keep whole buckets of the largest derived timeframe
+            largest = max(Config.DERIVED_TIMEFRAMES, key=timeframe_to_timedelta)
+            retain_from = history_start.floor(timeframe_to_timedelta(largest))
             all_data = {}
+
+            since_by_pair = {}
             for pair in self.pairs:
-                logger.debug(f"Fetching OHLCV data for {pair}")
-                ohlcv = self.exchange.fetch_ohlcv(
-                    symbol=pair,
-                    timeframe=Config.TIMEFRAME,
-                    limit=Config.HISTORICAL_DAYS * 24
-                )
-                
-                df = pd.DataFrame(
-                    ohlcv, 
-                    columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                )
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                all_data[pair] = df
-                logger.info(f"Successfully collected {len(df)} candles for {pair}")
+                base = self.resampler.base_frames.get(pair)
+                # Re-fetch the last stored bar since it may have been partial
+                since_by_pair[pair] = (base['timestamp'].iloc[-1]
+                                       if base is not None and not base.empty else retain_from)
+            consolidated = None
+            if self.multi_exchange is not None:
+                consolidated = self.multi_exchange.collect(since_by_pair)
+
+            for pair, since in since_by_pair.items():
+                if consolidated is not None:
+                    new_bars = consolidated[pair]
+                else:
+                    logger.debug(f"Fetching {Config.BASE_TIMEFRAME} OHLCV data for {pair} since {since}")
+                    new_bars = self.fetch_base_ohlcv(pair, since)
+                self.resampler.update(pair, new_bars, now)
+                self.resampler.trim(pair, retain_from)
+
+                frames = self.resampler.get_frames(pair)
+                self.timeframe_prices[pair] = frames
+                all_data[pair] = frames[Config.TIMEFRAME]
+                logger.info(f"Successfully collected {len(new_bars)} new {Config.BASE_TIMEFRAME} candles for {pair}")
             
             logger.info("Completed price collection for all pairs")
             self.collected_prices = all_data
@@ -47,7 +83,28 @@ class PriceCollector:
             logger.error(f"Error collecting price data: {str(e)}", exc_info=True)
             return None
 
+    def memory_usage(self):
+        """Bytes held by base and derived price frames, and per-venue frames when consolidating"""
+        held = [self.resampler.base_frames, self.resampler.derived_frames,
+                self.timeframe_prices, self.collected_prices]
+        if self.multi_exchange is not None:
+            held += [self.multi_exchange.venue_frames, self.multi_exchange.spreads]
+        return memory_usage(held)
+
+    def checkpoint_state(self):
+        """Base and derived frames for the stage checkpoint; the other views are rebuilt from them"""
+        if not self.collected_prices:
+            return None
+        return {'base_frames': self.resampler.base_frames, 'derived_frames': self.resampler.derived_frames}
+
+    def restore_checkpoint(self, state):
+        self.resampler.base_frames = state['base_frames']
+        self.resampler.derived_frames = state['derived_frames']
+        self.timeframe_prices = {pair: self.resampler.get_frames(pair) for pair in self.resampler.base_frames}
+        self.collected_prices = {pair: frames[Config.TIMEFRAME] for pair, frames in self.timeframe_prices.items()
+                                 if Config.TIMEFRAME in frames}
+
     def run(self):
         """Main execution method"""
         logger.info("Running price collection pipeline")
-        self.collect_prices()
\ No newline at end of file
+        self.collect_prices()
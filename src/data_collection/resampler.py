@@ -0,0 +1,156 @@
+import logging
+import pandas as pd
+
+logger = logging.getLogger('crypto_analyzer.resampler')
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+OHLCV_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum'
+}
+
+TIMEFRAME_UNITS = {
+    'm': 'min',
+    'h': 'h',
+    'd': 'D'
+}
+
+
+def timeframe_to_timedelta(timeframe):
+    """Convert an exchange timeframe string such as '15m' or '4h' to a Timedelta"""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in TIMEFRAME_UNITS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return pd.Timedelta(int(amount), unit=TIMEFRAME_UNITS[unit])
+
+
+def data_end(df, base_length, now=None):
+    """
+    Time up to which base bars are final: the close of the last bar,
+    but never later than now, since exchanges return the forming candle
+    """
+    end = df['timestamp'].iloc[-1] + base_length
+    return end if now is None else min(end, now)
+
+
+def flag_partial(df, bar_length, end):
+    """Set is_partial on bars that do not close by end"""
+    df['is_partial'] = df['timestamp'] + bar_length > end
+    return df
+
+
+def resample_ohlcv(df, timeframe, base_timeframe, now=None):
+    """
+    Aggregate base-resolution OHLCV bars into a higher timeframe.
+    Bars are bucketed on UTC boundaries of the target timeframe. A bar whose
+    bucket is not yet covered by closed base data as of now (UTC) is
+    flagged with is_partial; without now the last base bar counts as closed.
+    """
+    bar_length = timeframe_to_timedelta(timeframe)
+    base_length = timeframe_to_timedelta(base_timeframe)
+    if bar_length < base_length or bar_length % base_length != pd.Timedelta(0):
+        raise ValueError(f"Cannot derive {timeframe} bars from {base_timeframe} data")
+
+    if df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS + ['is_partial'])
+
+    buckets = df['timestamp'].dt.floor(bar_length)
+    resampled = (
+        df.groupby(buckets, sort=True)[list(OHLCV_AGGREGATION)]
+        .agg(OHLCV_AGGREGATION)
+        .rename_axis('timestamp')
+        .reset_index()
+    )
+    return flag_partial(resampled, bar_length, data_end(df, base_length, now))
+
+
+class TimeframeResampler:
+    """
+    Derives higher timeframe OHLCV from a single base-resolution feed.
+    Keeps the base history and derived frames per pair so that new base bars
+    only re-aggregate the buckets they touch.
+    """
+
+    def __init__(self, base_timeframe, timeframes):
+        self.base_timeframe = base_timeframe
+        self.base_length = timeframe_to_timedelta(base_timeframe)
+        self.timeframes = [tf for tf in timeframes if tf != base_timeframe]
+        for timeframe in self.timeframes:
+            # Fail early on timeframes that cannot be derived
+            resample_ohlcv(pd.DataFrame(columns=OHLCV_COLUMNS), timeframe, base_timeframe)
+        self.base_frames = {}
+        self.derived_frames = {}
+
+    def update(self, pair, new_bars, now=None):
+        """
+        Merge new base bars for a pair and refresh every derived timeframe.
+        Bars of every frame, the base one included, that have not closed by
+        now (UTC, defaults to the current time) are flagged with is_partial.
+        Returns a dict of timeframe -> DataFrame, including the base timeframe.
+        """
+        now = pd.Timestamp.now(tz='UTC').tz_localize(None) if now is None else pd.Timestamp(now)
+        base = self._merge_base(pair, new_bars)
+        derived = self.derived_frames.setdefault(pair, {})
+        if base.empty:
+            return self.get_frames(pair)
+
+        end = data_end(base, self.base_length, now)
+        flag_partial(base, self.base_length, end)
+        for timeframe in self.timeframes:
+            bar_length = timeframe_to_timedelta(timeframe)
+            previous = derived.get(timeframe)
+
+            if previous is None or previous.empty:
+                derived[timeframe] = resample_ohlcv(base, timeframe, self.base_timeframe, now)
+                continue
+            if new_bars.empty:
+                # Nothing to re-aggregate, but forming bars may have closed since
+                flag_partial(previous, bar_length, end)
+                continue
+
+            # Only buckets at or after the first new base bar can change
+            affected_from = new_bars['timestamp'].min().floor(bar_length)
+            kept = previous[previous['timestamp'] < affected_from]
+            refreshed = resample_ohlcv(
+                base[base['timestamp'] >= affected_from],
+                timeframe, self.base_timeframe, now)
+            derived[timeframe] = flag_partial(pd.concat([kept, refreshed], ignore_index=True), bar_length, end)
+
+        return self.get_frames(pair)
+
+    def get_frames(self, pair):
+        """Return the base and derived frames held for a pair"""
+        frames = dict(self.derived_frames.get(pair, {}))
+        if pair in self.base_frames:
+            frames[self.base_timeframe] = self.base_frames[pair]
+        return frames
+
+    def trim(self, pair, before):
+        """Drop base and derived bars older than the given timestamp"""
+        if pair in self.base_frames:
+            base = self.base_frames[pair]
+            self.base_frames[pair] = base[base['timestamp'] >= before].reset_index(drop=True)
+        for timeframe, frame in self.derived_frames.get(pair, {}).items():
+            self.derived_frames[pair][timeframe] = (
+                frame[frame['timestamp'] >= before].reset_index(drop=True))
+
+    def _merge_base(self, pair, new_bars):
+        """Append new base bars, letting re-fetched bars replace stored ones"""
+        existing = self.base_frames.get(pair)
+        if existing is None or existing.empty:
+            merged = new_bars.sort_values('timestamp')
+        elif new_bars.empty:
+            return existing
+        elif new_bars['timestamp'].iloc[0] > existing['timestamp'].iloc[-1]:
+            # Common case: strictly newer bars, no reordering needed
+            merged = pd.concat([existing, new_bars], ignore_index=True)
+        else:
+            merged = pd.concat([existing, new_bars], ignore_index=True)
+            merged = merged.drop_duplicates(subset='timestamp', keep='last').sort_values('timestamp')
+        merged = merged.reset_index(drop=True)
+        self.base_frames[pair] = merged
+        return merged
@@ -0,0 +1,278 @@
+import aiohttp
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import datetime
+from config import Config
+from utils.metrics import LATENCY_WINDOW, metrics, percentile
+import logging
+
+logger = logging.getLogger('crypto_analyzer.social_media')
+
+class SocialMediaCollector:
+    """
+    Streams social posts into a bounded queue and scores them with
+    SentimentAnalyzer in micro-batches.
+
+    Producers block on a full queue, so a flood of posts slows ingestion
+    (and, for streamed HTTP feeds, reading from the socket) instead of
+    growing memory. A failed request or malformed post is logged and the
+    source carries on, backing off after consecutive failures.
+    """
+
+    def __init__(self, sentiment_analyzer=None, queue_size=None, batch_size=None, batch_timeout=None):
+        logger.debug("Initializing SocialMediaCollector")
+        if sentiment_analyzer is None:
+            from analysis.sentiment_analyzer import SentimentAnalyzer
+            sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment_analyzer = sentiment_analyzer
+        self.twitter_api_key = Config.TWITTER_API_KEY
+        self.reddit_api_key = Config.REDDIT_API_KEY
+        self.queue_size = queue_size or Config.SOCIAL_QUEUE_SIZE
+        self.batch_size = batch_size or Config.SOCIAL_BATCH_SIZE
+        self.batch_timeout = batch_timeout or Config.SOCIAL_BATCH_TIMEOUT
+        self.queue = None
+        self.scored_posts = deque(maxlen=Config.SOCIAL_MAX_SCORED_POSTS)
+        self._seen_ids = deque(maxlen=Config.SOCIAL_MAX_SCORED_POSTS)
+        self._seen_set = set()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.ingested = 0
+        self.scored = 0
+        self.max_queue_depth = 0
+        self.malformed = 0
+        self.source_errors = 0
+        self.failed_batches = 0
+        self.started_at = None
+
+    def _backoff(self, failures):
+        """Seconds to wait after consecutive failures of a source"""
+        return min(Config.SOCIAL_RETRY_BACKOFF * 2 ** (failures - 1), Config.SOCIAL_MAX_BACKOFF)
+
+    def _is_new(self, post_id):
+        """Remember recent post ids so polled sources do not enqueue duplicates"""
+        if post_id in self._seen_set:
+            return False
+        if len(self._seen_ids) == self._seen_ids.maxlen:
+            self._seen_set.discard(self._seen_ids[0])
+        self._seen_ids.append(post_id)
+        self._seen_set.add(post_id)
+        return True
+
+    async def enqueue(self, post):
+        """Put a post on the queue, waiting while it is full"""
+        if not self._is_new(post['id']):
+            return
+        post['received_at'] = time.time()
+        await self.queue.put(post)
+        self.ingested += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    async def stream_feed(self, session, url):
+        """Read newline-delimited JSON posts from a streaming HTTP feed until it ends, reconnecting after errors"""
+        failures = 0
+        while True:
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=None)) as response:
+                    response.raise_for_status()
+                    failures = 0
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        try:
+                            post = json.loads(line)
+                            post['id'], post['text']
+                        except (ValueError, TypeError, KeyError):
+                            self.malformed += 1
+                            logger.debug(f"Skipping malformed post from {url}: {line[:200]!r}")
+                            continue
+                        await self.enqueue(post)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures += 1
+                self.source_errors += 1
+                delay = self._backoff(failures)
+                logger.warning(f"Social feed {url} failed, reconnecting in {delay}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def poll_reddit(self, session, subreddit):
+        """Poll a subreddit's newest posts"""
+        headers = {'Authorization': f"Bearer {self.reddit_api_key}", 'User-Agent': 'crypto-analyzer'}
+        url = f"https://oauth.reddit.com/r/{subreddit}/new"
+        failures = 0
+        while True:
+            try:
+                start = time.perf_counter()
+                async with session.get(url, params={'limit': 100}, headers=headers) as response:
+                    metrics.record_api_call('reddit', time.perf_counter() - start, response.status == 200)
+                    if response.status != 200:
+                        raise aiohttp.ClientError(f"status {response.status}")
+                    data = await response.json()
+                for child in reversed(data.get('data', {}).get('children', [])):
+                    post = child['data']
+                    await self.enqueue({
+                        'id': f"reddit:{post['id']}",
+                        'platform': 'reddit',
+                        'text': f"{post.get('title', '')} {post.get('selftext', '')}".strip(),
+                        'created_at': post.get('created_utc')
+                    })
+                failures = 0
+                delay = Config.SOCIAL_POLL_INTERVAL
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError) as e:
+                failures += 1
+                self.source_errors += 1
+                delay = self._backoff(failures)
+                logger.error(f"Reddit poll of r/{subreddit} failed, retrying in {delay}s: {str(e)}")
+            await asyncio.sleep(delay)
+
+    async def poll_twitter(self, session, query):
+        """Poll Twitter recent search, resuming from the newest id seen"""
+        headers = {'Authorization': f"Bearer {self.twitter_api_key}"}
+        url = "https://api.twitter.com/2/tweets/search/recent"
+        since_id = None
+        failures = 0
+        while True:
+            params = {'query': query, 'max_results': 100, 'tweet.fields': 'created_at'}
+            if since_id:
+                params['since_id'] = since_id
+            try:
+                start = time.perf_counter()
+                async with session.get(url, params=params, headers=headers) as response:
+                    metrics.record_api_call('twitter', time.perf_counter() - start, response.status == 200)
+                    if response.status != 200:
+                        raise aiohttp.ClientError(f"status {response.status}")
+                    data = await response.json()
+                for tweet in reversed(data.get('data', [])):
+                    created = tweet.get('created_at')
+                    await self.enqueue({
+                        'id': f"twitter:{tweet['id']}",
+                        'platform': 'twitter',
+                        'text': tweet['text'],
+                        'created_at': datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp()
+                        if created else None
+                    })
+                since_id = data.get('meta', {}).get('newest_id', since_id)
+                failures = 0
+                delay = Config.SOCIAL_POLL_INTERVAL
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError) as e:
+                failures += 1
+                self.source_errors += 1
+                delay = self._backoff(failures)
+                logger.error(f"Twitter poll failed, retrying in {delay}s: {str(e)}")
+            await asyncio.sleep(delay)
+
+    async def _next_batch(self):
+        """Wait for one post, then take up to batch_size within batch_timeout"""
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def score_batches(self):
+        """Consume the queue, scoring micro-batches off the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                sentiments = await loop.run_in_executor(
+                    None, self.sentiment_analyzer.analyze_text, [post['text'] for post in batch])
+            except Exception as e:
+                self.failed_batches += 1
+                logger.error(f"Scoring {len(batch)} social posts failed: {str(e)}", exc_info=True)
+                sentiments = []
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+            scored_at = time.time()
+            for post, sentiment in zip(batch, sentiments):
+                sentiment.update({
+                    'id': post['id'],
+                    'platform': post.get('platform'),
+                    'created_at': post.get('created_at'),
+                    'scored_at': scored_at
+                })
+                self.scored_posts.append(sentiment)
+                # End-to-end from the post's creation when the source provides it
+                self._latencies.append(scored_at - (post.get('created_at') or post['received_at']))
+            self.scored += len(sentiments)
+
+    def _sources(self, session):
+        sources = []
+        if Config.SOCIAL_FEED_URL:
+            sources.append(self.stream_feed(session, Config.SOCIAL_FEED_URL))
+        if self.reddit_api_key:
+            sources.extend(self.poll_reddit(session, subreddit) for subreddit in Config.SOCIAL_SUBREDDITS)
+        if self.twitter_api_key:
+            sources.append(self.poll_twitter(session, ' OR '.join(Config.CRYPTO_NEWS_KEYWORDS)))
+        return sources
+
+    async def collect(self, feed_urls=None, duration=None):
+        """
+        Run sources until duration seconds pass or every source finishes,
+        then score the posts still queued before returning.
+        feed_urls replaces the configured sources with NDJSON feeds.
+        """
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.started_at = time.time()
+        async with aiohttp.ClientSession() as session:
+            if feed_urls is not None:
+                sources = [self.stream_feed(session, url) for url in feed_urls]
+            else:
+                sources = self._sources(session)
+            if not sources:
+                logger.warning("No social media sources configured")
+                return []
+            producers = [asyncio.create_task(source) for source in sources]
+            scorer = asyncio.create_task(self.score_batches())
+            try:
+                _, pending = await asyncio.wait(producers, timeout=duration)
+                # Stop ingesting at the deadline, then score every post already queued
+                for task in pending:
+                    task.cancel()
+                for result in await asyncio.gather(*producers, return_exceptions=True):
+                    if isinstance(result, Exception):
+                        logger.error(f"Social source failed: {str(result)}")
+                # Waiting on the scorer too, so a dead scorer cannot leave the join hanging
+                drained = asyncio.create_task(self.queue.join())
+                await asyncio.wait([drained, scorer], return_when=asyncio.FIRST_COMPLETED)
+                drained.cancel()
+                if scorer.done() and not scorer.cancelled() and scorer.exception() is not None:
+                    logger.error(f"Social scorer stopped: {str(scorer.exception())}")
+            finally:
+                for task in producers + [scorer]:
+                    task.cancel()
+                await asyncio.gather(*producers, scorer, return_exceptions=True)
+
+        # Kept apart from the news scores the analyzer's own run produces
+        self.sentiment_analyzer.social_scores = list(self.scored_posts)
+        logger.info(f"Social collection stats: {self.stats()}")
+        return list(self.scored_posts)
+
+    def stats(self):
+        """Ingest rate, queue depth and post->score latency percentiles"""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'ingested': self.ingested,
+            'scored': self.scored,
+            'ingest_rate': self.ingested / elapsed if elapsed else 0.0,
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'malformed': self.malformed,
+            'source_errors': self.source_errors,
+            'failed_batches': self.failed_batches,
+            'latency_p50': percentile(self._latencies, 50),
+            'latency_p95': percentile(self._latencies, 95)
+        }
+
+    def run(self, duration=None):
+        """Main execution method"""
+        logger.info("Running social media collection pipeline")
+        return asyncio.run(self.collect(duration=duration or Config.SOCIAL_COLLECTION_DURATION))
@@ -1,29 +1,111 @@
-from data_collection.news_scraper import NewsScraper
-from data_collection.price_collector import PriceCollector
-from analysis.sentiment_analyzer import SentimentAnalyzer
-from analysis.technical_analyzer import TechnicalAnalyzer
-from report.report_generator import ReportGenerator
+import argparse
+import sys
 from utils.logger import setup_logger
+from utils.metrics import metrics
+from config import Config
 
 logger = setup_logger()
 
+# Upstream stages whose output each stage reads, for checkpoint keys
+STAGE_INPUTS = {
+    'anomaly_detector': ['price_collector'],
+    'sentiment_analyzer': ['news_scraper'],
+    'technical_analyzer': ['price_collector']
+}
+
+def create_components():
+    """
+    Build pipeline components once and wire them to shared collectors,
+    so every stage reads the data the upstream stage collected
+    """
+    from data_collection.news_scraper import NewsScraper
+    from data_collection.price_collector import PriceCollector
+    from analysis.sentiment_analyzer import SentimentAnalyzer
+    from analysis.technical_analyzer import TechnicalAnalyzer
+    from analysis.anomaly_detector import AnomalyDetector
+    from report.report_generator import ReportGenerator
+
+    news_scraper = NewsScraper()
+    price_collector = PriceCollector()
+    sentiment_analyzer = SentimentAnalyzer()
+    technical_analyzer = TechnicalAnalyzer()
+    anomaly_detector = AnomalyDetector(price_collector=price_collector)
+    report_generator = ReportGenerator()
+
+    sentiment_analyzer.news_scraper = news_scraper
+    technical_analyzer.price_collector = price_collector
+    report_generator.news_scraper = news_scraper
+    report_generator.price_collector = price_collector
+    report_generator.sentiment_analyzer = sentiment_analyzer
+    report_generator.technical_analyzer = technical_analyzer
+
+    components = {
+        'news_scraper': news_scraper,
+        'price_collector': price_collector,
+        'sentiment_analyzer': sentiment_analyzer,
+        'technical_analyzer': technical_analyzer,
+        'anomaly_detector': anomaly_detector,
+        'report_generator': report_generator
+    }
+
+    if Config.SHARD_WORKERS:
+        from analysis.sharded_pipeline import ShardedPipeline
+        # Collects and analyzes the top coins in worker processes, publishing
+        # into price_collector and technical_analyzer for the later stages
+        components['sharded_pipeline'] = ShardedPipeline(price_collector, technical_analyzer)
+
+    # Track what the wired components hold, not the unused instances they replaced
+    metrics.memory_budget_bytes = Config.MEMORY_BUDGET_MB * 2**20
+    for name, component in components.items():
+        if hasattr(component, 'memory_usage'):
+            metrics.register_memory(name, component.memory_usage)
+
+    return components
+
+def expand_stages(components, names):
+    """Stage names to run, with price collection and technical analysis sharded when enabled"""
+    if 'sharded_pipeline' not in components:
+        return list(names)
+    return [('sharded_pipeline' if name == 'price_collector' else name)
+            for name in names if name != 'technical_analyzer']
+
+def run_pipeline(components, names):
+    """
+    Run stages in order. With CHECKPOINTS enabled, stages whose inputs are
+    unchanged since a previous run restore that run's output instead;
+    collected sources are only restored when resuming a run that failed.
+    """
+    names = expand_stages(components, names)
+    if not Config.CHECKPOINTS:
+        for name in names:
+            with metrics.stage(name):
+                components[name].run()
+        return
+
+    from utils.checkpoint import CheckpointStore
+
+    checkpoints = CheckpointStore()
+    checkpoints.start_run()
+    for name in names:
+        with metrics.stage(name):
+            checkpoints.run_stage(name, components[name], STAGE_INPUTS.get(name, ()))
+    checkpoints.finish_run()
+    logger.info(f"Checkpoints: {checkpoints.hits} restored, {checkpoints.misses} stages run")
+    checkpoints.collect_garbage()
+
 def main():
+    components = None
     try:
         logger.info("Starting crypto analysis process...")
 
         # Initialize and run components
-        news_scraper = NewsScraper()
-        price_collector = PriceCollector()
-        sentiment_analyzer = SentimentAnalyzer()
-        technical_analyzer = TechnicalAnalyzer()
-        report_generator = ReportGenerator()
+        components = create_components()
 
         # Execute analysis pipeline
-        news_scraper.run()
-        price_collector.run()
-        sentiment_analyzer.run()
-        technical_analyzer.run()
-        report_generator.run()
+        run_pipeline(components, ['news_scraper', 'price_collector', 'anomaly_detector',
+                                  'sentiment_analyzer', 'technical_analyzer', 'report_generator'])
+
+        persist(components)
 
         logger.info("Analysis completed successfully!")
 
@@ -31,5 +113,236 @@ def main():
         logger.error(f"Error in main execution: {str(e)}", exc_info=True)
         raise
 
+    finally:
+        metrics.write(Config.METRICS_DIR)
+        if components is not None:
+            components['report_generator'].close()
+            if 'sharded_pipeline' in components:
+                components['sharded_pipeline'].close()
+
+def persist(components, storage=None):
+    """Write collected and analyzed data to DATABASE_URL when one is configured"""
+    if not Config.DATABASE_URL:
+        return None
+    from storage.database import create_storage
+
+    storage = storage or create_storage()
+    with metrics.stage('storage'):
+        storage.persist_pipeline(components)
+    return storage
+
+def run_daemon():
+    """
+    Keep the pipeline resident and run each stage on its own cadence.
+    Clients, caches and collected history stay warm between cycles.
+    """
+    import threading
+    from utils.scheduler import Scheduler
+
+    logger.info("Starting crypto analysis daemon...")
+    components = create_components()
+
+    storage = None
+    if Config.DATABASE_URL:
+        from storage.database import create_storage
+        storage = create_storage()
+
+    def run_stages(*names):
+        for name in expand_stages(components, names):
+            with metrics.stage(name):
+                components[name].run()
+        if storage is not None:
+            with metrics.stage('storage'):
+                storage.persist_pipeline({name: components[name] for name in names})
+
+    def maintain_storage():
+        storage.apply_retention()
+        storage.compact()
+
+    def update_report():
+        run_stages('report_generator')
+        metrics.write(Config.METRICS_DIR)
+
+    scheduler = Scheduler(jitter=Config.SCHEDULER_JITTER)
+    # Stages mutate the components' result dicts in place, so jobs sharing
+    # them run one at a time and a report never sees a half-updated cycle
+    components_lock = threading.Lock()
+    # Anomalies are checked as soon as new bars land, before the slower analysis
+    scheduler.add_job('prices', lambda: run_stages('price_collector', 'anomaly_detector', 'technical_analyzer'),
+                      Config.MARKET_DATA_UPDATE_INTERVAL, lock=components_lock)
+    scheduler.add_job('news', lambda: run_stages('news_scraper', 'sentiment_analyzer'),
+                      Config.UPDATE_INTERVAL, lock=components_lock)
+    scheduler.add_job('report', update_report, Config.UPDATE_FREQUENCY, run_immediately=False,
+                      lock=components_lock)
+    if storage is not None:
+        scheduler.add_job('storage_maintenance', maintain_storage,
+                          Config.STORAGE_MAINTENANCE_INTERVAL, run_immediately=False)
+    scheduler.install_signal_handlers()
+    try:
+        scheduler.run_forever()
+    finally:
+        components['report_generator'].close()
+        if 'sharded_pipeline' in components:
+            components['sharded_pipeline'].close()
+
+    logger.info("Daemon stopped")
+
+def run_collect(args):
+    """Collect prices and/or news only"""
+    if args.source in ('prices', 'all'):
+        from data_collection.price_collector import PriceCollector
+        PriceCollector().run()
+    if args.source in ('news', 'all'):
+        from data_collection.news_scraper import NewsScraper
+        NewsScraper().run()
+    if args.source == 'social':
+        from data_collection.social_media import SocialMediaCollector
+        SocialMediaCollector().run()
+
+def run_analyze(args):
+    """Collect data and run sentiment and technical analysis without a report"""
+    components = create_components()
+    try:
+        run_pipeline(components, ['news_scraper', 'price_collector', 'anomaly_detector',
+                                  'sentiment_analyzer', 'technical_analyzer'])
+        persist(components)
+    finally:
+        if 'sharded_pipeline' in components:
+            components['sharded_pipeline'].close()
+    logger.info("Analysis stages completed")
+    metrics.write(Config.METRICS_DIR)
+
+def run_research(args):
+    """Generate the AI research report, or one report per tracked asset"""
+    if args.per_asset:
+        run_asset_research()
+        return
+
+    import asyncio
+    from agent.researcher import ResearchAgent
+
+    async def research():
+        agent = ResearchAgent()
+        try:
+            return await agent.run()
+        finally:
+            await agent.close()
+
+    report = asyncio.run(research())
+    print(report['analysis'])
+
+def run_asset_research():
+    """Collect and analyze, then research every analyzed asset concurrently"""
+    from agent.batch_research import BatchResearcher
+
+    components = create_components()
+    try:
+        run_pipeline(components, ['news_scraper', 'price_collector', 'sentiment_analyzer', 'technical_analyzer'])
+        researcher = BatchResearcher()
+        with metrics.stage('asset_research'):
+            reports = researcher.run_from_pipeline(components)
+    finally:
+        if 'sharded_pipeline' in components:
+            components['sharded_pipeline'].close()
+        metrics.write(Config.METRICS_DIR)
+
+    if Config.DATABASE_URL:
+        from storage.database import create_storage
+        storage = create_storage()
+        for symbol, report in reports.items():
+            storage.write_research_report(report, symbol=symbol)
+
+    for symbol, report in sorted(reports.items()):
+        print(f"## {symbol}\n\n{report['analysis']}\n")
+    for symbol, error in sorted(researcher.failures.items()):
+        print(f"## {symbol}\n\nResearch failed: {error}\n")
+
+def run_validate(args):
+    """Validate configuration, optionally probing news sources"""
+    Config.validate()
+    logger.info("Configuration is valid")
+    if args.check_sources:
+        Config.validate_sources()
+
+def run_profile_imports(args):
+    """Print an import-time profile for each stage module"""
+    from utils.startup_profile import profile_imports, format_import_profile
+
+    for module in args.modules:
+        print(format_import_profile(module, profile_imports(module, top=args.top)))
+        print()
+
+def run_startup_bench(args):
+    """Fail when importing main.py gets slower or pulls in heavy dependencies"""
+    from utils.startup_profile import check_startup_budget
+
+    results = check_startup_budget(repeats=args.repeats, budget=args.budget)
+    print(
+        f"median startup {results['median_seconds']:.3f}s "
+        f"(budget {results['budget_seconds']:.3f}s), "
+        f"heavy modules loaded: {results['heavy_modules_loaded'] or 'none'}"
+    )
+    if not results['passed']:
+        sys.exit(1)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Crypto market analysis pipeline")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"cProfile and tracemalloc each stage into {Config.PROFILE_DIR}/")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Ignore stage checkpoints and run every stage")
+    subparsers = parser.add_subparsers(dest='command')
+
+    collect = subparsers.add_parser('collect', help="Fetch prices and/or news")
+    collect.add_argument('--source', choices=['prices', 'news', 'social', 'all'], default='all')
+    collect.set_defaults(func=run_collect)
+
+    analyze = subparsers.add_parser('analyze', help="Collect and analyze without generating a report")
+    analyze.set_defaults(func=run_analyze)
+
+    report = subparsers.add_parser('report', help="Run the full pipeline (default)")
+    report.set_defaults(func=lambda args: main())
+
+    research = subparsers.add_parser('research', help="Generate the AI research report")
+    research.add_argument('--per-asset', action='store_true',
+                          help="Collect and analyze, then research each analyzed asset concurrently")
+    research.set_defaults(func=run_research)
+
+    validate = subparsers.add_parser('validate', help="Validate configuration")
+    validate.add_argument('--check-sources', action='store_true',
+                          help="Also check that news sources are reachable")
+    validate.set_defaults(func=run_validate)
+
+    daemon = subparsers.add_parser('daemon', help="Run continuously on configured intervals")
+    daemon.set_defaults(func=lambda args: run_daemon())
+
+    profile = subparsers.add_parser('profile-imports', help="Show import time per stage module")
+    profile.add_argument('--top', type=int, default=15)
+    profile.add_argument('modules', nargs='*', default=[
+        'data_collection.price_collector',
+        'data_collection.news_scraper',
+        'analysis.sentiment_analyzer',
+        'analysis.technical_analyzer',
+        'report.report_generator',
+        'agent.researcher'
+    ])
+    profile.set_defaults(func=run_profile_imports)
+
+    bench = subparsers.add_parser('startup-bench', help="Startup-time regression check")
+    bench.add_argument('--repeats', type=int, default=5)
+    bench.add_argument('--budget', type=float, default=None,
+                       help="Max median seconds (default Config.STARTUP_TIME_BUDGET)")
+    bench.set_defaults(func=run_startup_bench)
+
+    return parser
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = build_parser().parse_args()
+    if args.profile:
+        metrics.enable_profiling(Config.PROFILE_DIR)
+    if args.fresh:
+        Config.CHECKPOINTS = False
+    if args.command is None:
+        main()
+    else:
+        args.func(args)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+import jinja2
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('crypto_analyzer.renderer')
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+FORMATS = {
+    'html': {'extension': 'html', 'autoescape': True},
+    'md': {'extension': 'md', 'autoescape': False}
+}
+
+
+def view_model_hash(view_model):
+    """Stable hash of a JSON-serializable section view model"""
+    payload = json.dumps(view_model, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ReportRenderer:
+    """
+    Renders reports from per-section view models with Jinja2.
+    Each rendered section is cached by a hash of its view model, so a
+    rebuild only re-renders the sections whose inputs changed.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, cache_size=None):
+        self.environments = {
+            name: jinja2.Environment(
+                loader=jinja2.FileSystemLoader(template_dir),
+                autoescape=spec['autoescape'],
+                trim_blocks=True,
+                lstrip_blocks=True
+            )
+            for name, spec in FORMATS.items()
+        }
+        self.cache_size = cache_size or Config.REPORT_SECTION_CACHE_SIZE
+        self._sections = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        metrics.register_cache('report_sections', self.stats)
+
+    def render_section(self, name, view_model, fmt):
+        """Render one section, reusing the cached output when its inputs are unchanged"""
+        key = (name, fmt, view_model_hash(view_model))
+        if key in self._sections:
+            self._sections.move_to_end(key)
+            self.hits += 1
+            return self._sections[key]
+
+        self.misses += 1
+        template = self.environments[fmt].get_template(f"{name}.{FORMATS[fmt]['extension']}.j2")
+        rendered = template.render(**view_model)
+        self._sections[key] = rendered
+        while len(self._sections) > self.cache_size:
+            self._sections.popitem(last=False)
+        logger.debug(f"Rendered section {name} ({fmt})")
+        return rendered
+
+    def _layout_context(self, view_models, fmt):
+        return {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'sections': (
+                self.render_section(name, view_model, fmt)
+                for name, view_model in view_models.items()
+            )
+        }
+
+    def render(self, view_models, fmt='html'):
+        """Render a full report to a string"""
+        template = self.environments[fmt].get_template(f"report.{FORMATS[fmt]['extension']}.j2")
+        return template.render(**self._layout_context(view_models, fmt))
+
+    def render_to_file(self, view_models, path, fmt='html'):
+        """Stream a full report to disk section by section"""
+        template = self.environments[fmt].get_template(f"report.{FORMATS[fmt]['extension']}.j2")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        template.stream(**self._layout_context(view_models, fmt)).dump(path, encoding='utf-8')
+        logger.info(f"Wrote {fmt} report to {path}")
+        return path
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._sections)
+        }
@@ -1,14 +1,16 @@
-import jinja2
-import matplotlib.pyplot as plt
+import os
 from datetime import datetime
 from data_collection.news_scraper import NewsScraper
 from data_collection.price_collector import PriceCollector
 from analysis.sentiment_analyzer import SentimentAnalyzer
 from analysis.technical_analyzer import TechnicalAnalyzer
-from utils.logger import setup_logger
+from report import view_models
+from report.renderer import ReportRenderer
+from report import visualizations
 from config import Config
+import logging
 
-logger = setup_logger()
+logger = logging.getLogger('crypto_analyzer.report_generator')
 
 class ReportGenerator:
     def __init__(self):
@@ -17,35 +19,103 @@ class ReportGenerator:
         self.price_collector = PriceCollector()
         self.sentiment_analyzer = SentimentAnalyzer()
         self.technical_analyzer = TechnicalAnalyzer()
+        self.market_analyzer = None
+        self.renderer = ReportRenderer()
+        self.chart_renderer = visualizations.ChartRenderer()
+        self.report_files = []
 
     def generate_report(self):
+        """
+        Build compact per-section view models from the collected data.
+        Only the latest values needed for rendering are kept, not the
+        underlying frames and indicator series.
+        """
         report_data = {
-            'news_data': self.news_scraper.collected_news,
-            'price_data': self.price_collector.collected_prices,
-            'sentiment_results': self.sentiment_analyzer.sentiment_scores,
-            'technical_results': self.technical_analyzer.analysis_results
+            'prices': view_models.price_section(self.price_collector.collected_prices),
+            'technical': view_models.technical_section(self.technical_analyzer.analysis_results),
+            'sentiment': view_models.sentiment_section(self.sentiment_analyzer.sentiment_scores),
+            'news': view_models.news_section(self.news_scraper.collected_news)
         }
-        # Generate report using the collected data
+        market_overview = self.generate_market_overview()
+        if market_overview:
+            report_data['market'] = view_models.market_section(market_overview)
+        if Config.REPORT_CHARTS:
+            report_data['charts'] = self.generate_charts()
         return report_data
 
+    def generate_charts(self):
+        """Render price, sentiment, correlation and sector charts and return the charts view model"""
+        price_data = self.price_collector.collected_prices
+        technical_results = self.technical_analyzer.analysis_results
+        titles = {}
+
+        for pair, df in sorted(price_data.items()):
+            if df is None or df.empty:
+                continue
+            analysis = technical_results.get(pair) or {}
+            payload = visualizations.price_panel_payload(pair, df, analysis.get('indicators'))
+            self.chart_renderer.add(pair, 'price_panel', payload)
+            titles[pair] = pair
+
+        if len(price_data) > 1:
+            self.chart_renderer.add('correlation', 'correlation_matrix',
+                                    visualizations.correlation_payload(price_data))
+            titles['correlation'] = 'Return correlation'
+
+        news_data = self.news_scraper.collected_news
+        sentiment_scores = self.sentiment_analyzer.sentiment_scores
+        if sentiment_scores and len(sentiment_scores) == len(news_data):
+            self.chart_renderer.add('sentiment', 'sentiment_timeline',
+                                    visualizations.sentiment_timeline_payload(news_data, sentiment_scores))
+            titles['sentiment'] = 'News sentiment'
+
+        if self.market_analyzer is not None and self.market_analyzer.market_trends:
+            self.chart_renderer.add('sectors', 'sector_heatmap', visualizations.sector_heatmap_payload(
+                self.market_analyzer.market_trends['sector_performance']))
+            titles['sectors'] = 'Sector performance'
+
+        paths = self.chart_renderer.render_all()
+        return {
+            'images': [
+                {'title': titles[name], 'path': os.path.relpath(path, Config.REPORT_DIR)}
+                for name, path in paths.items()
+            ]
+        }
+
+    def render_reports(self, report_data):
+        """Render the report in every configured format and stream it to disk"""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        files = []
+        for fmt in Config.REPORT_FORMATS:
+            path = os.path.join(Config.REPORT_DIR, f"crypto_report_{stamp}.{fmt}")
+            files.append(self.renderer.render_to_file(report_data, path, fmt))
+        return files
+
+    def close(self):
+        """Stop the chart rendering workers"""
+        self.chart_renderer.close()
+
     def run(self):
         """Main execution method"""
         logger.info("Generating final report")
-        self.generate_report()
+        report_data = self.generate_report()
+        self.report_files = self.render_reports(report_data)
+        logger.info(f"Section cache: {self.renderer.stats()}")
+        return self.report_files
 
     def generate_market_overview(self):
         """Generate market-wide overview and trends"""
+        if self.market_analyzer is None or not self.market_analyzer.market_trends:
+            return None
         market_data = self.market_analyzer.market_trends
         
         overview = {
             'trending_sectors': [
-                sector for sector in market_data['sector_performance']
-                if sector['momentum'] > Config.TRENDING_THRESHOLD
+                sector for sector, performance in market_data['sector_performance'].items()
+                if performance['momentum'] > Config.TRENDING_THRESHOLD
             ],
             'emerging_narratives': market_data['narratives'][:5],  # Top 5 narratives
-            'sentiment_shifts': market_data['market_sentiment'],
-            'correlated_movements': self._identify_correlations(),
-            'volume_trends': self._analyze_volume_patterns()
+            'sentiment_shifts': market_data['market_sentiment']
         }
         
-        return overview
\ No newline at end of file
+        return overview
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+from config import Config
+
+PRICE_CHANGE_WINDOW = 24  # bars used for the recent change column
+
+SIGNAL_COLUMNS = ['rsi_oversold', 'rsi_overbought', 'ma_crossover', 'ma_crossunder',
+                  'macd_crossover', 'macd_crossunder', 'price_above_bb', 'price_below_bb']
+BULLISH_SIGNALS = ['rsi_oversold', 'ma_crossover', 'macd_crossover', 'price_below_bb']
+BEARISH_SIGNALS = ['rsi_overbought', 'ma_crossunder', 'macd_crossunder', 'price_above_bb']
+
+
+def _last(values):
+    """Last element of a Series, array or scalar as a plain Python value"""
+    if values is None:
+        return None
+    if hasattr(values, 'iloc'):
+        value = values.iloc[-1] if len(values) else None
+    elif isinstance(values, np.ndarray):
+        value = values[-1] if len(values) else None
+    else:
+        value = values
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, 6)
+    return value
+
+
+def price_section(price_data):
+    """Latest price, recent change and range per pair"""
+    rows = []
+    for pair, df in sorted(price_data.items()):
+        if df is None or df.empty:
+            continue
+        close = df['close']
+        window = close.tail(PRICE_CHANGE_WINDOW + 1)
+        change = (window.iloc[-1] / window.iloc[0] - 1) * 100 if len(window) > 1 else 0.0
+        rows.append({
+            'pair': pair,
+            'last_close': _last(close),
+            'change_pct': round(float(change), 2),
+            'high': _last(df['high'].tail(PRICE_CHANGE_WINDOW).max()),
+            'low': _last(df['low'].tail(PRICE_CHANGE_WINDOW).min()),
+            'candles': len(df),
+            'last_updated': str(df['timestamp'].iloc[-1])
+        })
+    return {'window': PRICE_CHANGE_WINDOW, 'pairs': rows}
+
+
+def technical_section(technical_results):
+    """Latest indicator values and active signals per pair"""
+    rows = []
+    for pair, analysis in sorted(technical_results.items()):
+        if not analysis:
+            continue
+        indicators = analysis['indicators']
+        signals = analysis['signals']['signals']
+        active = [name for name in SIGNAL_COLUMNS if _last(signals.get(name))]
+        bullish = sum(name in active for name in BULLISH_SIGNALS)
+        bearish = sum(name in active for name in BEARISH_SIGNALS)
+        rows.append({
+            'pair': pair,
+            'rsi': _last(indicators.get('rsi')),
+            'macd': _last(indicators.get('macd')),
+            'macd_signal': _last(indicators.get('macd_signal')),
+            'bb_upper': _last(indicators.get('bb_upper')),
+            'bb_lower': _last(indicators.get('bb_lower')),
+            'active_signals': active,
+            'bias': 'bullish' if bullish > bearish else 'bearish' if bearish > bullish else 'neutral'
+        })
+    return {'pairs': rows}
+
+
+def sentiment_section(sentiment_scores):
+    """Aggregate polarity and the most bullish/bearish texts"""
+    if not sentiment_scores:
+        return {'count': 0}
+    polarities = [score['polarity'] for score in sentiment_scores]
+    ranked = sorted(sentiment_scores, key=lambda score: score['polarity'])
+
+    def excerpt(score):
+        return {'text': score['text'][:200], 'polarity': round(score['polarity'], 3)}
+
+    return {
+        'count': len(sentiment_scores),
+        'average_polarity': round(float(np.mean(polarities)), 4),
+        'bullish': sum(score['is_bullish'] for score in sentiment_scores),
+        'bearish': sum(score['is_bearish'] for score in sentiment_scores),
+        'most_bullish': [excerpt(score) for score in ranked[-3:][::-1]],
+        'most_bearish': [excerpt(score) for score in ranked[:3]]
+    }
+
+
+def news_section(news_data):
+    """Most recent headlines"""
+    articles = sorted(news_data, key=lambda article: article.get('publishedAt') or '', reverse=True)
+    return {
+        'total': len(news_data),
+        'articles': [
+            {
+                'title': article.get('title'),
+                'source': (article.get('source') or {}).get('name'),
+                'url': article.get('url'),
+                'published_at': article.get('publishedAt')
+            }
+            for article in articles[:Config.REPORT_TOP_NEWS]
+        ]
+    }
+
+
+def market_section(market_overview):
+    """Market-wide trends, when a MarketAnalyzer has run"""
+    return {'overview': market_overview or {}}
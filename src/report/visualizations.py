@@ -0,0 +1,322 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('crypto_analyzer.visualizations')
+
+# Bump when chart drawing code changes so cached images are redrawn
+CHART_VERSION = 1
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-triangle-three-buckets downsampling.
+    Returns the indices of at most threshold points that preserve the
+    visual shape of the (x, y) series, always keeping the first and last.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous
+        # selection and the average of the next bucket
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def _series_values(values):
+    return np.asarray(values.to_numpy() if hasattr(values, 'to_numpy') else values, dtype=np.float64)
+
+
+def _align_tail(values, length):
+    """Left-pad a retained tail of indicator values with NaN to match the price rows"""
+    if len(values) >= length:
+        return values[len(values) - length:]
+    return np.concatenate([np.full(length - len(values), np.nan), values])
+
+
+def price_panel_payload(pair, df, indicators=None, max_points=None):
+    """Downsampled arrays for a price/indicator panel, aligned on one LTTB index"""
+    max_points = max_points or Config.CHART_MAX_POINTS
+    timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    close = _series_values(df['close'])
+    keep = lttb(timestamps, close, max_points)
+
+    payload = {
+        'title': pair,
+        'timestamps': timestamps[keep],
+        'close': close[keep],
+        'volume': _series_values(df['volume'])[keep]
+    }
+    for name in ['ma_short', 'ma_long', 'bb_upper', 'bb_lower', 'rsi', 'macd', 'macd_signal']:
+        if indicators and indicators.get(name) is not None:
+            payload[name] = _align_tail(_series_values(indicators[name]), len(close))[keep]
+    return payload
+
+
+def sector_heatmap_payload(sector_performance):
+    """Sector x metric matrix from MarketAnalyzer.analyze_sector_performance output"""
+    sectors = sorted(sector_performance)
+    metric_names = ['average_return', 'momentum']
+    matrix = np.array([
+        [float(sector_performance[sector].get(name) or 0.0) for name in metric_names]
+        for sector in sectors
+    ])
+    return {'title': 'Sector performance', 'rows': sectors, 'columns': metric_names, 'matrix': matrix}
+
+
+def sentiment_timeline_payload(news_data, sentiment_scores, max_points=None):
+    """Polarity over time, pairing each score with its article's publish time"""
+    max_points = max_points or Config.CHART_MAX_POINTS
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime([article.get('publishedAt') for article in news_data], utc=True),
+        'polarity': [score['polarity'] for score in sentiment_scores]
+    }).dropna().sort_values('timestamp')
+    timestamps = frame['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    polarity = frame['polarity'].to_numpy(dtype=np.float64)
+    keep = lttb(timestamps, polarity, max_points)
+    return {'title': 'News sentiment', 'timestamps': timestamps[keep], 'polarity': polarity[keep]}
+
+
+def correlation_payload(price_data):
+    """Correlation matrix of close-to-close returns across pairs"""
+    closes = pd.DataFrame({
+        pair: df.set_index('timestamp')['close'] for pair, df in price_data.items() if not df.empty
+    })
+    corr = closes.pct_change().corr()
+    return {
+        'title': 'Return correlation',
+        'rows': list(corr.index),
+        'columns': list(corr.columns),
+        'matrix': corr.to_numpy()
+    }
+
+
+def payload_fingerprint(kind, payload):
+    """Hash of a chart's kind and downsampled data, used as its image cache key"""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{kind}:{CHART_VERSION}".encode())
+    for name in sorted(payload):
+        value = payload[name]
+        digest.update(name.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _draw_price_panel(plt, payload):
+    times = payload['timestamps'].astype('datetime64[ms]')
+    has_rsi = 'rsi' in payload
+    fig, axes = plt.subplots(3 if has_rsi else 2, 1, figsize=(10, 7 if has_rsi else 5), sharex=True,
+                             gridspec_kw={'height_ratios': [3, 1, 1] if has_rsi else [3, 1]})
+    price_ax = axes[0]
+    price_ax.plot(times, payload['close'], label='close', linewidth=1)
+    for name in ['ma_short', 'ma_long']:
+        if name in payload:
+            price_ax.plot(times, payload[name], label=name, linewidth=0.8)
+    if 'bb_upper' in payload and 'bb_lower' in payload:
+        price_ax.fill_between(times, payload['bb_lower'], payload['bb_upper'], alpha=0.15, label='bbands')
+    price_ax.legend(loc='upper left', fontsize='small')
+    price_ax.set_title(payload['title'])
+    axes[1].fill_between(times, 0, payload['volume'], step='mid', linewidth=0)
+    axes[1].set_ylabel('volume')
+    if has_rsi:
+        axes[2].plot(times, payload['rsi'], linewidth=0.8)
+        axes[2].axhline(70, color='red', linewidth=0.5)
+        axes[2].axhline(30, color='green', linewidth=0.5)
+        axes[2].set_ylabel('rsi')
+    fig.autofmt_xdate()
+    return fig
+
+
+def _draw_matrix(plt, payload, cmap, vmin=None, vmax=None):
+    fig, ax = plt.subplots(figsize=(max(4, len(payload['columns']) * 0.6 + 2),
+                                    max(3, len(payload['rows']) * 0.4 + 1)))
+    image = ax.imshow(payload['matrix'], cmap=cmap, vmin=vmin, vmax=vmax, aspect='auto')
+    ax.set_xticks(range(len(payload['columns'])), payload['columns'], rotation=45, ha='right')
+    ax.set_yticks(range(len(payload['rows'])), payload['rows'])
+    ax.set_title(payload['title'])
+    fig.colorbar(image, ax=ax)
+    return fig
+
+
+def _draw_sentiment_timeline(plt, payload):
+    fig, ax = plt.subplots(figsize=(10, 3))
+    times = payload['timestamps'].astype('datetime64[ms]')
+    ax.plot(times, payload['polarity'], linewidth=0.8)
+    ax.axhline(0, color='grey', linewidth=0.5)
+    ax.set_ylim(-1, 1)
+    ax.set_title(payload['title'])
+    return fig
+
+
+def render_chart(kind, payload, path):
+    """Draw one chart to path; runs inside pool workers"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    if kind == 'price_panel':
+        fig = _draw_price_panel(plt, payload)
+    elif kind == 'sector_heatmap':
+        fig = _draw_matrix(plt, payload, 'RdYlGn')
+    elif kind == 'correlation_matrix':
+        fig = _draw_matrix(plt, payload, 'coolwarm', vmin=-1, vmax=1)
+    elif kind == 'sentiment_timeline':
+        fig = _draw_sentiment_timeline(plt, payload)
+    else:
+        raise ValueError(f"Unknown chart kind: {kind}")
+
+    fig.tight_layout()
+    temp_path = f"{path}.tmp.png"
+    fig.savefig(temp_path, dpi=Config.CHART_DPI)
+    plt.close(fig)
+    os.replace(temp_path, path)
+    return path
+
+
+class ChartRenderer:
+    """
+    Renders charts in parallel across a process pool kept for the life of
+    the renderer. Images are cached on disk under a fingerprint of their
+    downsampled data, so unchanged charts are never redrawn; images no
+    report has used for CHART_MAX_AGE are removed. A chart that fails to
+    render is logged and left out, the rest of the report goes on.
+    """
+
+    def __init__(self, output_dir=None, max_workers=None, max_age=None):
+        self.output_dir = output_dir or Config.CHART_DIR
+        self.max_workers = max_workers or Config.CHART_WORKERS or os.cpu_count()
+        self.max_age = max_age or Config.CHART_MAX_AGE
+        self.pool = None
+        self.jobs = []
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        metrics.register_cache('charts', self.stats)
+
+    def add(self, name, kind, payload):
+        """Queue a chart; name identifies it in the returned mapping"""
+        self.jobs.append((name, kind, payload))
+
+    def _pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker)
+        return self.pool
+
+    def _render_pending(self, pending):
+        """Render (name, kind, payload, path) jobs and return the names that failed"""
+        failed = []
+        if len(pending) <= 1 or self.max_workers == 1:
+            for name, kind, payload, path in pending:
+                try:
+                    render_chart(kind, payload, path)
+                except Exception as e:
+                    logger.warning(f"Chart {name} failed: {str(e)}")
+                    failed.append(name)
+            return failed
+
+        futures = {self._pool().submit(render_chart, kind, payload, path): name
+                   for name, kind, payload, path in pending}
+        broken = False
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Chart {futures[future]} failed: {str(e)}")
+                failed.append(futures[future])
+                broken = broken or isinstance(e, BrokenProcessPool)
+        if broken:
+            # A crashed worker breaks the pool; start a fresh one next time
+            self.close()
+        return failed
+
+    def render_all(self):
+        """Render every queued chart and return {name: image path} for those that succeeded"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = {}
+        pending = []
+        now = time.time()
+        for name, kind, payload in self.jobs:
+            safe_name = ''.join(c if c.isalnum() else '_' for c in name)
+            path = os.path.join(self.output_dir, f"{safe_name}_{payload_fingerprint(kind, payload)}.png")
+            paths[name] = path
+            if os.path.exists(path):
+                self.hits += 1
+                # Marks the image as in use for collect_garbage
+                os.utime(path, (now, now))
+            else:
+                self.misses += 1
+                pending.append((name, kind, payload, path))
+        self.jobs = []
+
+        failed = self._render_pending(pending)
+        for name in failed:
+            del paths[name]
+        self.failures += len(failed)
+        self.collect_garbage()
+
+        logger.info(f"Charts: {len(pending) - len(failed)} rendered, {len(failed)} failed, "
+                    f"{len(paths) - len(pending) + len(failed)} reused from cache")
+        return paths
+
+    def collect_garbage(self):
+        """Remove images, and leftovers of interrupted renders, unused for max_age seconds"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            try:
+                if name.endswith('.png') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.info(f"Removed {removed} old chart images")
+        return removed
+
+    def close(self):
+        """Stop the worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'failures': self.failures}
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+import pandas as pd
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('crypto_analyzer.storage')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, timeframe, timestamp)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    source TEXT,
+    title TEXT,
+    content TEXT,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source_timestamp ON articles (source, timestamp);
+CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles (timestamp);
+
+CREATE TABLE IF NOT EXISTS sentiment_scores (
+    text_hash TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    polarity REAL,
+    subjectivity REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sentiment_symbol_timestamp ON sentiment_scores (symbol, timestamp);
+
+CREATE TABLE IF NOT EXISTS indicator_snapshots (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    values_json TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe, timestamp)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS market_overviews (
+    timestamp INTEGER PRIMARY KEY,
+    data_json TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS research_reports (
+    symbol TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    analysis TEXT,
+    data_json TEXT,
+    PRIMARY KEY (symbol, timestamp)
+) WITHOUT ROWID;
+"""
+
+# Table -> timestamp column used by the retention policy
+RETENTION_TABLES = ['candles', 'articles', 'sentiment_scores', 'indicator_snapshots',
+                    'market_overviews', 'research_reports']
+
+MARKET_SYMBOL = '*'  # symbol used for market-wide rows
+
+
+def to_epoch_ms(values):
+    """Convert datetimes (Series, Timestamp or ISO string) to epoch milliseconds; naive means UTC"""
+    if isinstance(values, pd.Series):
+        stamps = pd.to_datetime(values, utc=True).dt.tz_localize(None)
+        return stamps.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    stamp = pd.Timestamp(values)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert('UTC').tz_localize(None)
+    return int(stamp.to_datetime64().astype('datetime64[ms]').astype(np.int64))
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def create_storage(url=None):
+    """Create a storage backend for a DATABASE_URL such as sqlite:///data/crypto.db"""
+    url = url or Config.DATABASE_URL
+    if not url:
+        raise ValueError("DATABASE_URL is not configured")
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        # sqlite:///relative.db and sqlite:////absolute.db, as in SQLAlchemy
+        path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else parsed.path
+        return SQLiteStorage(path or ':memory:')
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {parsed.scheme}")
+
+
+class SQLiteStorage:
+    """
+    SQLite persistence for candles, articles, sentiment scores, indicator
+    snapshots, market overviews and research reports.
+    Every write is a batched upsert inside a single transaction.
+    """
+
+    def __init__(self, path):
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._high_water = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        logger.debug(f"Opened SQLite storage at {path}")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _write(self, name, sql, rows):
+        """Run one executemany upsert in a single transaction"""
+        if not rows:
+            return 0
+        start = time.perf_counter()
+        with self._lock, self.conn:
+            self.conn.executemany(sql, rows)
+        metrics.increment(f"storage_rows_{name}", len(rows))
+        logger.debug(f"Stored {len(rows)} {name} rows in {time.perf_counter() - start:.3f}s")
+        return len(rows)
+
+    def write_candles(self, symbol, timeframe, df):
+        """Upsert OHLCV rows for one symbol and timeframe"""
+        if df is None or df.empty:
+            return 0
+        timestamps = to_epoch_ms(df['timestamp'])
+        columns = [df[column].to_numpy(dtype=np.float64).tolist()
+                   for column in ['open', 'high', 'low', 'close', 'volume']]
+        rows = list(zip([symbol] * len(df), [timeframe] * len(df), timestamps.tolist(), *columns))
+        return self._write('candles', """
+            INSERT INTO candles (symbol, timeframe, timestamp, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+                open = excluded.open, high = excluded.high, low = excluded.low,
+                close = excluded.close, volume = excluded.volume
+        """, rows)
+
+    def write_timeframes(self, timeframe_prices):
+        """
+        Upsert {symbol: {timeframe: frame}} as collected by PriceCollector.
+        Only bars at or after the last one written are sent, so the most
+        recent (possibly partial) bar is refreshed without rewriting history.
+        """
+        written = 0
+        for symbol, frames in timeframe_prices.items():
+            for timeframe, df in frames.items():
+                if df is None or df.empty:
+                    continue
+                high_water = self._high_water.get((symbol, timeframe))
+                if high_water is not None:
+                    df = df[df['timestamp'] >= high_water]
+                    if df.empty:
+                        # Trimmed or restored to bars before the high-water mark
+                        continue
+                written += self.write_candles(symbol, timeframe, df)
+                self._high_water[(symbol, timeframe)] = df['timestamp'].iloc[-1]
+        return written
+
+    def write_articles(self, articles):
+        rows = [
+            (article['url'], (article.get('source') or {}).get('name'), article.get('title'),
+             article.get('content'), to_epoch_ms(article.get('publishedAt') or pd.Timestamp.now(tz='UTC')))
+            for article in articles if article.get('url')
+        ]
+        return self._write('articles', """
+            INSERT INTO articles (url, source, title, content, timestamp) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                source = excluded.source, title = excluded.title,
+                content = excluded.content, timestamp = excluded.timestamp
+        """, rows)
+
+    def write_sentiment(self, scores, timestamps=None, symbol=MARKET_SYMBOL):
+        """Upsert sentiment scores; timestamps defaults to now for every score"""
+        now = to_epoch_ms(pd.Timestamp.now(tz='UTC'))
+        timestamps = timestamps or [now] * len(scores)
+        rows = [
+            (text_hash(score['text']), symbol, timestamp, score['polarity'], score['subjectivity'])
+            for score, timestamp in zip(scores, timestamps)
+        ]
+        return self._write('sentiment_scores', """
+            INSERT INTO sentiment_scores (text_hash, symbol, timestamp, polarity, subjectivity)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (text_hash) DO UPDATE SET
+                polarity = excluded.polarity, subjectivity = excluded.subjectivity
+        """, rows)
+
+    def write_indicator_snapshots(self, analysis_results, timeframe=None):
+        """Store the latest value of every indicator per symbol"""
+        timeframe = timeframe or Config.TIMEFRAME
+        rows = []
+        for symbol, analysis in analysis_results.items():
+            if not analysis:
+                continue
+            latest = {}
+            for name, values in analysis['indicators'].items():
+                value = values.iloc[-1] if hasattr(values, 'iloc') else values[-1]
+                latest[name] = None if pd.isna(value) else float(value)
+            rows.append((symbol, timeframe, to_epoch_ms(analysis['last_updated']),
+                         json.dumps(latest)))
+        return self._write('indicator_snapshots', """
+            INSERT INTO indicator_snapshots (symbol, timeframe, timestamp, values_json)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET values_json = excluded.values_json
+        """, rows)
+
+    def write_market_overview(self, overview, timestamp=None):
+        timestamp = to_epoch_ms(timestamp or pd.Timestamp.now(tz='UTC'))
+        return self._write('market_overviews', """
+            INSERT INTO market_overviews (timestamp, data_json) VALUES (?, ?)
+            ON CONFLICT (timestamp) DO UPDATE SET data_json = excluded.data_json
+        """, [(timestamp, json.dumps(overview, default=_json_default))])
+
+    def write_research_report(self, report, symbol=MARKET_SYMBOL):
+        timestamp = to_epoch_ms(report.get('timestamp') or pd.Timestamp.now(tz='UTC'))
+        data = {key: value for key, value in report.items() if key != 'analysis'}
+        return self._write('research_reports', """
+            INSERT INTO research_reports (symbol, timestamp, analysis, data_json) VALUES (?, ?, ?, ?)
+            ON CONFLICT (symbol, timestamp) DO UPDATE SET
+                analysis = excluded.analysis, data_json = excluded.data_json
+        """, [(symbol, timestamp, report.get('analysis'), json.dumps(data, default=_json_default))])
+
+    def read_candles(self, symbol, timeframe, start=None, end=None):
+        """Read candles for a symbol and timeframe in [start, end) as a DataFrame"""
+        query = "SELECT timestamp, open, high, low, close, volume FROM candles WHERE symbol = ? AND timeframe = ?"
+        params = [symbol, timeframe]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(to_epoch_ms(start))
+        if end is not None:
+            query += " AND timestamp < ?"
+            params.append(to_epoch_ms(end))
+        query += " ORDER BY timestamp"
+
+        with self._lock:
+            df = pd.read_sql_query(query, self.conn, params=params)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def read_articles(self, start=None, end=None):
+        query = "SELECT url, source, title, content, timestamp FROM articles WHERE 1 = 1"
+        params = []
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(to_epoch_ms(start))
+        if end is not None:
+            query += " AND timestamp < ?"
+            params.append(to_epoch_ms(end))
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY timestamp", self.conn, params=params)
+
+    def apply_retention(self, retention_days=None, now=None):
+        """Delete rows older than the per-table retention window (days)"""
+        retention_days = {**Config.STORAGE_RETENTION_DAYS, **(retention_days or {})}
+        now = now or pd.Timestamp.now(tz='UTC')
+        deleted = {}
+        with self._lock, self.conn:
+            for table in RETENTION_TABLES:
+                days = retention_days.get(table, retention_days['default'])
+                cutoff = to_epoch_ms(now - pd.Timedelta(days=days))
+                deleted[table] = self.conn.execute(
+                    f"DELETE FROM {table} WHERE timestamp < ?", (cutoff,)).rowcount
+        logger.info(f"Retention removed rows: {deleted}")
+        return deleted
+
+    def compact(self, free_ratio=None):
+        """Checkpoint the WAL and VACUUM when enough pages are free"""
+        free_ratio = Config.STORAGE_VACUUM_FREE_RATIO if free_ratio is None else free_ratio
+        with self._lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            page_count = self.conn.execute('PRAGMA page_count').fetchone()[0]
+            free_pages = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+            vacuumed = bool(page_count) and free_pages / page_count >= free_ratio
+            if vacuumed:
+                self.conn.execute('VACUUM')
+            self.conn.execute('PRAGMA optimize')
+        logger.info(f"Compaction: {free_pages}/{page_count} free pages, vacuumed={vacuumed}")
+        return vacuumed
+
+    def persist_pipeline(self, components):
+        """Write everything the pipeline components currently hold"""
+        price_collector = components.get('price_collector')
+        if price_collector is not None:
+            self.write_timeframes(price_collector.timeframe_prices)
+
+        news_scraper = components.get('news_scraper')
+        if news_scraper is not None:
+            self.write_articles(news_scraper.collected_news)
+
+        sentiment_analyzer = components.get('sentiment_analyzer')
+        if sentiment_analyzer is not None and sentiment_analyzer.sentiment_scores:
+            news = news_scraper.collected_news if news_scraper is not None else []
+            timestamps = None
+            if len(news) == len(sentiment_analyzer.sentiment_scores):
+                timestamps = [to_epoch_ms(article.get('publishedAt') or pd.Timestamp.now(tz='UTC'))
+                              for article in news]
+            self.write_sentiment(sentiment_analyzer.sentiment_scores, timestamps)
+
+        technical_analyzer = components.get('technical_analyzer')
+        if technical_analyzer is not None:
+            self.write_indicator_snapshots(technical_analyzer.analysis_results)
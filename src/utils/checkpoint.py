@@ -0,0 +1,340 @@
+import hashlib
+import io
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from config import Config
+from utils.compact import CompactFrame
+
+logger = logging.getLogger('crypto_analyzer.checkpoint')
+
+# Settings that do not change stage outputs: credentials and the checkpoint settings themselves
+UNHASHED_SETTING_MARKERS = ('_KEY', 'DATABASE_URL', 'CHECKPOINT')
+# Project root holding every module a stage can depend on
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Written under CHECKPOINT_DIR when a pipeline run finishes
+RUN_COMPLETE_MARKER = 'run_complete'
+
+
+def config_fingerprint():
+    """Hash of every setting, so a configuration change invalidates checkpoints"""
+    settings = sorted(
+        (name, repr(value)) for name, value in vars(Config).items()
+        if name.isupper() and not any(marker in name for marker in UNHASHED_SETTING_MARKERS)
+    )
+    return hashlib.sha256(repr(settings).encode()).hexdigest()
+
+
+def code_version():
+    """
+    Hash of every project module and the TA-Lib version. Stages read helpers
+    from many modules (resampling, indicator caching, compaction), so any
+    code change invalidates checkpoints rather than only the stage's own file.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(SOURCE_ROOT):
+        dirs[:] = sorted(name for name in dirs if not name.startswith(('.', '__')))
+        for name in sorted(files):
+            if not name.endswith('.py'):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, SOURCE_ROOT).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    try:
+        import talib
+        # Wrapper and C library versions
+        digest.update(f"talib={getattr(talib, '__version__', None)}/{getattr(talib, '__ta_version__', None)}".encode())
+    except ImportError:
+        digest.update(b"talib=none")
+    return digest.hexdigest()
+
+
+class _Encoder:
+    """
+    Split a state tree into a msgpack-able tree and a dict of NumPy arrays.
+    DataFrames, arrays and CompactFrames become references into the arrays;
+    objects reachable more than once are stored once and restored shared.
+    """
+
+    def __init__(self):
+        self.arrays = {}
+        self._refs = {}
+
+    def _store(self, values):
+        name = f"a{len(self.arrays)}"
+        self.arrays[name] = values
+        return name
+
+    def encode(self, obj):
+        if isinstance(obj, (pd.DataFrame, np.ndarray, CompactFrame)):
+            if id(obj) not in self._refs:
+                self._refs[id(obj)] = (self._encode_container(obj), obj)
+            return self._refs[id(obj)][0]
+        if isinstance(obj, dict):
+            return {key: self.encode(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self.encode(item) for item in obj]
+        if isinstance(obj, pd.Timestamp):
+            return {'__timestamp__': obj.value, 'tz': str(obj.tz) if obj.tz else None}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return obj
+
+    def _encode_container(self, obj):
+        ref = {'__ref__': len(self._refs)}
+        if isinstance(obj, np.ndarray):
+            if obj.dtype == object:
+                ref.update(kind='list', values=[self.encode(item) for item in obj.tolist()])
+            else:
+                ref.update(kind='array', array=self._store(obj))
+        elif isinstance(obj, CompactFrame):
+            ref.update(kind='compact', index=self._store(obj.index),
+                       columns={name: self._store(values) for name, values in obj.items()})
+        else:
+            columns = {}
+            for name, values in obj.items():
+                values = values.to_numpy()
+                # Object columns (strings, mixed) stay in the tree, npz is loaded without pickle
+                columns[name] = ({'values': [self.encode(item) for item in values.tolist()]}
+                                 if values.dtype == object else {'array': self._store(values)})
+            ref.update(kind='frame', columns=columns)
+            if not isinstance(obj.index, pd.RangeIndex) or obj.index.start != 0 or obj.index.step != 1:
+                ref.update(index=self._store(obj.index.to_numpy()), index_name=obj.index.name)
+        return ref
+
+
+class _Decoder:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self._refs = {}
+
+    def decode(self, obj):
+        if isinstance(obj, dict):
+            if '__ref__' in obj:
+                if obj['__ref__'] not in self._refs:
+                    self._refs[obj['__ref__']] = self._decode_container(obj)
+                return self._refs[obj['__ref__']]
+            if '__timestamp__' in obj:
+                return pd.Timestamp(obj['__timestamp__'], tz=obj['tz'])
+            return {key: self.decode(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [self.decode(item) for item in obj]
+        return obj
+
+    def _decode_container(self, ref):
+        if ref['kind'] == 'array':
+            return self.arrays[ref['array']]
+        if ref['kind'] == 'list':
+            return np.array(self.decode(ref['values']), dtype=object)
+        if ref['kind'] == 'compact':
+            return CompactFrame(self.arrays[ref['index']],
+                                {name: self.arrays[array] for name, array in ref['columns'].items()})
+        df = pd.DataFrame({
+            name: (self.arrays[column['array']] if 'array' in column else self.decode(column['values']))
+            for name, column in ref['columns'].items()
+        })
+        if 'index' in ref:
+            df.index = pd.Index(self.arrays[ref['index']], name=ref['index_name'])
+        return df
+
+
+class CheckpointStore:
+    """
+    Content-addressed checkpoints of pipeline stage outputs.
+
+    A stage's key hashes its name, the project source, the configuration
+    and the content digests of the upstream stages it reads. Stages without
+    upstream inputs (collectors) fetch data that changes with time, so their
+    checkpoints are only reused by a run resuming one that did not finish,
+    and only for CHECKPOINT_SOURCE_TTL. A rerun with unchanged inputs loads
+    the checkpoint instead of running the stage, so after a failure only the
+    failed stage and its dependents run again.
+
+    Each checkpoint is a NumPy .npz with every frame column and array and a
+    msgpack tree describing the rest, written atomically under
+    CHECKPOINT_DIR/<stage>/<key>. Checkpoints unused for CHECKPOINT_MAX_AGE,
+    or beyond the CHECKPOINT_KEEP most recent per stage, are garbage collected.
+    """
+
+    def __init__(self, directory=None, source_ttl=None, max_age=None, keep=None):
+        self.directory = directory or Config.CHECKPOINT_DIR
+        self.source_ttl = source_ttl or Config.CHECKPOINT_SOURCE_TTL
+        self.max_age = max_age or Config.CHECKPOINT_MAX_AGE
+        self.keep = keep or Config.CHECKPOINT_KEEP
+        self.config_version = config_fingerprint()
+        self.code_version = code_version()
+        self.resuming = False
+        # Stages that ran but produced no state, i.e. failed inside the component
+        self.failed = []
+        # stage -> content digest of its current output
+        self.digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, stage, key):
+        base = os.path.join(self.directory, stage, key)
+        return f"{base}.npz", f"{base}.msgpack"
+
+    def _marker_path(self):
+        return os.path.join(self.directory, RUN_COMPLETE_MARKER)
+
+    def start_run(self):
+        """
+        Begin a pipeline run. Collected sources are only restored when the
+        previous run did not finish, so a normal run after a successful one
+        fetches current data.
+        """
+        self.resuming = not os.path.exists(self._marker_path())
+        self._remove(self._marker_path())
+        if self.resuming:
+            logger.debug("Previous run did not finish, source checkpoints may be restored")
+
+    def finish_run(self):
+        """
+        Mark the run complete, so the next one collects its sources afresh.
+        A run in which a stage produced nothing is left resumable.
+        """
+        if self.failed:
+            logger.info(f"Stages without output: {', '.join(self.failed)}; next run resumes from checkpoints")
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._marker_path(), 'w') as f:
+            f.write(str(time.time()))
+
+    def stage_key(self, stage, component, inputs=()):
+        """Checkpoint key for a stage, or None when an input has no known content digest"""
+        parts = [stage, type(component).__qualname__, self.code_version, self.config_version]
+        for upstream in inputs:
+            if upstream not in self.digests:
+                return None
+            parts.append(f"{upstream}={self.digests[upstream]}")
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:32]
+
+    def save(self, stage, key, state):
+        """Write state for stage under key and return its content digest"""
+        import msgpack
+
+        encoder = _Encoder()
+        tree = msgpack.packb(encoder.encode(state), use_bin_type=True)
+        # Digest of the content itself; the zip container embeds write times
+        content = hashlib.sha256(tree)
+        for name, values in encoder.arrays.items():
+            values = np.ascontiguousarray(values)
+            content.update(f"{name}:{values.dtype.str}:{values.shape}".encode())
+            content.update(values.view(np.uint8).reshape(-1) if values.size else b'')
+        digest = content.hexdigest()
+        buffer = io.BytesIO()
+        np.savez(buffer, **encoder.arrays)
+        payload = buffer.getvalue()
+
+        arrays_path, tree_path = self._paths(stage, key)
+        os.makedirs(os.path.dirname(arrays_path), exist_ok=True)
+        # The tree is written last and marks the checkpoint complete
+        for path, data in ((arrays_path, payload),
+                           (tree_path, msgpack.packb({'digest': digest, 'created': time.time(), 'tree': tree},
+                                                  use_bin_type=True))):
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+        return digest
+
+    def load(self, stage, key, max_age=None):
+        """(state, digest) saved for stage under key within max_age seconds, or None"""
+        import msgpack
+
+        arrays_path, tree_path = self._paths(stage, key)
+        if not os.path.exists(tree_path):
+            return None
+        try:
+            with open(tree_path, 'rb') as f:
+                header = msgpack.unpackb(f.read(), raw=False)
+            if max_age is not None and time.time() - header['created'] > max_age:
+                return None
+            with np.load(arrays_path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            tree = msgpack.unpackb(header['tree'], raw=False, strict_map_key=False)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable checkpoint {tree_path}: {str(e)}")
+            self._remove(tree_path, arrays_path)
+            return None
+        now = time.time()
+        # Loads count as use for garbage collection
+        os.utime(tree_path, (now, now))
+        return _Decoder(arrays).decode(tree), header['digest']
+
+    def run_stage(self, stage, component, inputs=()):
+        """
+        Run component unless a checkpoint for the same inputs exists, in which
+        case its output is restored instead. Components opt in by providing
+        checkpoint_state() and restore_checkpoint(state); others always run.
+        """
+        if not hasattr(component, 'checkpoint_state'):
+            self.digests.pop(stage, None)
+            return component.run()
+
+        key = self.stage_key(stage, component, inputs)
+        if key is not None and (inputs or self.resuming):
+            try:
+                loaded = self.load(stage, key, max_age=None if inputs else self.source_ttl)
+            except ImportError as e:
+                logger.warning(f"Checkpoints unavailable: {str(e)}")
+                loaded = None
+            if loaded is not None:
+                state, self.digests[stage] = loaded
+                component.restore_checkpoint(state)
+                self.hits += 1
+                logger.info(f"Restored {stage} from checkpoint {key}")
+                return None
+
+        self.misses += 1
+        self.digests.pop(stage, None)
+        result = component.run()
+        # No state means the stage produced nothing worth reusing (e.g. a failed fetch)
+        state = component.checkpoint_state() if key is not None else None
+        if state is None:
+            self.failed.append(stage)
+        else:
+            try:
+                self.digests[stage] = self.save(stage, key, state)
+                logger.debug(f"Checkpointed {stage} as {key}")
+            except Exception as e:
+                logger.warning(f"Could not checkpoint {stage}: {str(e)}")
+        return result
+
+    def _remove(self, *paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self):
+        """Remove checkpoints unused for CHECKPOINT_MAX_AGE and all but the CHECKPOINT_KEEP newest per stage"""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        cutoff = time.time() - self.max_age
+        for stage in os.listdir(self.directory):
+            stage_dir = os.path.join(self.directory, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            entries = sorted(
+                ((os.path.getmtime(os.path.join(stage_dir, name)), name[:-len('.msgpack')])
+                 for name in os.listdir(stage_dir) if name.endswith('.msgpack')),
+                reverse=True)
+            for rank, (mtime, key) in enumerate(entries):
+                if rank >= self.keep or mtime < cutoff:
+                    self._remove(*self._paths(stage, key))
+                    removed += 1
+            # Leftovers of interrupted saves
+            for name in os.listdir(stage_dir):
+                path = os.path.join(stage_dir, name)
+                if not name.endswith('.msgpack') and os.path.getmtime(path) < cutoff \
+                        and not os.path.exists(os.path.join(stage_dir, name.split('.')[0] + '.msgpack')):
+                    self._remove(path)
+        if removed:
+            logger.info(f"Removed {removed} old checkpoints")
+        return removed
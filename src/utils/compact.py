@@ -0,0 +1,151 @@
+import sys
+import numpy as np
+import pandas as pd
+from config import Config
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+# Derived timeframes sum volume, and float32 sums lose precision on high-volume pairs
+VOLUME_DTYPE = np.dtype(np.float64)
+
+
+def compact_ohlcv(df, dtype=None):
+    """
+    Store OHLC price columns as Config.PRICE_DTYPE and volume as float64;
+    timestamps stay datetime64 (int64)
+    """
+    dtype = np.dtype(dtype or Config.PRICE_DTYPE)
+    targets = {column: dtype for column in PRICE_COLUMNS}
+    targets['volume'] = VOLUME_DTYPE
+    columns = {column: target for column, target in targets.items()
+               if column in df.columns and df[column].dtype != target}
+    if not columns or df.empty:
+        return df
+    return df.astype(columns)
+
+
+def epoch_ms_index(timestamps):
+    """int64 epoch milliseconds from a datetime Series or array"""
+    values = timestamps.to_numpy() if hasattr(timestamps, 'to_numpy') else np.asarray(timestamps)
+    return values.astype('datetime64[ms]').astype(np.int64)
+
+
+class CompactFrame:
+    """
+    Named 1-D columns on one shared int64 epoch-ms time index.
+    Numeric columns are stored as float32 and boolean columns as bool,
+    so a frame costs a fraction of the equivalent dict of pandas Series.
+    Columns are read like a dict: frame['rsi'], frame.get('rsi'), frame.items().
+    """
+
+    __slots__ = ('index', 'columns')
+
+    def __init__(self, index, columns, dtype=np.float32):
+        self.index = np.asarray(index, dtype=np.int64)
+        self.columns = {}
+        for name, values in columns.items():
+            values = np.asarray(values.to_numpy() if hasattr(values, 'to_numpy') else values)
+            if values.dtype != np.bool_:
+                values = values.astype(dtype, copy=False)
+            if len(values) != len(self.index):
+                raise ValueError(f"Column {name} has {len(values)} values for an index of {len(self.index)}")
+            self.columns[name] = values
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def get(self, name, default=None):
+        return self.columns.get(name, default)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def items(self):
+        return self.columns.items()
+
+    @property
+    def empty(self):
+        return len(self.index) == 0
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def tail(self, n):
+        """Copy of the last n rows, so the full-length arrays can be released"""
+        start = max(len(self.index) - n, 0)
+        frame = CompactFrame.__new__(CompactFrame)
+        frame.index = self.index[start:].copy()
+        frame.columns = {name: values[start:].copy() for name, values in self.columns.items()}
+        return frame
+
+    def latest(self):
+        """Last value of every column as plain Python values"""
+        if self.empty:
+            return {}
+        return {name: values[-1].item() for name, values in self.columns.items()}
+
+    def to_frame(self):
+        """Expand into a DataFrame indexed by timestamp"""
+        return pd.DataFrame(self.columns, index=pd.to_datetime(self.index, unit='ms').rename('timestamp'))
+
+
+def retain_columns(index, *column_sets, mode=None, window=None):
+    """
+    Apply the result retention policy to column dicts aligned on index:
+    'full' keeps every row, 'tail' only the last window rows.
+    Returns one CompactFrame per column dict, all sharing a single index.
+    """
+    mode = mode or Config.RESULT_RETENTION
+    window = window or Config.RESULT_TAIL_WINDOW
+    if mode == 'full':
+        start = 0
+    elif mode == 'tail':
+        start = max(len(index) - window, 0)
+    else:
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    index = np.asarray(index, dtype=np.int64)
+    if start:
+        # Copy the tail so the full-length arrays can be released
+        index = index[start:].copy()
+        column_sets = [
+            {name: np.asarray(values)[start:].copy() for name, values in columns.items()}
+            for columns in column_sets
+        ]
+    return [CompactFrame(index, columns) for columns in column_sets]
+
+
+def memory_usage(obj, _seen=None):
+    """
+    Approximate bytes held by obj and everything it contains.
+    Objects reachable more than once (shared frames, arrays, strings)
+    are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, CompactFrame):
+        return memory_usage(obj.index, seen) + sum(memory_usage(values, seen) for values in obj.columns.values())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            memory_usage(key, seen) + memory_usage(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(memory_usage(item, seen) for item in obj)
+    return sys.getsizeof(obj)
@@ -1,14 +1,29 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
+_listener = None
+
 def setup_logger():
+    """
+    Configure the crypto_analyzer logger once per process.
+    Records go through a queue so file and console I/O happen on a
+    background thread instead of the caller's. Repeated calls return the
+    already configured logger without adding handlers.
+    """
+    global _listener
+
+    logger = logging.getLogger('crypto_analyzer')
+    if _listener is not None:
+        return logger
+
     # Create logs directory if it doesn't exist
     if not os.path.exists('logs'):
         os.makedirs('logs')
 
-    # Create logger
-    logger = logging.getLogger('crypto_analyzer')
     logger.setLevel(logging.DEBUG)
 
     # Create file handler
@@ -25,8 +40,13 @@ def setup_logger():
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Hand records to a background listener that owns the real handlers
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
 
-    return logger 
\ No newline at end of file
+    return logger
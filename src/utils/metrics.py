@@ -0,0 +1,245 @@
+import cProfile
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger('crypto_analyzer.metrics')
+
+LATENCY_WINDOW = 1000  # recent latencies kept per provider or feed for percentiles
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of a sequence of numbers, 0.0 when empty.
+    The one definition behind every reported p50/p95, so metrics.json,
+    component stats and benchmark results mean the same thing.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PipelineMetrics:
+    """
+    Collects per-stage timings, per-provider API call counts and latencies,
+    cache hit rates, per-component memory and peak memory for one pipeline run.
+    Latency percentiles cover each provider's most recent LATENCY_WINDOW calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self.profile_dir = None
+        self.memory_budget_bytes = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self.stages = {}
+            # Totals cover every call; percentiles the most recent LATENCY_WINDOW, so a daemon stays bounded
+            self.api_calls = defaultdict(lambda: {'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                                  'latencies': deque(maxlen=LATENCY_WINDOW)})
+            self.caches = {}
+            self.memory = {}
+            self.counters = defaultdict(int)
+
+    def enable_profiling(self, profile_dir):
+        """Run cProfile and tracemalloc for every stage, writing .prof files to profile_dir"""
+        os.makedirs(profile_dir, exist_ok=True)
+        self.profile_dir = profile_dir
+
+    @contextmanager
+    def stage(self, name):
+        """Time a pipeline stage, profiling it when profiling is enabled"""
+        profiler = None
+        # Only one stage can be profiled at a time when stages run concurrently
+        if self.profile_dir and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            profiler.enable()
+
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            record = {'seconds': duration, 'error': error}
+
+            if profiler is not None:
+                profiler.disable()
+                _, traced_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self._profile_lock.release()
+                profile_path = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(profile_path)
+                record['traced_peak_bytes'] = traced_peak
+                record['profile'] = profile_path
+
+            with self._lock:
+                self.stages[name] = record
+            logger.debug(f"Stage {name} took {duration:.3f}s")
+
+    def record_api_call(self, provider, latency, success=True):
+        with self._lock:
+            call = self.api_calls[provider]
+            call['count'] += 1
+            call['total_seconds'] += latency
+            call['max_seconds'] = max(call['max_seconds'], latency)
+            call['latencies'].append(latency)
+            if not success:
+                call['errors'] += 1
+
+    @contextmanager
+    def api_call(self, provider):
+        """Time an outgoing API call; exceptions count as errors"""
+        start = time.perf_counter()
+        success = True
+        try:
+            yield
+        except Exception:
+            success = False
+            raise
+        finally:
+            self.record_api_call(provider, time.perf_counter() - start, success)
+
+    def register_cache(self, name, stats_fn):
+        """Register a callable returning a dict with at least hits and misses"""
+        with self._lock:
+            self.caches[name] = stats_fn
+
+    def register_memory(self, name, usage_fn):
+        """Register a callable returning the bytes a component currently holds"""
+        with self._lock:
+            self.memory[name] = usage_fn
+
+    def memory_usage(self):
+        """Bytes held per registered component, warning when over the memory budget"""
+        with self._lock:
+            usage_fns = dict(self.memory)
+        components = {name: usage_fn() for name, usage_fn in usage_fns.items()}
+        total = sum(components.values())
+        if self.memory_budget_bytes and total > self.memory_budget_bytes:
+            logger.warning(f"Component memory {total / 2**20:.1f} MiB exceeds budget "
+                           f"{self.memory_budget_bytes / 2**20:.1f} MiB: {components}")
+        return {'components': components, 'total_bytes': total, 'budget_bytes': self.memory_budget_bytes}
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def summary(self):
+        """Return the run summary as a JSON-serializable dict"""
+        memory = self.memory_usage()
+        with self._lock:
+            api_calls = {}
+            for provider, call in self.api_calls.items():
+                latencies = call['latencies']
+                api_calls[provider] = {
+                    'count': call['count'],
+                    'errors': call['errors'],
+                    'latency_mean': call['total_seconds'] / call['count'] if call['count'] else 0.0,
+                    'latency_p50': percentile(latencies, 50),
+                    'latency_p95': percentile(latencies, 95),
+                    'latency_max': call['max_seconds']
+                }
+            caches = {name: stats_fn() for name, stats_fn in self.caches.items()}
+
+            return {
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now().isoformat(),
+                'stages': dict(self.stages),
+                'api_calls': api_calls,
+                'caches': caches,
+                'counters': dict(self.counters),
+                'memory': memory,
+                'peak_rss_bytes': peak_rss_bytes()
+            }
+
+    def to_prometheus(self, summary=None):
+        """Render the run summary in Prometheus text exposition format"""
+        summary = summary or self.summary()
+        lines = [
+            '# TYPE crypto_stage_duration_seconds gauge',
+            *[f'crypto_stage_duration_seconds{{stage="{name}"}} {stage["seconds"]:.6f}'
+              for name, stage in summary['stages'].items()],
+            '# TYPE crypto_api_calls_total counter',
+            *[f'crypto_api_calls_total{{provider="{provider}"}} {call["count"]}'
+              for provider, call in summary['api_calls'].items()],
+            '# TYPE crypto_api_errors_total counter',
+            *[f'crypto_api_errors_total{{provider="{provider}"}} {call["errors"]}'
+              for provider, call in summary['api_calls'].items()],
+            '# TYPE crypto_api_latency_seconds summary',
+        ]
+        for provider, call in summary['api_calls'].items():
+            for quantile, key in (('0.5', 'latency_p50'), ('0.95', 'latency_p95')):
+                lines.append(
+                    f'crypto_api_latency_seconds{{provider="{provider}",quantile="{quantile}"}} {call[key]:.6f}'
+                )
+            lines.append(f'crypto_api_latency_seconds_sum{{provider="{provider}"}} '
+                         f'{call["latency_mean"] * call["count"]:.6f}')
+            lines.append(f'crypto_api_latency_seconds_count{{provider="{provider}"}} {call["count"]}')
+        lines.append('# TYPE crypto_cache_hit_ratio gauge')
+        for name, stats in summary['caches'].items():
+            lookups = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / lookups if lookups else 0.0
+            lines.append(f'crypto_cache_hit_ratio{{cache="{name}"}} {ratio:.6f}')
+        lines.append('# TYPE crypto_counter_total counter')
+        for name, value in summary['counters'].items():
+            lines.append(f'crypto_counter_total{{name="{name}"}} {value}')
+        lines.append('# TYPE crypto_component_memory_bytes gauge')
+        for name, value in summary['memory']['components'].items():
+            lines.append(f'crypto_component_memory_bytes{{component="{name}"}} {value}')
+        if summary['peak_rss_bytes'] is not None:
+            lines.append('# TYPE crypto_peak_rss_bytes gauge')
+            lines.append(f'crypto_peak_rss_bytes {summary["peak_rss_bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, output_dir):
+        """Write run_summary.json and metrics.prom to output_dir"""
+        os.makedirs(output_dir, exist_ok=True)
+        summary = self.summary()
+        stamp = self.started_at.strftime('%Y%m%d_%H%M%S')
+
+        json_path = os.path.join(output_dir, f"run_summary_{stamp}.json")
+        with open(json_path, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+
+        prom_path = os.path.join(output_dir, 'metrics.prom')
+        with open(prom_path, 'w') as f:
+            f.write(self.to_prometheus(summary))
+
+        logger.info(f"Wrote run metrics to {json_path}")
+        return json_path, prom_path
+
+
+# Shared by every component in the process
+metrics = PipelineMetrics()
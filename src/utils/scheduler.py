@@ -0,0 +1,124 @@
+import logging
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+logger = logging.getLogger('crypto_analyzer.scheduler')
+
+
+class ScheduledJob:
+    """A periodic job with its own cadence, jitter and overlap guard"""
+
+    def __init__(self, name, func, interval, jitter=0.0, lock=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        # Shared with jobs that use the same state; held for the whole run
+        self.lock = lock
+        self.next_run = 0.0
+        self.running = threading.Lock()
+        self.runs = 0
+        self.skips = 0
+        self.failures = 0
+        self.last_duration = None
+
+    def schedule_next(self, now):
+        """Set the next due time, spread by +/- jitter as a fraction of interval"""
+        spread = self.interval * self.jitter
+        self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+
+class Scheduler:
+    """
+    Runs jobs on independent cadences in a single long-lived process.
+    A job that is still running when it next comes due is skipped rather
+    than queued, so a slow stage never piles up behind itself. Jobs given
+    the same lock work on shared state and run one at a time.
+    """
+
+    def __init__(self, jitter=0.1):
+        self.jitter = jitter
+        self.jobs = []
+        self._stop_event = threading.Event()
+
+    def add_job(self, name, func, interval, jitter=None, run_immediately=True, lock=None):
+        """Register a callable to run every interval seconds, holding lock while it runs"""
+        job = ScheduledJob(name, func, interval, self.jitter if jitter is None else jitter, lock)
+        if not run_immediately:
+            job.schedule_next(time.monotonic())
+        self.jobs.append(job)
+        logger.debug(f"Registered job {name} every {interval}s")
+        return job
+
+    def install_signal_handlers(self):
+        """Stop cleanly on SIGINT and SIGTERM"""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_signal)
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, shutting down scheduler")
+        self.stop()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _execute(self, job):
+        start = time.monotonic()
+        try:
+            with job.lock or nullcontext():
+                logger.info(f"Running job {job.name}")
+                job.func()
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Error in job {job.name}: {str(e)}", exc_info=True)
+        finally:
+            job.last_duration = time.monotonic() - start
+            job.running.release()
+            logger.debug(f"Job {job.name} finished in {job.last_duration:.2f}s")
+
+    def _dispatch(self, executor, job):
+        if not job.running.acquire(blocking=False):
+            job.skips += 1
+            logger.warning(f"Skipping job {job.name}: previous run still in progress")
+            return
+        job.runs += 1
+        executor.submit(self._execute, job)
+
+    def run_forever(self):
+        """Dispatch due jobs until stop() is called, then wait for running jobs"""
+        if not self.jobs:
+            logger.warning("No jobs registered, scheduler exiting")
+            return
+
+        logger.info(f"Scheduler started with {len(self.jobs)} jobs")
+        executor = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix='scheduler')
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                for job in self.jobs:
+                    if job.next_run <= now:
+                        self._dispatch(executor, job)
+                        job.schedule_next(now)
+
+                next_due = min(job.next_run for job in self.jobs)
+                self._stop_event.wait(max(next_due - time.monotonic(), 0))
+        finally:
+            logger.info("Scheduler stopping, waiting for running jobs to finish")
+            executor.shutdown(wait=True)
+            logger.info(f"Scheduler stopped: {self.stats()}")
+
+    def stats(self):
+        """Return run, skip and failure counts per job"""
+        return {
+            job.name: {
+                'runs': job.runs,
+                'skips': job.skips,
+                'failures': job.failures,
+                'last_duration': job.last_duration
+            }
+            for job in self.jobs
+        }
@@ -0,0 +1,93 @@
+import logging
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+
+logger = logging.getLogger('crypto_analyzer.shared_arrays')
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays backed by multiprocessing.shared_memory.
+
+    The parent creates the block set and hands its layout (a small,
+    picklable dict) to worker processes, which attach to the same memory
+    and write results in place. Nothing but the layout crosses the process
+    boundary, and the parent reads the arrays without copying.
+    """
+
+    def __init__(self, blocks, specs, owner):
+        self._blocks = blocks
+        self.specs = specs
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            for name, (shape, dtype) in specs.items()
+        }
+
+    @classmethod
+    def create(cls, specs):
+        """Allocate zeroed arrays for {name: (shape, dtype)}"""
+        blocks = {}
+        try:
+            for name, (shape, dtype) in specs.items():
+                size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                blocks[name] = shared_memory.SharedMemory(create=True, size=size)
+        except Exception:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        arrays = cls(blocks, {name: (tuple(shape), np.dtype(dtype).str) for name, (shape, dtype) in specs.items()},
+                     owner=True)
+        for array in arrays.arrays.values():
+            array.fill(0)
+        return arrays
+
+    @classmethod
+    def attach(cls, layout):
+        """Attach to arrays created elsewhere from their layout"""
+        blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in layout.items()}
+        specs = {name: (shape, dtype) for name, (_, shape, dtype) in layout.items()}
+        return cls(blocks, specs, owner=False)
+
+    @property
+    def layout(self):
+        """{name: (shared memory name, shape, dtype)} for attach()"""
+        return {name: (self._blocks[name].name, shape, dtype) for name, (shape, dtype) in self.specs.items()}
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def in_use(self):
+        """Whether views of the arrays are still referenced outside this object"""
+        # NumPy views keep their base array alive but hold no buffer export on
+        # the block, so closing would unmap memory they still point into
+        return any(sys.getrefcount(self.arrays[name]) > 2 for name in self.arrays)
+
+    def close(self):
+        """
+        Detach from the memory. Returns False, leaving everything mapped, while
+        views handed out are still referenced; close() can then be retried.
+        """
+        if self.in_use():
+            logger.debug("Shared arrays still referenced, left mapped")
+            return False
+        self.arrays = {}
+        for block in self._blocks.values():
+            block.close()
+        return True
+
+    def unlink(self):
+        """Free the memory once every process has closed it (creator only)"""
+        if not self.owner:
+            return
+        for block in self._blocks.values():
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
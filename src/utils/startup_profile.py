@@ -0,0 +1,110 @@
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger('crypto_analyzer.startup_profile')
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported by the stage that needs them
+HEAVY_MODULES = [
+    'pandas', 'numpy', 'talib', 'ccxt', 'textblob', 'aiohttp', 'bs4',
+    'jinja2', 'matplotlib', 'groq', 'requests', 'binance', 'pycoingecko'
+]
+
+
+def _run_python(code):
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True
+    )
+
+
+def profile_imports(module, top=15):
+    """
+    Import a module in a fresh interpreter with -X importtime and
+    return the top packages by cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        logger.error(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Keep top-level packages only, nested imports are already included
+        if not name.startswith('  '):
+            timings.append({
+                'module': name.strip(),
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us)
+            })
+
+    return sorted(timings, key=lambda x: x['cumulative_us'], reverse=True)[:top]
+
+
+def format_import_profile(module, timings):
+    """Render an import profile as a plain-text table"""
+    lines = [f"Import profile for {module}", f"{'cumulative ms':>14}  {'self ms':>8}  module"]
+    for timing in timings:
+        lines.append(
+            f"{timing['cumulative_us'] / 1000:>14.1f}  {timing['self_us'] / 1000:>8.1f}  {timing['module']}"
+        )
+    return '\n'.join(lines)
+
+
+def measure_startup(module='main', repeats=5):
+    """
+    Measure wall-clock time to start an interpreter and import a module,
+    and report which heavy dependencies the import pulled in
+    """
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    durations = []
+    loaded = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = _run_python(code)
+        durations.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed: {result.stderr.strip()}")
+        loaded = [name for name in result.stdout.strip().split(',') if name]
+
+    return {
+        'module': module,
+        'repeats': repeats,
+        'median_seconds': statistics.median(durations),
+        'min_seconds': min(durations),
+        'max_seconds': max(durations),
+        'heavy_modules_loaded': loaded
+    }
+
+
+def check_startup_budget(module='main', repeats=5, budget=None):
+    """
+    Startup regression check: passes when the median startup time is within
+    budget seconds and no heavy dependency is loaded at import time
+    """
+    from config import Config
+
+    budget = Config.STARTUP_TIME_BUDGET if budget is None else budget
+    results = measure_startup(module, repeats)
+    results['budget_seconds'] = budget
+    results['passed'] = (
+        results['median_seconds'] <= budget and not results['heavy_modules_loaded']
+    )
+    return results
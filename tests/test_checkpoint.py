@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.checkpoint import CheckpointStore
+from utils.compact import CompactFrame
+
+pytest.importorskip('msgpack')
+
+
+class Collector:
+    """Checkpointable source stage producing new data on every run"""
+
+    runs = 0
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.df = None
+
+    def run(self):
+        Collector.runs += 1
+        self.df = None if self.fail else pd.DataFrame({'value': [Collector.runs]})
+
+    def checkpoint_state(self):
+        return None if self.df is None else {'df': self.df}
+
+    def restore_checkpoint(self, state):
+        self.df = state['df']
+
+
+def run_pipeline(directory, collector):
+    store = CheckpointStore(directory=str(directory))
+    store.start_run()
+    store.run_stage('collector', collector)
+    store.finish_run()
+    return store
+
+
+def test_state_round_trip(tmp_path):
+    frame = pd.DataFrame({
+        'timestamp': pd.date_range('2026-01-01', periods=3, freq='1min'),
+        'close': np.array([1.0, 2.0, 3.0], dtype=np.float32),
+        'symbol': ['BTC', 'ETH', None]
+    })
+    compact = CompactFrame([1, 2, 3], {'rsi': [10.0, 20.0, 30.0], 'buy': np.array([True, False, True])})
+    state = {
+        'frames': {'BTC/USDT': frame, 'alias': frame},
+        'compact': compact,
+        'at': pd.Timestamp('2026-01-01 12:00', tz='UTC'),
+        'counts': np.array([1, 2, 3], dtype=np.int64),
+        'recent': [('BTC/USDT', 1.5)]
+    }
+    store = CheckpointStore(directory=str(tmp_path))
+    digest = store.save('stage', 'key', state)
+    restored, restored_digest = store.load('stage', 'key')
+
+    assert restored_digest == digest
+    pd.testing.assert_frame_equal(restored['frames']['BTC/USDT'], frame)
+    # Objects reachable twice are restored shared
+    assert restored['frames']['alias'] is restored['frames']['BTC/USDT']
+    assert restored['compact']['buy'].dtype == np.bool_
+    np.testing.assert_array_equal(restored['compact']['rsi'], compact['rsi'])
+    assert restored['at'] == state['at']
+    np.testing.assert_array_equal(restored['counts'], state['counts'])
+    assert restored['recent'] == [['BTC/USDT', 1.5]]
+
+
+def test_identical_state_has_identical_digest(tmp_path):
+    store = CheckpointStore(directory=str(tmp_path))
+    state = {'df': pd.DataFrame({'a': [1.0, 2.0]})}
+    assert store.save('stage', 'one', state) == store.save('stage', 'two', state)
+
+
+def test_sources_refetched_after_successful_run(tmp_path):
+    run_pipeline(tmp_path, Collector())
+    collector = Collector()
+    store = run_pipeline(tmp_path, collector)
+    assert store.hits == 0
+    assert collector.df['value'].iloc[0] == Collector.runs
+
+
+def test_sources_restored_when_resuming_failed_run(tmp_path):
+    run_pipeline(tmp_path, Collector())
+    store = CheckpointStore(directory=str(tmp_path))
+    store.start_run()
+    store.run_stage('collector', Collector())
+    # Crashes before finish_run
+    resumed = Collector()
+    store = run_pipeline(tmp_path, resumed)
+    assert store.hits == 1
+    assert resumed.df is not None
+
+
+def test_stage_without_output_leaves_run_resumable(tmp_path):
+    store = run_pipeline(tmp_path, Collector(fail=True))
+    assert store.failed == ['collector']
+    resumed = CheckpointStore(directory=str(tmp_path))
+    resumed.start_run()
+    assert resumed.resuming
@@ -0,0 +1,58 @@
+import numpy as np
+
+from analysis.deduplication import MinHashLSH, deduplicate_articles, shingles
+
+STORY = ("Bitcoin climbed above its previous record on Tuesday as spot ETF inflows "
+         "accelerated and short sellers were forced to cover positions across major exchanges")
+UNRELATED = ("Ethereum developers scheduled the next network upgrade for the spring after "
+             "testnet deployments surfaced a minor bug in the fee market changes")
+
+
+def test_shingles_are_case_and_punctuation_insensitive():
+    assert set(shingles("Bitcoin hits a new high!")) == set(shingles("bitcoin  HITS a new high"))
+    assert len(shingles("")) == 0
+
+
+def test_signature_of_empty_text_is_none():
+    assert MinHashLSH().signature("...") is None
+
+
+def test_near_duplicates_cluster_and_distinct_texts_do_not():
+    clusters = MinHashLSH().cluster([STORY, UNRELATED, STORY + " today", ""])
+    assert sorted(sorted(cluster) for cluster in clusters) == [[0, 2], [1], [3]]
+
+
+class FixedSignatures(MinHashLSH):
+    """MinHashLSH over given signatures: 2 bands of 2 rows"""
+
+    def __init__(self, signatures):
+        super().__init__(threshold=0.75, num_perm=4, bands=2)
+        self.signatures = {text: np.array(values, dtype=np.uint64) for text, values in signatures.items()}
+
+    def signature(self, text):
+        return self.signatures[text]
+
+
+def test_candidates_compared_against_every_representative():
+    # All three share the first band; 'a' is a false positive for both others,
+    # and 'b' and 'c' (3 of 4 rows equal) share no other bucket
+    lsh = FixedSignatures({'a': [1, 2, 9, 9], 'b': [1, 2, 3, 4], 'c': [1, 2, 3, 5]})
+    clusters = lsh.cluster(['a', 'b', 'c'])
+    assert sorted(sorted(cluster) for cluster in clusters) == [[0], [1, 2]]
+
+
+def test_deduplicate_keeps_earliest_copy_with_syndication_info():
+    articles = [
+        {'title': 'Bitcoin record', 'content': STORY, 'publishedAt': '2026-01-02T00:00:00Z',
+         'source': {'name': 'Later'}, 'url': 'https://b.example/1'},
+        {'title': 'Ethereum upgrade', 'content': UNRELATED, 'publishedAt': '2026-01-01T00:00:00Z',
+         'source': {'name': 'Other'}, 'url': 'https://c.example/1'},
+        {'title': 'Bitcoin record', 'content': STORY, 'publishedAt': '2026-01-01T00:00:00Z',
+         'source': {'name': 'First'}, 'url': 'https://a.example/1'},
+    ]
+    kept = deduplicate_articles(articles)
+    assert [article['url'] for article in kept] == ['https://a.example/1', 'https://c.example/1']
+    assert kept[0]['syndication_count'] == 2
+    assert kept[0]['syndicated_sources'] == ['First', 'Later']
+    # Input articles are not modified
+    assert 'syndication_count' not in articles[2]
@@ -0,0 +1,55 @@
+import pytest
+
+from analysis.lexicon_sentiment import LexiconSentimentScorer
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    return LexiconSentimentScorer()
+
+
+def polarity(scorer, text):
+    return scorer.analyze_text([text])[0]['polarity']
+
+
+def test_negated_phrase_flips_polarity(scorer):
+    result = scorer.analyze_text(["BTC is not going to the moon"])[0]
+    assert result['polarity'] < 0
+    assert not result['is_bullish']
+
+
+def test_phrase_scored_whole(scorer):
+    # 'to the moon' (0.9) rather than 'moon' (0.8)
+    assert polarity(scorer, "BTC is going to the moon") == pytest.approx(0.9)
+
+
+def test_negation_scope_ends_at_punctuation(scorer):
+    # not_good -0.35, great 0.8, rally 0.6
+    assert polarity(scorer, "Not good. Great rally") == pytest.approx((-0.35 + 0.8 + 0.6) / 3)
+
+
+def test_negation_scope_ends_at_next_negator(scorer):
+    assert polarity(scorer, "not good") == pytest.approx(-0.35)
+    assert polarity(scorer, "not bad not good") == pytest.approx(0.0)
+    assert polarity(scorer, "not not good") == pytest.approx(-0.35)
+
+
+def test_batch_scores_match_single_texts(scorer):
+    texts = ["Bitcoin rally continues", "Exchange hacked, funds lost", "", "not bad at all"]
+    polarity_batch, subjectivity_batch = scorer.score(texts)
+    for text, p, s in zip(texts, polarity_batch, subjectivity_batch):
+        single_p, single_s = scorer.score([text])
+        assert p == pytest.approx(single_p[0])
+        assert s == pytest.approx(single_s[0])
+
+
+@pytest.mark.parametrize('text', [
+    "good", "bad", "not good", "not bad", "this is not a good idea",
+    "not bad not good", "never bad, never good", "great"
+])
+def test_general_words_agree_with_textblob(scorer, text):
+    textblob = pytest.importorskip('textblob')
+    expected = textblob.TextBlob(text).sentiment
+    result = scorer.analyze_text([text])[0]
+    assert result['polarity'] == pytest.approx(expected.polarity, abs=1e-3)
+    assert result['subjectivity'] == pytest.approx(expected.subjectivity, abs=0.02)
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from data_collection.resampler import TimeframeResampler, resample_ohlcv
+
+
+def minute_bars(start, periods, value=1.0):
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=periods, freq='1min'),
+        'open': value, 'high': value, 'low': value, 'close': value, 'volume': value
+    })
+
+
+def test_forming_base_bar_keeps_derived_bar_partial():
+    resampler = TimeframeResampler('1m', ['5m'])
+    frames = resampler.update('BTC/USDT', minute_bars('2026-01-01 12:00', 5),
+                              now=pd.Timestamp('2026-01-01 12:04:30'))
+    assert frames['5m']['is_partial'].tolist() == [True]
+    assert frames['1m']['is_partial'].tolist() == [False, False, False, False, True]
+
+
+def test_bars_close_as_time_passes_without_new_data():
+    resampler = TimeframeResampler('1m', ['5m'])
+    resampler.update('BTC/USDT', minute_bars('2026-01-01 12:00', 5), now=pd.Timestamp('2026-01-01 12:04:30'))
+    frames = resampler.update('BTC/USDT', minute_bars('2026-01-01 12:00', 0), now=pd.Timestamp('2026-01-01 12:05'))
+    assert frames['5m']['is_partial'].tolist() == [False]
+    assert not frames['1m']['is_partial'].any()
+
+
+def test_refetched_bars_replace_stored_ones():
+    resampler = TimeframeResampler('1m', ['5m'])
+    resampler.update('BTC/USDT', minute_bars('2026-01-01 12:00', 5), now=pd.Timestamp('2026-01-01 12:04:30'))
+    frames = resampler.update('BTC/USDT', minute_bars('2026-01-01 12:04', 3, value=2.0),
+                              now=pd.Timestamp('2026-01-01 12:06:10'))
+    derived = frames['5m']
+    assert derived['close'].tolist() == [2.0, 2.0]
+    assert derived['volume'].tolist() == [6.0, 4.0]
+    assert derived['is_partial'].tolist() == [False, True]
+    assert len(frames['1m']) == 7
+
+
+def test_missing_tail_data_leaves_bucket_partial():
+    # Exchange lag: only 12:00-12:02 arrived although the 12:00 bucket has ended
+    resampled = resample_ohlcv(minute_bars('2026-01-01 12:00', 3), '5m', '1m', now=pd.Timestamp('2026-01-01 12:10'))
+    assert resampled['is_partial'].tolist() == [True]
+
+
+def test_underivable_timeframe_rejected():
+    with pytest.raises(ValueError):
+        TimeframeResampler('5m', ['7m'])
@@ -0,0 +1,58 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from utils.shared_arrays import SharedArrays
+
+SPECS = {'prices': ((2, 3), np.float32), 'lengths': ((2,), np.int32)}
+
+
+@pytest.fixture
+def arrays():
+    created = SharedArrays.create(SPECS)
+    yield created
+    created.arrays.clear()
+    created.close()
+    created.unlink()
+
+
+def test_created_arrays_are_zeroed_with_requested_layout(arrays):
+    assert arrays['prices'].shape == (2, 3)
+    assert arrays['prices'].dtype == np.float32
+    assert not arrays['prices'].any()
+    assert arrays.nbytes == 2 * 3 * 4 + 2 * 4
+
+
+def test_attached_arrays_share_memory(arrays):
+    layout = pickle.loads(pickle.dumps(arrays.layout))
+    attached = SharedArrays.attach(layout)
+    try:
+        attached['prices'][1, 2] = 7.5
+        attached['lengths'][0] = 3
+        assert arrays['prices'][1, 2] == 7.5
+        assert arrays['lengths'][0] == 3
+    finally:
+        assert attached.close()
+    assert not attached.owner
+
+
+def test_close_refused_while_views_are_referenced(arrays):
+    arrays['prices'][0] = 1.0
+    view = arrays['prices'][0, :2]
+    assert arrays.in_use()
+    assert not arrays.close()
+    # Still mapped: the view reads the values written before
+    assert view.tolist() == [1.0, 1.0]
+    del view
+    assert not arrays.in_use()
+    assert arrays.close()
+
+
+def test_unlink_only_frees_memory_for_the_creator(arrays):
+    attached = SharedArrays.attach(arrays.layout)
+    attached.close()
+    attached.unlink()
+    # The block still exists, so the creator can attach again
+    again = SharedArrays.attach(arrays.layout)
+    assert again.close()
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from agent.batch_research import TokenRateLimiter
+
+
+def test_acquire_within_capacity_does_not_wait():
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+    start = time.monotonic()
+    assert asyncio.run(limiter.acquire(1000)) == 1000
+    assert time.monotonic() - start < 0.05
+    assert limiter.waited == 0.0
+
+
+def test_acquire_waits_for_refill_when_exhausted():
+    # 6000 tokens/minute refills 100 tokens per second
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+
+    async def run():
+        await limiter.acquire(6000)
+        start = time.monotonic()
+        await limiter.acquire(20)
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert elapsed == pytest.approx(0.2, abs=0.1)
+    assert limiter.waited == pytest.approx(0.2, abs=0.05)
+
+
+def test_request_larger_than_capacity_is_capped():
+    limiter = TokenRateLimiter(tokens_per_minute=600)
+    assert asyncio.run(limiter.acquire(10_000)) == 600
+
+
+def test_settle_returns_unused_and_charges_overuse():
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+    reserved = asyncio.run(limiter.acquire(1000))
+    limiter.settle(reserved, 400)
+    assert limiter.tokens == pytest.approx(5600, abs=5)
+    limiter.settle(0, 3000)
+    assert limiter.tokens == pytest.approx(2600, abs=5)
+    # Never refilled past capacity
+    limiter.settle(10_000, 0)
+    assert limiter.tokens == pytest.approx(6000)
+
+
+def test_concurrent_reservations_granted_in_arrival_order():
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+    order = []
+
+    async def request(name, tokens):
+        await limiter.acquire(tokens)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire(6000)
+        await asyncio.gather(request('first', 10), request('second', 10), request('third', 10))
+
+    asyncio.run(run())
+    assert order == ['first', 'second', 'third']